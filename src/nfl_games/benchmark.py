@@ -0,0 +1,995 @@
+"""
+benchmark.py
+Benchmarks for the data and feature pipeline on synthetic data.
+
+Each benchmark checks that the fast path matches its reference before timing it.
+Run from src/nfl_games (same as main.py):
+
+    python benchmark.py              # run every benchmark
+    python benchmark.py aggregate    # run one benchmark
+
+Brendan Dileo, October 2026
+"""
+
+import contextlib
+import io
+import os
+import pickle
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from utils.features import (
+    EPA_ROLLING_SPECS, GAME_ROLLING_SPECS, MODERN_START_YEAR, ROLLING_WINDOW, SWEEP_HALFLIFES,
+    SWEEP_WINDOWS, add_rolling_epa_features, add_rolling_features, encode_features,
+    expanding_home_field_advantage, rolling_game_features
+)
+from utils import data_manifest
+from utils.franchises import ABBR_TO_ID, franchise_name
+from utils.lazy_import import is_available
+from utils.load_data import (
+    DATA_PATH, aggregate_nflfastr_seasons, aggregate_team_stats, load_data, merge_with_spreadspoke,
+    sync_nflfastr_store, unreadable_seasons
+)
+from utils import game_store
+from utils.game_store import read_store
+from utils.ingest import ingest_week, refresh_team_state
+from utils.pbp_store import season_path
+from utils.polars_backend import POLARS_AVAILABLE
+from utils.preprocess import preprocess, use_copy_on_write
+from utils.ratings import (
+    RIDGE_ALPHA, SEASON_DECAY, WEEKLY_DECAY, design_matrix, team_codes, week_numbers, weekly_ratings
+)
+from utils.rolling import previous_means, rolling_means, split_sides, team_game_frame, window_features
+from utils import query
+from utils.save_model import save_model
+from utils.schema import PBP_SCHEMA, SPREADSPOKE_SCHEMA, apply_schema, frame_memory, memory_report
+from utils.team_state import replay_features
+
+# nflfastR team abbreviations
+TEAMS = [
+    'ARI', 'ATL', 'BAL', 'BUF', 'CAR', 'CHI', 'CIN', 'CLE',
+    'DAL', 'DEN', 'DET', 'GB', 'HOU', 'IND', 'JAX', 'KC',
+    'LA', 'LAC', 'LV', 'MIA', 'MIN', 'NE', 'NO', 'NYG',
+    'NYJ', 'PHI', 'PIT', 'SEA', 'SF', 'TB', 'TEN', 'WAS'
+]
+
+
+def make_synthetic_pbp(seasons, weeks=17, plays_per_game=170, seed=42):
+    """
+    Build a random play-by-play frame shaped like nflfastR's.
+
+    Every team plays once per week; values are random but have realistic
+    types, missing values and play type mix.
+
+    Args:
+        seasons: Seasons to generate
+        weeks: Regular season weeks per season
+        plays_per_game: Rows per game (including non-plays)
+        seed: Random seed
+
+    Returns:
+        pd.DataFrame: Synthetic play-by-play data
+    """
+    rng = np.random.default_rng(seed)
+    frames = []
+
+    for season in seasons:
+        # Random pairings each week
+        matchups = np.array([rng.permutation(TEAMS) for _ in range(weeks)]).reshape(-1, 2)
+        n_games = len(matchups)
+        game_weeks = np.repeat(np.arange(1, weeks + 1), len(TEAMS) // 2)
+        game_ids = np.array([
+            f"{season}_{week:02d}_{away}_{home}"
+            for week, (home, away) in zip(game_weeks, matchups)
+        ])
+
+        game = np.repeat(np.arange(n_games), plays_per_game)
+        n = len(game)
+        home = matchups[game, 0]
+        away = matchups[game, 1]
+        home_has_ball = rng.random(n) < 0.5
+
+        play_type = rng.choice(
+            np.array(['pass', 'run', 'punt', 'no_play', 'kickoff', None], dtype=object),
+            size=n, p=[0.42, 0.34, 0.05, 0.07, 0.06, 0.06]
+        )
+        is_pass = (play_type == 'pass').astype(float)
+        is_rush = (play_type == 'run').astype(float)
+        posteam = np.where(home_has_ball, home, away)
+        sack = is_pass * (rng.random(n) < 0.06)
+        complete = is_pass * (1 - sack) * (rng.random(n) < 0.65)
+        touchdown = (rng.random(n) < 0.03).astype(float)
+
+        down = np.where((is_pass == 1) | (is_rush == 1), rng.integers(1, 5, n), np.nan)
+        third_down_converted = (down == 3) & (rng.random(n) < 0.4)
+
+        # One quarterback, five receivers and two backs per team
+        passer = np.char.add(posteam.astype(str), '_QB1')
+        receiver = np.char.add(posteam.astype(str), np.char.add('_WR', rng.integers(1, 6, n).astype(str)))
+        rusher = np.where(rng.random(n) < 0.1, passer,
+                          np.char.add(posteam.astype(str), np.char.add('_RB', rng.integers(1, 3, n).astype(str))))
+        passer = np.where(is_pass == 1, passer, None)
+        receiver = np.where((is_pass == 1) & (sack == 0), receiver, None)
+        rusher = np.where(is_rush == 1, rusher, None)
+
+        epa = rng.normal(0, 1.4, n)
+        epa[rng.random(n) < 0.03] = np.nan
+        yards_gained = rng.integers(-8, 60, n).astype(float)
+        air_yards = np.where(is_pass == 1, rng.normal(8, 9, n).round(), np.nan)
+
+        frames.append(pd.DataFrame({
+            'game_id': game_ids[game],
+            'season': season,
+            'week': game_weeks[game],
+            'home_team': home,
+            'away_team': away,
+            'posteam': posteam,
+            'defteam': np.where(home_has_ball, away, home),
+            'play_type': play_type,
+            'epa': epa,
+            'success': np.where(np.isnan(epa), np.nan, (epa > 0).astype(float)),
+            'yards_gained': yards_gained,
+            'air_yards': air_yards,
+            'yards_after_catch': np.where(is_pass == 1, rng.exponential(5, n).round(), np.nan),
+            'pass_attempt': is_pass,
+            'rush_attempt': is_rush,
+            'complete_pass': complete,
+            'touchdown': touchdown,
+            'interception': is_pass * (rng.random(n) < 0.025),
+            'fumble_lost': (rng.random(n) < 0.008).astype(float),
+            'fumble_forced': (rng.random(n) < 0.012).astype(float),
+            'sack': sack,
+            'pass_touchdown': touchdown * complete,
+            'rush_touchdown': touchdown * is_rush,
+            'passer_player_id': passer,
+            'passer_player_name': passer,
+            'receiver_player_id': receiver,
+            'receiver_player_name': receiver,
+            'rusher_player_id': rusher,
+            'rusher_player_name': rusher,
+            'down': down,
+            'yardline_100': rng.integers(1, 100, n).astype(float),
+            'fixed_drive': rng.integers(1, 24, n).astype(float),
+            'wp': rng.random(n),
+            'half_seconds_remaining': rng.integers(0, 1800, n).astype(float),
+            'third_down_converted': third_down_converted.astype(float),
+            'third_down_failed': ((down == 3) & ~third_down_converted).astype(float),
+        }))
+
+    return pd.concat(frames, ignore_index=True)
+
+
+def make_synthetic_spreadspoke(pbp, seed=42):
+    """
+    Build a spreadspoke-style schedule for the games in a synthetic play-by-play frame.
+
+    Args:
+        pbp: Frame from make_synthetic_pbp
+        seed: Random seed
+
+    Returns:
+        pd.DataFrame: One row per game with spreadspoke's columns and dtypes
+    """
+    rng = np.random.default_rng(seed)
+    games = pbp.drop_duplicates('game_id')[['season', 'week', 'home_team', 'away_team']]
+    n = len(games)
+    seasons = games['season'].to_numpy()
+
+    def names(abbrs):
+        return [franchise_name(ABBR_TO_ID[abbr], season) for abbr, season in zip(abbrs, seasons)]
+
+    kickoff = pd.to_datetime([f"{season}-09-07" for season in seasons])
+    home_names = names(games['home_team'])
+
+    return apply_schema(pd.DataFrame({
+        'schedule_date': kickoff + pd.to_timedelta(7 * (games['week'].to_numpy() - 1), unit='D'),
+        'schedule_season': seasons,
+        'schedule_week': games['week'].astype(str).to_numpy(),
+        'schedule_playoff': False,
+        'team_home': home_names,
+        'score_home': rng.integers(0, 45, n),
+        'score_away': rng.integers(0, 45, n),
+        'team_away': names(games['away_team']),
+        'team_favorite_id': np.where(rng.random(n) < 0.6, games['home_team'], games['away_team']),
+        'spread_favorite': -rng.integers(0, 28, n) / 2,
+        'over_under_line': rng.integers(70, 110, n) / 2,
+        'stadium': [f"{name} Stadium" for name in home_names],
+        'stadium_neutral': False,
+        'weather_temperature': np.where(rng.random(n) < 0.3, np.nan, rng.integers(10, 95, n)),
+        'weather_wind_mph': np.where(rng.random(n) < 0.3, np.nan, rng.integers(0, 25, n)),
+        'weather_humidity': np.where(rng.random(n) < 0.3, np.nan, rng.integers(10, 100, n)),
+        'weather_detail': rng.choice(np.array([None, 'Rain', 'DOME', 'Snow', 'Fog'], dtype=object), n),
+    }), SPREADSPOKE_SCHEMA)
+
+
+def legacy_aggregate_team_stats(pbp_data):
+    """Reference implementation: one groupby per stat family, merged back together."""
+    plays = pbp_data[
+        (pbp_data['play_type'].isin(['run', 'pass'])) &
+        (pbp_data['epa'].notna())
+    ].copy()
+    plays['game_id'] = plays['game_id'].astype(str)
+
+    game_context = plays.groupby('game_id').agg({
+        'season': 'first', 'week': 'first', 'home_team': 'first', 'away_team': 'first'
+    }).reset_index()
+
+    offense_stats = plays.groupby(['game_id', 'posteam']).agg({
+        'epa': ['mean', 'sum', 'std'],
+        'success': 'mean',
+        'pass_attempt': 'sum',
+        'rush_attempt': 'sum',
+        'yards_gained': lambda x: (x >= 20).sum(),
+        'touchdown': 'sum',
+        'interception': 'sum',
+        'fumble_lost': 'sum'
+    }).reset_index()
+    offense_stats.columns = [
+        'game_id', 'team', 'epa_per_play', 'epa_total', 'epa_std', 'success_rate',
+        'pass_attempts', 'rush_attempts', 'explosive_plays', 'touchdowns',
+        'interceptions', 'fumbles_lost'
+    ]
+    offense_stats['turnovers'] = offense_stats['interceptions'] + offense_stats['fumbles_lost']
+
+    pass_plays = plays[plays['pass_attempt'] == 1].groupby(['game_id', 'posteam']).agg({
+        'epa': 'mean', 'success': 'mean', 'air_yards': 'mean',
+        'yards_after_catch': 'mean', 'complete_pass': 'mean'
+    }).reset_index()
+    pass_plays.columns = [
+        'game_id', 'team', 'pass_epa', 'pass_success_rate',
+        'avg_air_yards', 'avg_yac', 'completion_pct'
+    ]
+
+    rush_plays = plays[plays['rush_attempt'] == 1].groupby(['game_id', 'posteam']).agg({
+        'epa': 'mean', 'success': 'mean', 'yards_gained': 'mean'
+    }).reset_index()
+    rush_plays.columns = ['game_id', 'team', 'rush_epa', 'rush_success_rate', 'avg_rush_yards']
+
+    team_stats = offense_stats.merge(
+        pass_plays, on=['game_id', 'team'], how='left'
+    ).merge(
+        rush_plays, on=['game_id', 'team'], how='left'
+    )
+    fill_cols = ['pass_epa', 'pass_success_rate', 'avg_air_yards', 'avg_yac',
+                 'completion_pct', 'rush_epa', 'rush_success_rate', 'avg_rush_yards']
+    team_stats[fill_cols] = team_stats[fill_cols].fillna(0)
+
+    defense_stats = plays.groupby(['game_id', 'defteam']).agg({
+        'epa': 'mean', 'success': 'mean', 'sack': 'sum',
+        'interception': 'sum', 'fumble_forced': 'sum'
+    }).reset_index()
+    defense_stats.columns = [
+        'game_id', 'team', 'def_epa_allowed', 'def_success_rate_allowed',
+        'sacks', 'def_interceptions', 'forced_fumbles'
+    ]
+
+    team_stats = team_stats.merge(defense_stats, on=['game_id', 'team'], how='left')
+    team_stats['def_turnovers_created'] = (
+        team_stats['def_interceptions'] + team_stats['forced_fumbles']
+    )
+
+    return team_stats.merge(game_context, on='game_id', how='left')
+
+
+def reference_situational_splits(pbp_data):
+    """Reference for the situational splits: one filtered groupby per metric, joined."""
+    plays = pbp_data[
+        (pbp_data['play_type'].isin(['run', 'pass'])) &
+        (pbp_data['epa'].notna())
+    ]
+    keys = [plays['game_id'].astype(str), plays['posteam'].astype(str)]
+
+    def by_team(frame):
+        return frame.groupby([key[frame.index] for key in keys])
+
+    red_zone = plays[plays['yardline_100'] <= 20]
+    red_zone_td = red_zone[(red_zone['pass_touchdown'] == 1) | (red_zone['rush_touchdown'] == 1)]
+    early = plays[plays['down'] <= 2]
+    neutral = early[early['wp'].between(0.2, 0.8) & (early['half_seconds_remaining'] > 120)]
+
+    splits = pd.DataFrame({
+        'red_zone_trips': by_team(red_zone)['fixed_drive'].nunique(),
+        'red_zone_tds': by_team(red_zone_td)['fixed_drive'].nunique(),
+        'conversions': by_team(plays)['third_down_converted'].sum(),
+        'third_downs': by_team(plays)[['third_down_converted', 'third_down_failed']].sum().sum(axis=1),
+        'early_down_epa': by_team(early)['epa'].mean(),
+        'neutral_pass_rate': by_team(neutral)['pass_attempt'].mean(),
+    })
+    splits.index.names = ['game_id', 'team']
+    splits['red_zone_trips'] = splits['red_zone_trips'].fillna(0)
+    splits['red_zone_td_rate'] = splits['red_zone_tds'] / splits['red_zone_trips']
+    splits['third_down_conv_rate'] = splits['conversions'] / splits['third_downs']
+    return splits.fillna(0)
+
+
+def legacy_rolling_game_features(df, window):
+    """Reference implementation: one pass over the whole frame per team, written back with masks."""
+    names = ["avg_points", "avg_allowed", "win_pct", "rest_days", "momentum"]
+    rolling = pd.DataFrame(np.nan, index=df.index,
+                           columns=[f"{side}_{name}" for name in names for side in ["home", "away"]])
+
+    for team in pd.concat([df["team_home"], df["team_away"]]).unique():
+        home_mask = df["team_home"] == team
+        away_mask = df["team_away"] == team
+        team_mask = home_mask | away_mask
+        team_indices = df[team_mask].index
+
+        points_scored = np.where(home_mask, df["score_home"], np.where(away_mask, df["score_away"], np.nan))
+        points_allowed = np.where(home_mask, df["score_away"], np.where(away_mask, df["score_home"], np.nan))
+        won = ((home_mask & (df["score_home"] > df["score_away"])) |
+               (away_mask & (df["score_away"] > df["score_home"]))).astype(float)
+
+        scored = pd.Series(points_scored[team_mask], index=team_indices)
+        allowed = pd.Series(points_allowed[team_mask], index=team_indices)
+        team_won = pd.Series(won[team_mask], index=team_indices)
+
+        features = {
+            "avg_points": scored.shift(1).rolling(window, min_periods=1).mean(),
+            "avg_allowed": allowed.shift(1).rolling(window, min_periods=1).mean(),
+            "win_pct": team_won.shift(1).rolling(window, min_periods=1).mean(),
+            "rest_days": df.loc[team_indices, "schedule_date"].diff().dt.days,
+            "momentum": (scored.shift(1).rolling(window, min_periods=1).mean() -
+                         scored.shift(window + 1).rolling(window, min_periods=1).mean()),
+        }
+        for side, mask in [("home", home_mask & team_mask), ("away", away_mask & team_mask)]:
+            for name, values in features.items():
+                rolling.loc[mask, f"{side}_{name}"] = values[mask].values
+
+    return rolling
+
+
+def legacy_rolling_epa_features(df, window):
+    """Reference implementation of the rolling EPA metrics: the per-team loop, one metric at a time."""
+    stats = {"rolling_epa": "epa_per_play", "rolling_pass_epa": "pass_epa", "rolling_rush_epa": "rush_epa",
+             "rolling_success": "success_rate", "rolling_def_epa": "def_epa_allowed"}
+    rolling = pd.DataFrame(np.nan, index=df.index,
+                           columns=[f"{side}_{name}" for name in stats for side in ["home", "away"]])
+
+    for team in pd.concat([df["team_home"], df["team_away"]]).unique():
+        home_mask = df["team_home"] == team
+        away_mask = df["team_away"] == team
+        team_mask = home_mask | away_mask
+        team_indices = df[team_mask].index
+
+        for name, col in stats.items():
+            values = np.where(home_mask, df[f"home_{col}"], np.where(away_mask, df[f"away_{col}"], np.nan))
+            means = pd.Series(values[team_mask], index=team_indices).shift(1).rolling(window, min_periods=1).mean()
+            for side, mask in [("home", home_mask & team_mask), ("away", away_mask & team_mask)]:
+                rolling.loc[mask, f"{side}_{name}"] = means[mask].values
+
+    return rolling
+
+
+def add_synthetic_epa(games, first_season=2015, seed=42):
+    """Random home_/away_ nflfastR columns for a schedule, missing before first_season."""
+    rng = np.random.default_rng(seed)
+    games = games.copy()
+    missing = games["schedule_season"] < first_season
+    for home_col, away_col, _, _ in EPA_ROLLING_SPECS:
+        for col in [home_col, away_col]:
+            values = rng.normal(0, 0.15, len(games)).astype("float32")
+            games[col] = np.where(missing, np.nan, values).astype("float32")
+    return games
+
+
+def make_synthetic_schedule(seasons, seed=42):
+    """
+    Games only (no play-by-play): every team plays once a week, kickoffs
+    vary by a day and the last week is unplayed (missing scores).
+
+    Returns:
+        pd.DataFrame: schedule_date, schedule_season, team_home, team_away,
+                      score_home, score_away, sorted by date
+    """
+    rng = np.random.default_rng(seed)
+    frames = []
+    for season in seasons:
+        for week in range(1, 18):
+            order = rng.permutation(len(TEAMS))
+            n = len(TEAMS) // 2
+            frames.append(pd.DataFrame({
+                "schedule_season": season,
+                "week": week,
+                "team_home": np.array(TEAMS)[order[:n]],
+                "team_away": np.array(TEAMS)[order[n:]],
+                "score_home": rng.integers(0, 45, n).astype("float32"),
+                "score_away": rng.integers(0, 45, n).astype("float32"),
+            }))
+    games = pd.concat(frames, ignore_index=True)
+
+    # Sequential weeks from an arbitrary start keep every history length in range
+    first = seasons[0]
+    start = pd.Timestamp("1700-09-07")
+    games["schedule_date"] = start + pd.to_timedelta(
+        (games["schedule_season"] - first) * 365 + (games["week"] - 1) * 7
+        + rng.integers(0, 2, len(games)), unit="D"
+    )
+    last_week = games["schedule_season"].eq(seasons[-1]) & games["week"].eq(17)
+    games.loc[last_week, ["score_home", "score_away"]] = np.nan
+    return games.sort_values("schedule_date", kind="stable").reset_index(drop=True)
+
+
+def legacy_home_field_advantage(df):
+    """Previous implementation: one all-time value per team from two full-frame filters per team."""
+    home_advantage = {}
+    for team in pd.concat([df["team_home"], df["team_away"]]).unique():
+        home_games = df[df["team_home"] == team]
+        away_games = df[df["team_away"] == team]
+        home_advantage[team] = ((home_games["score_home"] > home_games["score_away"]).mean() -
+                                (away_games["score_away"] > away_games["score_home"]).mean())
+    return df["team_home"].map(home_advantage).astype(float)
+
+
+def reference_home_field_advantage(df, decay):
+    """Reference for the expanding advantage: weighted means over each game's earlier games."""
+    completed = df[df["score_home"].notna() & df["score_away"].notna()]
+    values = []
+    for position, game in enumerate(df.itertuples()):
+        earlier = completed[completed.index.isin(df.index[:position])]
+        weights = decay ** (game.schedule_season - earlier["schedule_season"])
+        home = earlier["team_home"] == game.team_home
+        away = earlier["team_away"] == game.team_home
+        home_won = earlier["score_home"] > earlier["score_away"]
+        away_won = earlier["score_away"] > earlier["score_home"]
+        if not home.any() or not away.any():
+            values.append(0.0)
+            continue
+        values.append((weights[home & home_won].sum() / weights[home].sum()) -
+                      (weights[away & away_won].sum() / weights[away].sum()))
+    return pd.Series(values, index=df.index)
+
+
+def reference_weekly_ratings(df, alpha, decay, season_decay):
+    """Reference for the weekly ratings: a dense weighted ridge fit from scratch before every week."""
+    home, away, n_teams = team_codes(df)
+    design, points, completed = design_matrix(df, home, away, n_teams)
+    design = design.toarray()
+    weeks = week_numbers(df["schedule_date"])
+    seasons = df["schedule_season"].to_numpy()
+    penalty = np.diag(np.r_[np.full(design.shape[1] - 1, alpha), 1e-6])
+
+    unique_weeks = np.unique(weeks)
+    row_week = np.repeat(np.searchsorted(unique_weeks, weeks), 2)
+    week_weights = np.zeros(len(unique_weeks))
+    solutions = np.zeros((len(df), design.shape[1]))
+    for i, week in enumerate(unique_weeks):
+        in_week = weeks == week
+        weights = completed * week_weights[row_week]
+        solutions[in_week] = np.linalg.solve(design.T @ (design * weights[:, None]) + penalty,
+                                             design.T @ (weights * points))
+        # Earlier weeks fade (more at a season start), then this week joins at full weight
+        new_season = i and seasons[in_week][0] != seasons[weeks == unique_weeks[i - 1]][0]
+        week_weights *= decay * (season_decay if new_season else 1.0)
+        week_weights[i] = 1.0
+    return solutions
+
+
+def time_call(func, *args, repeat=3, **kwargs):
+    """Best wall time of several calls, with the pipeline's progress prints silenced."""
+    best = float("inf")
+    result = None
+
+    for _ in range(repeat):
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            result = func(*args, **kwargs)
+            best = min(best, time.perf_counter() - start)
+
+    return best, result
+
+
+def report(name, baseline, candidate):
+    """Print a baseline vs candidate timing line."""
+    print(f"  {name:<40} {baseline * 1000:9.1f} ms -> {candidate * 1000:9.1f} ms "
+          f"({baseline / candidate:.1f}x)")
+
+
+def bench_aggregate():
+    """Single-pass aggregation kernel vs the five-groupby implementation on ten seasons."""
+    pbp = make_synthetic_pbp(range(2015, 2025))
+    print(f"aggregate_team_stats on {len(pbp):,} synthetic plays (10 seasons)")
+
+    # Equality with the groupby implementation is checked in tests/test_aggregate.py
+    legacy_time, _ = time_call(legacy_aggregate_team_stats, pbp)
+    kernel_time, _ = time_call(aggregate_team_stats, pbp, splits=False)
+    report("five groupbys + merges -> kernel", legacy_time, kernel_time)
+
+
+def bench_schema():
+    """Memory of the play-by-play frame before and after PBP_SCHEMA, and its effect on aggregation."""
+    pbp = make_synthetic_pbp(range(2015, 2025))
+    compact = apply_schema(pbp, PBP_SCHEMA)
+    memory_report("play-by-play (10 seasons)", frame_memory(pbp), frame_memory(compact))
+
+    raw_time, expected = time_call(aggregate_team_stats, pbp)
+    compact_time, result = time_call(aggregate_team_stats, compact)
+
+    # float32 metrics round slightly differently from float64
+    pd.testing.assert_frame_equal(result, expected, check_dtype=False, rtol=1e-4, atol=1e-4)
+    report("aggregate_team_stats raw -> schema", raw_time, compact_time)
+
+
+def bench_splits():
+    """Cost of the situational splits on top of the kernel."""
+    pbp = apply_schema(make_synthetic_pbp(range(2015, 2025)), PBP_SCHEMA)
+    print(f"aggregate_team_stats situational splits on {len(pbp):,} synthetic plays")
+
+    # The split values are checked against filtered groupbys in tests/test_aggregate.py
+    base_time, _ = time_call(aggregate_team_stats, pbp, splits=False)
+    splits_time, _ = time_call(aggregate_team_stats, pbp)
+
+    report("kernel -> kernel + situational splits", base_time, splits_time)
+    assert splits_time < 2 * base_time, "situational splits cost 2x the base aggregation or more"
+
+
+@contextlib.contextmanager
+def synthetic_store(seasons, **kwargs):
+    """Temporary working directory holding a synthetic play-by-play store."""
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            for season in seasons:
+                path = season_path(season)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                make_synthetic_pbp([season], seed=season, **kwargs).to_parquet(path, index=False)
+            yield tmp
+        finally:
+            os.chdir(cwd)
+
+
+def bench_parallel():
+    """Serial vs process-pool aggregation of twelve seasons read from the store."""
+    seasons = list(range(2013, 2025))
+    # Always exercise the pool, even on a single-core machine
+    n_jobs = max(os.cpu_count() or 1, 2)
+    print(f"aggregate_nflfastr_seasons on {len(seasons)} synthetic seasons, {os.cpu_count()} CPU(s)")
+
+    with synthetic_store(seasons):
+        # force_rebuild so every call aggregates instead of reading the team-game store
+        # (identical output of the two paths is checked in tests/test_aggregate.py)
+        serial_time, _ = time_call(
+            aggregate_nflfastr_seasons, seasons, offline=True, force_rebuild=True
+        )
+        parallel_time, _ = time_call(
+            aggregate_nflfastr_seasons, seasons, offline=True, force_rebuild=True, n_jobs=n_jobs
+        )
+
+    report(f"serial -> {n_jobs} process(es)", serial_time, parallel_time)
+
+
+def bench_query():
+    """One team's games and plays from the stores through the query layer vs loading and filtering in pandas."""
+    seasons = list(range(2019, 2025))
+    team, season = "KC", 2023
+    columns = ["game_id", "team", "week", "epa_per_play", "success_rate"]
+    engine = "duckdb" if query.DUCKDB_AVAILABLE else "pyarrow"
+    print(f"{team} {season} from a {len(seasons)}-season store ({engine})")
+
+    with synthetic_store(seasons):
+        with contextlib.redirect_stdout(io.StringIO()):
+            aggregate_nflfastr_seasons(seasons, offline=True)
+
+        def load_and_filter():
+            stats = read_store(seasons)
+            return stats.loc[(stats["season"] == season) & (stats["team"] == team), columns]
+
+        full_time, expected = time_call(load_and_filter)
+        query_time, result = time_call(query.team_games, season, teams=team, columns=columns)
+        result = result.sort_values(["game_id", "team"]).reset_index(drop=True)
+        pd.testing.assert_frame_equal(result, expected.reset_index(drop=True), check_exact=True)
+        report("team games: load store -> query", full_time, query_time)
+
+        def load_plays():
+            plays = pd.read_parquet(season_path(season))
+            third_downs = plays[(plays["posteam"] == team) & (plays["down"] == 3)]
+            return third_downs["epa"].mean()
+
+        def query_plays():
+            plays = query.play_by_play(season, teams=team, columns=["epa", "down"])
+            return plays.loc[plays["down"] == 3, "epa"].mean()
+
+        full_time, expected = time_call(load_plays)
+        query_time, result = time_call(query_plays)
+        assert np.isclose(result, expected), "query layer third-down EPA differs"
+        report("third-down EPA/play: load pbp -> query", full_time, query_time)
+
+
+def bench_backends():
+    """pandas vs Polars backend for the team-stat aggregation and the feature pipeline."""
+    if not POLARS_AVAILABLE:
+        print("polars not installed, skipping (pip install polars)")
+        return
+
+    use_copy_on_write()
+    pbp = make_synthetic_pbp(range(2015, 2025))
+    spreadspoke = make_synthetic_spreadspoke(pbp)
+    print(f"pandas vs polars on {len(pbp):,} synthetic plays, {len(spreadspoke):,} games")
+
+    # Equality of the two backends is checked in tests/test_backends.py
+    for label, plays in [("raw", pbp), ("schema", apply_schema(pbp, PBP_SCHEMA))]:
+        pandas_time, expected = time_call(aggregate_team_stats, plays)
+        polars_time, _ = time_call(aggregate_team_stats, plays, backend="polars")
+        report(f"aggregate_team_stats ({label})", pandas_time, polars_time)
+
+    merged = merge_with_spreadspoke(spreadspoke, expected)
+    merged = preprocess(merged, copy=False)
+    pandas_time, _ = time_call(encode_features, merged)
+    polars_time, _ = time_call(encode_features, merged, backend="polars")
+    report("encode_features", pandas_time, polars_time)
+
+
+def add_schedule_columns(pbp, spreadspoke):
+    """Game-level nflfastR columns (scores, lines, weather) matching a synthetic schedule."""
+    # make_synthetic_spreadspoke lists games in play-by-play order
+    games = pbp.drop_duplicates('game_id').reset_index(drop=True)
+    schedule = spreadspoke.reset_index(drop=True)
+    home_favored = schedule['team_favorite_id'].astype(str) == games['home_team']
+    spread = schedule['spread_favorite'].abs().to_numpy()
+    detail = schedule['weather_detail']
+    weather = (
+        detail.fillna('').astype(str) + ' Temp: 50° F, Humidity: ' +
+        schedule['weather_humidity'].map(lambda h: '' if pd.isna(h) else str(int(h))) + '%'
+    )
+
+    columns = pd.DataFrame({
+        'game_id': games['game_id'],
+        'game_date': schedule['schedule_date'].dt.strftime('%Y-%m-%d'),
+        'season_type': 'REG',
+        'location': 'Home',
+        'home_score': schedule['score_home'].astype(float),
+        'away_score': schedule['score_away'].astype(float),
+        'spread_line': np.where(home_favored, spread, -spread),
+        'total_line': schedule['over_under_line'].astype(float),
+        'stadium': schedule['stadium'].astype(str),
+        'roof': np.where(detail == 'DOME', 'dome', 'outdoors'),
+        'temp': schedule['weather_temperature'].astype(float),
+        'wind': schedule['weather_wind_mph'].astype(float),
+        'weather': weather,
+    })
+    return pbp.merge(columns, on='game_id', how='left')
+
+
+def bench_ingest():
+    """Weekly refresh: ingest_week vs rebuilding the stores and re-reading the CSV."""
+    season, last_week = 2024, 17
+    seasons = [2023, season]
+    print(f"ingest {season} week {last_week} into a {len(seasons)}-season store")
+
+    with synthetic_store(seasons[:1]):
+        pbp = make_synthetic_pbp([season], seed=season)
+        spreadspoke = make_synthetic_spreadspoke(pbp)
+        pbp = add_schedule_columns(pbp, spreadspoke)
+
+        os.makedirs(os.path.dirname(season_path(season)), exist_ok=True)
+
+        # State before the weekend: the season file and CSV stop at the previous week
+        earlier = make_synthetic_spreadspoke(make_synthetic_pbp(seasons[:1], seed=seasons[0]))
+        before = pd.concat([earlier, spreadspoke[spreadspoke['schedule_week'] != str(last_week)]])
+        after = pd.concat([earlier, spreadspoke])
+        before.to_csv(DATA_PATH, index=False, date_format='%m/%d/%Y')
+        pbp[pbp['week'] < last_week].to_parquet(season_path(season), index=False)
+        with contextlib.redirect_stdout(io.StringIO()):
+            aggregate_nflfastr_seasons(seasons, offline=True)
+            load_data()
+
+        # The new week lands in the season file
+        pbp.to_parquet(season_path(season), index=False)
+
+        def full_refresh():
+            after.to_csv(DATA_PATH, index=False, date_format='%m/%d/%Y')
+            aggregate_nflfastr_seasons(seasons, offline=True, force_rebuild=True)
+            return load_data()
+
+        full_time, expected_games = time_call(full_refresh, repeat=1)
+        expected_stats = read_store(seasons)
+
+        # Back to the pre-weekend stores, then ingest only the new week
+        before.to_csv(DATA_PATH, index=False, date_format='%m/%d/%Y')
+        with contextlib.redirect_stdout(io.StringIO()):
+            game_store.clear_store()
+            game_store.clear_store(game_store.PLAYER_GAMES_DIR)
+            pbp[pbp['week'] < last_week].to_parquet(season_path(season), index=False)
+            aggregate_nflfastr_seasons(seasons, offline=True)
+            pbp.to_parquet(season_path(season), index=False)
+            # Team state as of the previous week
+            refresh_team_state(load_data())
+
+        ingest_time, summary = time_call(ingest_week, season, last_week, offline=True, repeat=1)
+        report("rebuild stores + reload CSV -> ingest_week", full_time, ingest_time)
+
+        # Rolling team features: replay every game vs record the dirty teams' new games
+        with contextlib.redirect_stdout(io.StringIO()):
+            games = load_data()
+        replay_time, _ = time_call(replay_features, games, repeat=1)
+        refresh_time, _ = time_call(refresh_team_state, games, repeat=1)
+        report("replay team state -> refresh dirty teams", replay_time, refresh_time)
+
+        # Stores and CSV end up the same as after a full rebuild. Rows built from
+        # play-by-play call an even spread a pick'em.
+        pd.testing.assert_frame_equal(read_store(seasons), expected_stats, check_exact=True)
+        with contextlib.redirect_stdout(io.StringIO()):
+            games = load_data()
+        pick = (
+            (expected_games['schedule_season'] == season) &
+            (expected_games['schedule_week'] == str(last_week)) &
+            (expected_games['spread_favorite'] == 0)
+        )
+        expected_games['team_favorite_id'] = expected_games['team_favorite_id'].astype(str).mask(pick, 'PICK')
+
+        def in_order(frame):
+            frame = frame.assign(team_favorite_id=frame['team_favorite_id'].astype(str))
+            return frame.sort_values(['schedule_date', 'team_home']).reset_index(drop=True)
+
+        pd.testing.assert_frame_equal(in_order(games), in_order(expected_games),
+                                      check_exact=True, check_categorical=False)
+        assert summary["rows_added"] == len(after) - len(before)
+
+        # Ingesting the same week again changes nothing
+        with contextlib.redirect_stdout(io.StringIO()):
+            ingest_week(season, last_week, offline=True)
+            games_again = load_data()
+        pd.testing.assert_frame_equal(read_store(seasons), expected_stats, check_exact=True)
+        pd.testing.assert_frame_equal(games_again, games, check_exact=True)
+
+
+def bench_rolling():
+    """Grouped rolling engine vs the per-team masked loops, on 2002-2024 and a 10x history."""
+    # Equality with the loops is checked in tests/test_features.py
+    histories = [
+        ("2002-2024", list(range(MODERN_START_YEAR, 2025))),
+        ("10x history", list(range(2025 - 10 * (2025 - MODERN_START_YEAR), 2025))),
+    ]
+    for label, seasons in histories:
+        games = make_synthetic_schedule(seasons)
+        legacy_time, _ = time_call(legacy_rolling_game_features, games, ROLLING_WINDOW, repeat=1)
+        long_time, _ = time_call(rolling_game_features, games, ROLLING_WINDOW)
+        report(f"{label} ({len(games):,} games)", legacy_time, long_time)
+
+    # The EPA metrics share the same engine, driven by EPA_ROLLING_SPECS
+    games = add_synthetic_epa(make_synthetic_schedule(histories[0][1]))
+    legacy_time, _ = time_call(legacy_rolling_epa_features, games, ROLLING_WINDOW, repeat=1)
+    engine_time, _ = time_call(rolling_means, games, EPA_ROLLING_SPECS, ROLLING_WINDOW)
+    report(f"rolling EPA, {len(EPA_ROLLING_SPECS)} metrics", legacy_time, engine_time)
+
+
+def bench_windows():
+    """Windowed and EWM features for a window sweep: one cumulative-sum pass vs a rolling pass per window."""
+    games = add_synthetic_epa(make_synthetic_schedule(list(range(MODERN_START_YEAR, 2025))))
+    games = games.assign(
+        home_won=(games["score_home"] > games["score_away"]).astype(float),
+        away_won=(games["score_away"] > games["score_home"]).astype(float),
+    )
+    specs = GAME_ROLLING_SPECS + EPA_ROLLING_SPECS
+    print(f"{len(specs)} metrics x windows {SWEEP_WINDOWS} + EWM half-lives {SWEEP_HALFLIFES}, "
+          f"{len(games):,} games")
+
+    def per_window():
+        long = team_game_frame(games, {prefix: (home, away) for home, away, prefix, _ in specs})
+        prefixes = [prefix for _, _, prefix, _ in specs]
+        means = [previous_means(long, prefixes, window).add_suffix(f"_{window}") for window in SWEEP_WINDOWS]
+        previous = long[prefixes].astype(float).groupby(long["team"], sort=False).shift(1)
+        for halflife in SWEEP_HALFLIFES:
+            ewm = previous.groupby(long["team"], sort=False).ewm(halflife=halflife).mean()
+            means.append(ewm.droplevel(0).sort_index().add_suffix(f"_ewm{halflife}"))
+        return split_sides(pd.concat(means, axis=1), games.index)
+
+    rolling_time, expected = time_call(per_window)
+    prefix_time, result = time_call(window_features, games, specs, SWEEP_WINDOWS, SWEEP_HALFLIFES)
+    fills = {f"{side}_{prefix}_{suffix}": fill for _, _, prefix, fill in specs for side in ["home", "away"]
+             for suffix in [*map(str, SWEEP_WINDOWS), *[f"ewm{h}" for h in SWEEP_HALFLIFES]]}
+    pd.testing.assert_frame_equal(result, expected.fillna(fills)[result.columns], rtol=1e-9, atol=1e-9)
+    report(f"{len(SWEEP_WINDOWS)} windows + {len(SWEEP_HALFLIFES)} EWM", rolling_time, prefix_time)
+
+    # ROLLING_WINDOW itself agrees with the features the model is trained on
+    base = rolling_means(games, specs, ROLLING_WINDOW)
+    windowed = result[[f"{col}_{ROLLING_WINDOW}" for col in base.columns]].set_axis(base.columns, axis=1)
+    pd.testing.assert_frame_equal(windowed, base.fillna(windowed), rtol=1e-9, atol=1e-9)
+
+
+def bench_team_state():
+    """Online TeamState: replay of all history, and one week's update vs recomputing."""
+    use_copy_on_write()
+    pbp = make_synthetic_pbp(range(2015, 2025))
+    spreadspoke = make_synthetic_spreadspoke(pbp)
+    with contextlib.redirect_stdout(io.StringIO()):
+        merged = preprocess(merge_with_spreadspoke(spreadspoke, aggregate_team_stats(pbp)), copy=False)
+    print(f"replaying {len(merged):,} games through TeamState")
+
+    # Replay vs batch equality and persistence are checked in tests/test_team_state.py
+    replay_time, _ = time_call(replay_features, merged, repeat=1)
+    print(f"  {'replay of all history':<40} {replay_time * 1000:9.1f} ms")
+    last_week = merged[merged['schedule_date'] == merged['schedule_date'].max()]
+
+    # A new week: recompute the rolling features for all history vs record 16 games
+    history = merged[merged['schedule_date'] < last_week['schedule_date'].min()]
+    _, before = replay_features(history)
+
+    def recompute():
+        return add_rolling_epa_features(add_rolling_features(merged))
+
+    def record_week():
+        week_state = pickle.loads(snapshot)
+        week_state.update(merged)
+        return [week_state.game_features(home, away, date)
+                for home, away, date in zip(last_week['team_home'], last_week['team_away'],
+                                            last_week['schedule_date'] + pd.Timedelta(days=7))]
+
+    snapshot = pickle.dumps(before)
+    batch_time, _ = time_call(recompute)
+    update_time, _ = time_call(record_week)
+    report(f"new week ({len(last_week)} games): recompute -> TeamState", batch_time, update_time)
+
+
+def bench_home_advantage():
+    """Expanding leak-free home field advantage vs the all-time per-team loop."""
+    # The earlier-games-only check is in tests/test_home_advantage.py
+    games = make_synthetic_schedule(list(range(MODERN_START_YEAR, 2025)))
+    print(f"home field advantage on {len(games):,} games")
+
+    legacy_time, _ = time_call(legacy_home_field_advantage, games)
+    expanding_time, _ = time_call(expanding_home_field_advantage, games)
+    report("all-time per-team loop -> expanding", legacy_time, expanding_time)
+
+
+def bench_ratings():
+    """Weekly opponent-adjusted ratings: sparse decayed normal equations with warm-started CG vs dense refits."""
+    games = make_synthetic_schedule(list(range(MODERN_START_YEAR, 2025)))
+    n_weeks = len(np.unique(week_numbers(games["schedule_date"])))
+    print(f"ratings for {len(games):,} games, {n_weeks} weekly solves")
+
+    # Agreement with the dense refits, point-in-time use and strength
+    # recovery are checked in tests/test_ratings.py
+    dense_time, _ = time_call(reference_weekly_ratings, games, RIDGE_ALPHA, WEEKLY_DECAY,
+                              SEASON_DECAY, repeat=1)
+    sparse_time, _ = time_call(weekly_ratings, games)
+    report("dense refit per week -> sparse CG", dense_time, sparse_time)
+
+
+def bench_manifest():
+    """Data manifest: warm-start stat check vs hashing every file, and truncated-file detection."""
+    seasons = list(range(2019, 2025))
+    print(f"data manifest over a {len(seasons)}-season store ({'xxhash' if data_manifest.XXHASH_AVAILABLE else 'blake2b'})")
+
+    with synthetic_store(seasons):
+        pbp = make_synthetic_pbp(seasons[-1:], seed=seasons[-1])
+        make_synthetic_spreadspoke(pbp).to_csv(DATA_PATH, index=False, date_format='%m/%d/%Y')
+        with contextlib.redirect_stdout(io.StringIO()):
+            aggregate_nflfastr_seasons(seasons, offline=True)
+
+        def cold_start():
+            if os.path.exists(data_manifest.MANIFEST_PATH):
+                os.remove(data_manifest.MANIFEST_PATH)
+            return data_manifest.update_manifest()
+
+        cold_time, manifest = time_call(cold_start)
+        warm_time, warm = time_call(data_manifest.update_manifest)
+        full_time, problems = time_call(data_manifest.verify_manifest, full=True)
+        assert warm == manifest and not problems, "warm manifest differs from a full rebuild"
+        assert manifest[os.path.relpath(season_path(2024), "data")]["rows"] == len(pbp)
+        report("hash every file -> stat check", cold_time, warm_time)
+        report("verify: full re-hash -> stat check", full_time,
+               time_call(data_manifest.verify_manifest)[0])
+
+        # Touching a file re-hashes it but leaves the data (and its hash) the same
+        path = season_path(2024)
+        os.utime(path, ns=(0, 0))
+        with contextlib.redirect_stdout(io.StringIO()):
+            touched = data_manifest.update_manifest()
+        assert data_manifest.manifest_hash(touched) == data_manifest.manifest_hash(manifest)
+
+        # The hash is recorded in saved models
+        with contextlib.redirect_stdout(io.StringIO()):
+            model_path = save_model(None, None, model_dir="saved_models")
+        with open(model_path, "rb") as f:
+            assert pickle.load(f)["data_manifest_hash"] == data_manifest.manifest_hash(touched)
+
+        # An interrupted copy of a season file is caught before aggregation
+        with open(path, "r+b") as f:
+            f.truncate(os.path.getsize(path) // 2)
+        assert data_manifest.verify_manifest() == {os.path.relpath(path, "data"): "size changed"}
+        with contextlib.redirect_stdout(io.StringIO()):
+            assert unreadable_seasons(seasons) == [2024], "truncated season not detected"
+            try:
+                sync_nflfastr_store(seasons, offline=True)
+            except ValueError:
+                pass
+            else:
+                raise AssertionError("offline sync accepted a truncated season")
+        print("✓ truncated season file detected")
+
+
+def run_pipeline(spreadspoke, team_stats):
+    """The main.py feature pipeline from merged data to the model matrix."""
+    df = merge_with_spreadspoke(spreadspoke, team_stats)
+    df = preprocess(df, copy=False)
+    return encode_features(df)
+
+
+def bench_memory():
+    """Peak memory of the feature pipeline relative to the frame it produces."""
+    use_copy_on_write()
+    pbp = make_synthetic_pbp(range(2015, 2025))
+    spreadspoke = make_synthetic_spreadspoke(pbp)
+    _, team_stats = time_call(aggregate_team_stats, apply_schema(pbp, PBP_SCHEMA), repeat=1)
+    del pbp
+    print(f"merge -> preprocess -> encode_features on {len(spreadspoke):,} synthetic games")
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        # Warm-up run so one-off allocations (imports, caches) aren't counted
+        run_pipeline(spreadspoke, team_stats)
+        tracemalloc.start()
+        X, y, df = run_pipeline(spreadspoke, team_stats)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    final = frame_memory(df)
+    # The peak memory limit is checked in tests/test_memory.py
+    print(f"  final frame {final / 1e6:.1f} MB, peak traced {peak / 1e6:.1f} MB ({peak / final:.1f}x)")
+
+
+# Optional dependencies main.py used to import at startup
+LAZY_MODULES = ["nfl_data_py", "xgboost", "lightgbm", "pyarrow.feather", "polars"]
+
+
+def time_import(code, repeat=5):
+    """Best wall time of running code in a fresh interpreter."""
+    here = os.path.dirname(os.path.abspath(__file__))
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], cwd=here, check=True, capture_output=True)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def bench_imports():
+    """Startup import time of main.py with lazy optional imports vs importing them eagerly."""
+    installed = [name for name in LAZY_MODULES if is_available(name)]
+    print(f"import main (installed optional packages: {', '.join(installed) or 'none'})")
+
+    # Importing main must not import any of the optional packages
+    check = (
+        "import sys, main; "
+        f"loaded = [m for m in {LAZY_MODULES!r} if m in sys.modules]; "
+        "assert not loaded, loaded"
+    )
+    subprocess.run([sys.executable, "-c", check], check=True,
+                   cwd=os.path.dirname(os.path.abspath(__file__)))
+
+    eager = "import main; " + "; ".join(f"import {name}" for name in installed)
+    eager_time = time_import(eager)
+    lazy_time = time_import("import main")
+    report("eager optional imports -> lazy", eager_time, lazy_time)
+
+
+BENCHMARKS = {
+    "aggregate": bench_aggregate,
+    "schema": bench_schema,
+    "splits": bench_splits,
+    "parallel": bench_parallel,
+    "query": bench_query,
+    "backends": bench_backends,
+    "ingest": bench_ingest,
+    "rolling": bench_rolling,
+    "windows": bench_windows,
+    "team_state": bench_team_state,
+    "home_advantage": bench_home_advantage,
+    "ratings": bench_ratings,
+    "manifest": bench_manifest,
+    "imports": bench_imports,
+    "memory": bench_memory,
+}
+
+
+if __name__ == "__main__":
+    names = sys.argv[1:] or list(BENCHMARKS)
+    for name in names:
+        BENCHMARKS[name]()
+        print()
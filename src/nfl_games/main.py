@@ -7,16 +7,32 @@ Brendan Dileo, October 2025
 """
 
 from utils.load_data import load_data_with_nflfastr
-from utils.preprocess import preprocess
-from utils.features import encode_features
-from models.train_model import train_model
+from utils.preprocess import preprocess, use_copy_on_write
+from utils.features import SWEEP_WINDOWS, encode_features, feature_params, window_variants
+from utils.stage_cache import cached_stage
+from models.train_model import train_model, window_sweep
 from models.predict import interactive_predict, predict_current_week
 from models.ensemble import create_ensemble
 from utils.save_model import save_model, load_model, get_latest_model, list_saved_models
 from sklearn.preprocessing import LabelEncoder
 import pandas as pd
 
+# Execution backend for aggregation and rolling features: "pandas", or "polars"
+# to run them as multi-threaded Polars queries (needs pip install polars)
+BACKEND = "pandas"
+
+# Add opponent-adjusted team ratings (weekly ridge fits, see utils/ratings.py) as features.
+# Evaluation only: the prediction input doesn't build ratings, so such a model
+# is neither saved nor used for predictions
+RATINGS = False
+
+# Compare rolling window sizes (SWEEP_WINDOWS and EWM variants) before training
+WINDOW_SWEEP = False
+
 def main():
+    # Pipeline stages add columns to frames they own instead of copying them
+    use_copy_on_write()
+    
     print("="*60)
     print("NFL Game Predictor - WITH nflfastR EPA DATA")
     print("="*60)
@@ -36,11 +52,12 @@ def main():
             df = load_data_with_nflfastr(
                 seasons=list(range(2015, 2025)),
                 cache=True,
-                use_nflfastr=True
+                use_nflfastr=True,
+                backend=BACKEND
             )
             if df is None:
                 return
-            df = preprocess(df)
+            df = preprocess(df, copy=False)
             
             print("\n✓ Model loaded successfully! Ready for predictions.")
             
@@ -67,17 +84,24 @@ def main():
     df = load_data_with_nflfastr(
         seasons=list(range(2015, 2025)),
         cache=True,
-        use_nflfastr=use_nflfastr
+        use_nflfastr=use_nflfastr,
+        backend=BACKEND
     )
     
     if df is None:
         return
     
-    # Preprocess
-    df = preprocess(df)
+    # Preprocess (one vectorized comparison, cheaper than hashing and
+    # reading a cache entry, so it isn't cached)
+    df = preprocess(df, copy=False)
     
-    # Feature engineering (returns df for time-based splitting)
-    X, y, df_processed = encode_features(df)
+    # Feature engineering (returns df for time-based splitting), reused from
+    # the stage cache when the data, parameters and feature code are unchanged
+    windows = SWEEP_WINDOWS if WINDOW_SWEEP else None
+    X, y, df_processed = cached_stage(
+        encode_features, df, feature_params(df, BACKEND, windows, RATINGS),
+        kwargs={"backend": BACKEND, "windows": windows, "ratings": RATINGS}
+    )
     
     # If we have EPA data, filter to games with EPA features (2015+)
     if use_nflfastr and 'home_rolling_epa' in df_processed.columns:
@@ -100,6 +124,10 @@ def main():
     for i, col in enumerate(X.columns, 1):
         print(f"  {i:2d}. {col}")
     
+    if WINDOW_SWEEP:
+        sweep = window_sweep(X, y, df_processed, window_variants(df_processed), test_seasons=2)
+        print(f"\nBest window: {sweep.index[0]}")
+    
     # Create encoder for predictions
     all_teams = pd.concat([df["team_home"], df["team_away"]]).unique()
     encoder = LabelEncoder()
@@ -128,6 +156,11 @@ def main():
     print("TRAINING COMPLETE!")
     print("="*60)
     
+    if RATINGS:
+        print("\n⚠ Trained with RATINGS (evaluation only): create_prediction_input doesn't build "
+              "rating features, so this model is not saved or used for predictions")
+        return
+    
     # Ask to save model
     save_choice = input("\nSave this model for future use? (y/n, default=y): ").strip().lower()
     if save_choice != 'n':
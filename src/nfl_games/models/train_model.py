@@ -15,23 +15,47 @@ from sklearn.ensemble import RandomForestClassifier
 from sklearn.metrics import accuracy_score, classification_report, roc_auc_score
 from sklearn.model_selection import GridSearchCV, TimeSeriesSplit
 
-# Try to import XGBoost and LightGBM (install with: pip install xgboost lightgbm)
-try:
-    import xgboost as xgb
-    XGBOOST_AVAILABLE = True
-except (ImportError, Exception) as e:
-    XGBOOST_AVAILABLE = False
-    print(f"XGBoost not available: {str(e)[:100]}")
-    print("Install with: pip install xgboost")
-    print("Mac users may also need: brew install libomp")
-
-try:
-    import lightgbm as lgb
-    LIGHTGBM_AVAILABLE = True
-except (ImportError, Exception) as e:
-    LIGHTGBM_AVAILABLE = False
-    print(f"LightGBM not available: {str(e)[:100]}")
-    print("Install with: pip install lightgbm")
+from utils.features import window_variant
+from utils.lazy_import import is_available, lazy_import
+
+# XGBoost and LightGBM are optional (install with: pip install xgboost lightgbm).
+# They are only imported when a model is trained, not when this module is.
+XGBOOST_AVAILABLE = is_available("xgboost")
+LIGHTGBM_AVAILABLE = is_available("lightgbm")
+xgb = lazy_import("xgboost")
+lgb = lazy_import("lightgbm")
+
+
+def load_booster(module, name, installed, install_hints):
+    """
+    Import an optional boosting library, reporting why if it can't be used.
+    
+    A package that isn't installed is skipped without an import attempt.
+    One that is installed can still fail to import (e.g. XGBoost without
+    libomp on a Mac), so availability is only settled here.
+    
+    Args:
+        module: LazyModule for the library
+        name: Display name
+        installed: Whether the package is installed (XGBOOST_AVAILABLE, ...)
+        install_hints: Lines to print if the library can't be used
+        
+    Returns:
+        bool: True if the library imported
+    """
+    if installed:
+        try:
+            module.load()
+            return True
+        except Exception as e:
+            reason = str(e)[:100]
+    else:
+        reason = "not installed"
+
+    print(f"{name} not available: {reason}")
+    for hint in install_hints:
+        print(hint)
+    return False
 
 
 def time_based_split(X, y, df, test_seasons=1):
@@ -167,6 +191,49 @@ def evaluate_model(model, X_test, y_test, model_name="Model"):
     return acc, auc
 
 
+def window_sweep(X, y, df, variants, test_seasons=2):
+    """
+    Compare rolling window sizes using a single feature build.
+    
+    For each variant the per-team rolling columns of X are swapped for the
+    matching windowed columns in df (keeping their names), the difference and
+    interaction features built from them are recomputed, and a Random Forest
+    is trained and scored on the same time-based split.
+    
+    Args:
+        X (pd.DataFrame): Feature matrix from encode_features(..., windows=...)
+        y (pd.Series): Target labels
+        df (pd.DataFrame): Frame from the same call, holding the windowed columns
+        variants (dict): Label -> {feature column: windowed column}, see
+            features.window_variants
+        test_seasons (int): Number of recent seasons to use for testing
+        
+    Returns:
+        pd.DataFrame: Accuracy and ROC-AUC per variant ("base" = X as is), best first
+    """
+    X_train, X_test, y_train, y_test = time_based_split(X, y, df, test_seasons=test_seasons)
+    is_train = X.index.isin(X_train.index)
+    
+    print("\n" + "="*50)
+    print(f"Window sweep over {len(variants)} variant(s)...")
+    print("="*50)
+    
+    results = {}
+    for label, swaps in {"base": {}, **variants}.items():
+        variant = window_variant(df, swaps)
+        X_variant = X.assign(**{col: variant[col] for col in variant.columns if col in X.columns})
+        model = train_random_forest(X_variant[is_train], y_train, X_variant[~is_train], y_test)
+        probs = model.predict_proba(X_variant[~is_train])[:, 1]
+        results[label] = {
+            'accuracy': accuracy_score(y_test, probs > 0.5),
+            'auc': roc_auc_score(y_test, probs),
+        }
+        print(f"  {label:>6}: accuracy {results[label]['accuracy'] * 100:.2f}%, "
+              f"ROC-AUC {results[label]['auc']:.4f}")
+    
+    return pd.DataFrame(results).T.sort_values('accuracy', ascending=False)
+
+
 def train_model(X, y, df, tune_rf=False, test_seasons=2):
     """
     Trains multiple models and compares their performance.
@@ -204,7 +271,10 @@ def train_model(X, y, df, tune_rf=False, test_seasons=2):
     print(feature_importances.head(10))
     
     # Train XGBoost if available
-    if XGBOOST_AVAILABLE:
+    if load_booster(xgb, "XGBoost", XGBOOST_AVAILABLE, [
+        "Install with: pip install xgboost",
+        "Mac users may also need: brew install libomp",
+    ]):
         print("\n" + "="*50)
         print("Training XGBoost...")
         print("="*50)
@@ -214,7 +284,7 @@ def train_model(X, y, df, tune_rf=False, test_seasons=2):
         results['XGBoost'] = {'accuracy': acc, 'auc': auc}
     
     # Train LightGBM if available
-    if LIGHTGBM_AVAILABLE:
+    if load_booster(lgb, "LightGBM", LIGHTGBM_AVAILABLE, ["Install with: pip install lightgbm"]):
         print("\n" + "="*50)
         print("Training LightGBM...")
         print("="*50)
@@ -0,0 +1,141 @@
+"""
+csv_cache.py
+Typed binary cache for CSV files.
+
+The first read of a CSV parses it, applies a dtype schema and writes the result
+next to it as an uncompressed Feather file. Later reads memory-map that file
+instead of parsing, as long as the CSV's size, mtime and content hash (and the
+schema) are unchanged.
+
+Brendan Dileo, October 2026
+"""
+
+import hashlib
+import json
+import os
+
+import pandas as pd
+
+from utils.lazy_import import is_available, lazy_import
+from utils.schema import apply_schema
+
+# pyarrow is needed to write and map Feather files, imported on first use
+PYARROW_AVAILABLE = is_available("pyarrow")
+feather = lazy_import("pyarrow.feather")
+
+
+def sidecar_paths(csv_path):
+    """Feather file and its metadata file for a CSV."""
+    base, _ = os.path.splitext(csv_path)
+    return base + ".feather", base + ".feather.json"
+
+
+def file_hash(path):
+    """SHA-256 of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def schema_hash(schema):
+    """Stable fingerprint of a schema, so schema edits invalidate the cache."""
+    return hashlib.sha256(repr(sorted((k, str(v)) for k, v in schema.items())).encode()).hexdigest()
+
+
+def is_fresh(csv_path, schema):
+    """
+    Check whether the sidecar still matches the CSV.
+
+    Size and mtime are compared first. If only the mtime moved (e.g. the file
+    was copied or touched), the content hash decides, and a match refreshes
+    the recorded mtime so the next check is a plain stat again.
+    """
+    feather_path, meta_path = sidecar_paths(csv_path)
+    if not (os.path.exists(feather_path) and os.path.exists(meta_path)):
+        return False
+
+    with open(meta_path, "r") as f:
+        meta = json.load(f)
+
+    stat = os.stat(csv_path)
+    if meta.get("schema") != schema_hash(schema) or meta.get("size") != stat.st_size:
+        return False
+    if meta.get("mtime_ns") == stat.st_mtime_ns:
+        return True
+
+    if meta.get("sha256") != file_hash(csv_path):
+        return False
+
+    meta["mtime_ns"] = stat.st_mtime_ns
+    _write_meta(meta_path, meta)
+    return True
+
+
+def _write_meta(meta_path, meta):
+    """Write sidecar metadata atomically."""
+    tmp_path = meta_path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(meta, f, indent=2)
+    os.replace(tmp_path, meta_path)
+
+
+def write_sidecar(df, csv_path, schema):
+    """Store a typed frame as the CSV's Feather sidecar."""
+    feather_path, meta_path = sidecar_paths(csv_path)
+    stat = os.stat(csv_path)
+
+    tmp_path = feather_path + ".tmp"
+    df.reset_index(drop=True).to_feather(tmp_path, compression="uncompressed")
+    os.replace(tmp_path, feather_path)
+
+    _write_meta(meta_path, {
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "sha256": file_hash(csv_path),
+        "schema": schema_hash(schema),
+    })
+
+
+def read_sidecar(csv_path):
+    """Memory-map a CSV's Feather sidecar into a DataFrame."""
+    feather_path, _ = sidecar_paths(csv_path)
+    return feather.read_table(feather_path, memory_map=True).to_pandas()
+
+
+def read_csv_cached(csv_path, schema, use_cache=True):
+    """
+    Read a CSV with a dtype schema applied, through the binary cache.
+
+    Args:
+        csv_path: CSV file to read
+        schema: Schema passed to apply_schema
+        use_cache: Whether to use (and write) the Feather sidecar
+
+    Returns:
+        pd.DataFrame: Typed frame
+
+    Raises:
+        FileNotFoundError: If the CSV does not exist
+    """
+    if not os.path.exists(csv_path):
+        raise FileNotFoundError(csv_path)
+
+    use_cache = use_cache and PYARROW_AVAILABLE
+
+    if use_cache and is_fresh(csv_path, schema):
+        try:
+            return read_sidecar(csv_path)
+        except Exception as e:
+            print(f"⚠ Could not read cached {csv_path} ({e}), parsing CSV instead")
+
+    df = apply_schema(pd.read_csv(csv_path), schema)
+
+    if use_cache:
+        try:
+            write_sidecar(df, csv_path, schema)
+        except (OSError, ValueError) as e:
+            print(f"⚠ Could not cache {csv_path}: {e}")
+
+    return df
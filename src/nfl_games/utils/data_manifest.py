@@ -0,0 +1,248 @@
+"""
+data_manifest.py
+Manifest of the local data assets a model is trained on.
+
+Every CSV and Parquet file under data/ gets an entry with its size, modification
+time, content hash, row count and schema fingerprint. Refreshing the manifest only
+hashes files whose size or mtime changed since the last run, so a warm start costs
+one stat per file; verify_manifest(full=True) re-hashes everything on demand. The
+hash of the whole manifest identifies the exact data a model saw and is stored in
+saved models. Parquet files whose footer can't be read (e.g. a truncated download)
+are reported as corrupt instead of failing later inside the aggregation.
+
+Uses xxhash when installed, otherwise BLAKE2b from the standard library.
+
+Brendan Dileo, October 2026
+"""
+
+import hashlib
+import json
+import os
+
+from utils.lazy_import import is_available, lazy_import
+
+# xxhash is much faster than the hashlib fallback on large Parquet files
+XXHASH_AVAILABLE = is_available("xxhash")
+xxhash = lazy_import("xxhash")
+pq = lazy_import("pyarrow.parquet")
+
+# Data location and manifest file
+DATA_DIR = "data"
+MANIFEST_PATH = os.path.join(DATA_DIR, "data_manifest.json")
+
+# Files tracked by the manifest (caches, sidecars and partial downloads are not)
+ASSET_EXTENSIONS = (".csv", ".parquet")
+
+CHUNK_SIZE = 1 << 20
+
+
+def new_hasher():
+    """Streaming hasher: xxh3-128 if available, otherwise BLAKE2b-128."""
+    if XXHASH_AVAILABLE:
+        return "xxh3_128", xxhash.xxh3_128()
+    return "blake2b", hashlib.blake2b(digest_size=16)
+
+
+def hash_file(path):
+    """
+    Content hash of a file.
+
+    Returns:
+        str: "<algorithm>:<hex digest>"
+    """
+    algorithm, digest = new_hasher()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return f"{algorithm}:{digest.hexdigest()}"
+
+
+def fingerprint(text):
+    """Short stable hash of a schema description."""
+    return hashlib.sha256(text.encode()).hexdigest()[:16]
+
+
+def file_shape(path):
+    """
+    Row count and schema fingerprint of a data file.
+
+    Parquet files are described from their footer; CSVs from their header
+    line and line count.
+
+    Raises:
+        ValueError: If a Parquet footer can't be read (truncated or corrupt file)
+    """
+    if path.endswith(".parquet"):
+        try:
+            metadata = pq.ParquetFile(path).metadata
+        except Exception as e:
+            raise ValueError(f"{path} is not a readable Parquet file (truncated download?): {e}") from e
+        schema = metadata.schema.to_arrow_schema()
+        return metadata.num_rows, fingerprint(repr([(field.name, str(field.type)) for field in schema]))
+
+    with open(path, "rb") as f:
+        header = f.readline()
+        rows = sum(chunk.count(b"\n") for chunk in iter(lambda: f.read(CHUNK_SIZE), b""))
+    return rows, fingerprint(header.decode(errors="replace").strip())
+
+
+def describe_file(path):
+    """Manifest entry for one file (hashes the whole file)."""
+    stat = os.stat(path)
+    rows, schema = file_shape(path)
+    return {
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "hash": hash_file(path),
+        "rows": rows,
+        "schema": schema,
+    }
+
+
+def asset_paths(data_dir=DATA_DIR):
+    """Relative paths of every tracked data file, sorted."""
+    paths = []
+    for root, _, files in os.walk(data_dir):
+        for name in files:
+            if name.endswith(ASSET_EXTENSIONS):
+                paths.append(os.path.relpath(os.path.join(root, name), data_dir))
+    return sorted(path.replace(os.sep, "/") for path in paths)
+
+
+def load_manifest(path=MANIFEST_PATH):
+    """Load the data manifest as a dict of relative path -> entry."""
+    if not os.path.exists(path):
+        return {}
+
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def save_manifest(manifest, path=MANIFEST_PATH):
+    """Write the data manifest atomically."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def is_unchanged(path, entry):
+    """Cheap check: a file whose size and mtime match its entry is assumed unchanged."""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return False
+    return stat.st_size == entry.get("size") and stat.st_mtime_ns == entry.get("mtime_ns")
+
+
+def update_manifest(data_dir=DATA_DIR, path=MANIFEST_PATH):
+    """
+    Bring the manifest in line with the files on disk.
+
+    Files that still match their entry by stat keep it without being read;
+    new and modified files are hashed and described; deleted files are
+    dropped. Unreadable Parquet files are left out and reported.
+
+    Args:
+        data_dir: Data directory to scan
+        path: Manifest file
+
+    Returns:
+        dict: The updated manifest
+    """
+    old = load_manifest(path)
+    manifest = {}
+    described = 0
+
+    for rel_path in asset_paths(data_dir):
+        full_path = os.path.join(data_dir, rel_path)
+        entry = old.get(rel_path)
+        if entry is not None and is_unchanged(full_path, entry):
+            manifest[rel_path] = entry
+            continue
+
+        try:
+            manifest[rel_path] = describe_file(full_path)
+            described += 1
+        except ValueError as e:
+            print(f"⚠ {e}")
+
+    if manifest != old:
+        save_manifest(manifest, path)
+    if described:
+        print(f"✓ Data manifest: {described} new or changed file(s) hashed, {len(manifest)} tracked")
+
+    return manifest
+
+
+def verify_manifest(data_dir=DATA_DIR, path=MANIFEST_PATH, full=False):
+    """
+    Check the files on disk against the manifest.
+
+    By default only size and mtime are compared. With full=True every file
+    is re-hashed, which also catches in-place edits that preserved both.
+
+    Args:
+        data_dir: Data directory
+        path: Manifest file
+        full: Re-hash every file instead of trusting stat
+
+    Returns:
+        dict: Relative path -> problem ("missing", "size changed", "modified",
+              "corrupt", "untracked"); empty if everything matches
+    """
+    manifest = load_manifest(path)
+    problems = {}
+
+    for rel_path, entry in manifest.items():
+        full_path = os.path.join(data_dir, rel_path)
+        if not os.path.exists(full_path):
+            problems[rel_path] = "missing"
+        elif os.path.getsize(full_path) != entry["size"]:
+            problems[rel_path] = "size changed"
+        elif full or not is_unchanged(full_path, entry):
+            if hash_file(full_path) != entry["hash"]:
+                problems[rel_path] = "modified"
+
+    for rel_path in asset_paths(data_dir):
+        if rel_path not in manifest:
+            try:
+                file_shape(os.path.join(data_dir, rel_path))
+                problems[rel_path] = "untracked"
+            except ValueError:
+                problems[rel_path] = "corrupt"
+
+    return problems
+
+
+def check_parquet(path, data_dir=DATA_DIR, manifest=None):
+    """
+    Fail early on a truncated or corrupt Parquet file.
+
+    A file that matches its manifest entry by stat was readable when it was
+    recorded and is trusted; anything else has its footer read.
+
+    Raises:
+        ValueError: If the file's footer can't be read
+    """
+    manifest = load_manifest() if manifest is None else manifest
+    rel_path = os.path.relpath(path, data_dir).replace(os.sep, "/")
+    entry = manifest.get(rel_path)
+    if entry is None or not is_unchanged(path, entry):
+        file_shape(path)
+
+
+def manifest_hash(manifest):
+    """
+    Hash identifying a set of data files by content.
+
+    Only paths, content hashes, row counts and schemas go in, so touching or
+    copying files without changing them keeps the same hash.
+    """
+    content = {
+        rel_path: [entry["hash"], entry["rows"], entry["schema"]]
+        for rel_path, entry in manifest.items()
+    }
+    return fingerprint(json.dumps(content, sort_keys=True))
@@ -13,14 +13,118 @@ import pandas as pd
 import numpy as np
 from sklearn.preprocessing import LabelEncoder
 
+from utils import polars_backend
+from utils.polars_backend import resolve_backend
+from utils.ratings import RATING_COLUMNS, add_rating_features
+from utils.rolling import (
+    fill_rolling, previous_means, rolling_means, split_sides, team_game_frame, window_features
+)
+
 # Last N games to consider for rolling statistics
 ROLLING_WINDOW = 3
 
+# Window sizes and EWM half-lives (in games) emitted for a window sweep
+SWEEP_WINDOWS = [3, 5, 8, 17]
+SWEEP_HALFLIFES = [2, 4]
+
+# Rolling game metrics, in the same (home column, away column, output prefix,
+# fill value) form as EPA_ROLLING_SPECS
+GAME_ROLLING_SPECS = [
+    ("score_home", "score_away", "avg_points", 21),
+    ("score_away", "score_home", "avg_allowed", 21),
+    ("home_won", "away_won", "win_pct", 0.5),
+]
+
+# Rolling nflfastR metrics: (home column, away column, output prefix, fill value
+# for games without history). Outputs are home_<prefix> and away_<prefix>
+EPA_ROLLING_SPECS = [
+    ("home_epa_per_play", "away_epa_per_play", "rolling_epa", 0),
+    ("home_pass_epa", "away_pass_epa", "rolling_pass_epa", 0),
+    ("home_rush_epa", "away_rush_epa", "rolling_rush_epa", 0),
+    ("home_success_rate", "away_success_rate", "rolling_success", 0.5),
+    ("home_def_epa_allowed", "away_def_epa_allowed", "rolling_def_epa", 0),
+]
+
+# Difference features: name -> (minuend, subtrahend) per-team feature
+GAME_DIFFS = {
+    "avg_points_diff": ("home_avg_points", "away_avg_points"),
+    "avg_allowed_diff": ("away_avg_allowed", "home_avg_allowed"),
+    "win_pct_diff": ("home_win_pct", "away_win_pct"),
+    "rest_days_diff": ("home_rest_days", "away_rest_days"),
+    "momentum_diff": ("home_momentum", "away_momentum"),
+}
+EPA_DIFFS = {
+    "epa_diff": ("home_rolling_epa", "away_rolling_epa"),
+    "pass_epa_diff": ("home_rolling_pass_epa", "away_rolling_pass_epa"),
+    "rush_epa_diff": ("home_rolling_rush_epa", "away_rolling_rush_epa"),
+    "success_rate_diff": ("home_rolling_success", "away_rolling_success"),
+    "def_epa_diff": ("away_rolling_def_epa", "home_rolling_def_epa"),  # Lower is better for defense
+}
+
+# Interaction features: name -> (game column, difference feature)
+INTERACTIONS = {
+    "spread_strength_interaction": ("spread_favorite", "avg_points_diff"),
+    "spread_defense_interaction": ("spread_favorite", "avg_allowed_diff"),
+    "weather_offense_interaction": ("bad_weather", "avg_points_diff"),
+    "spread_epa_interaction": ("spread_favorite", "epa_diff"),
+}
+
+# Per-season weight of older games in the home field advantage (1 = no decay)
+HFA_DECAY = 1.0
+
 # Only use data from this season onward to avoid inconsistencies in historical data
 MODERN_START_YEAR = 2002
 
 
-def add_rolling_features(df, window=ROLLING_WINDOW):
+def add_differences(features, diffs):
+    """Add difference features (see GAME_DIFFS) computed from per-team columns (in place)."""
+    for name, (minuend, subtrahend) in diffs.items():
+        features[name] = features[minuend] - features[subtrahend]
+    return features
+
+
+def add_interactions(features, df):
+    """Add the INTERACTIONS whose difference feature is in features, with factors from df (in place)."""
+    for name, (factor, diff) in INTERACTIONS.items():
+        if diff in features.columns:
+            features[name] = df[factor] * features[diff]
+    return features
+
+
+def rolling_game_features(df, window=ROLLING_WINDOW):
+    """
+    Per-team rolling points, win percentage, rest days and momentum.
+
+    Computed on the long team-game frame in one grouped shift and rolling
+    pass, then split back into home and away columns.
+
+    Args:
+        df (pd.DataFrame): Games sorted by date, schedule_date as datetime
+        window (int): Number of games to consider for rolling calculations
+
+    Returns:
+        pd.DataFrame: Unfilled home_/away_ rolling columns, indexed like df
+    """
+    home_won = (df["score_home"] > df["score_away"]).astype(float)
+    away_won = (df["score_away"] > df["score_home"]).astype(float)
+    long = team_game_frame(df.assign(home_won=home_won, away_won=away_won), {
+        "avg_points": ("score_home", "score_away"),
+        "avg_allowed": ("score_away", "score_home"),
+        "win_pct": ("home_won", "away_won"),
+        "date": ("schedule_date", "schedule_date"),
+    })
+
+    features = previous_means(long, ["avg_points", "avg_allowed", "win_pct"], window)
+    features["rest_days"] = long.groupby("team", sort=False)["date"].diff().dt.days
+    
+    # Momentum: recent average minus the average of the window before it
+    older_points = previous_means(long, ["avg_points"], window, lag=window + 1)["avg_points"]
+    features["momentum"] = features["avg_points"] - older_points
+    
+    return split_sides(features, df.index)
+
+
+def add_rolling_features(df, window=ROLLING_WINDOW, backend="pandas"):
     """
     Adds rolling statistics for each team using efficient vectorized operations:
     - Offensive: average points scored in the last N games
@@ -32,105 +136,49 @@ def add_rolling_features(df, window=ROLLING_WINDOW):
     Args:
         df (pd.DataFrame): Raw game data with columns like 'team_home', 'score_home', etc.
         window (int): Number of games to consider for rolling calculations
+        backend (str): "pandas" or "polars" (see polars_backend)
 
     Returns:
         pd.DataFrame: DataFrame with new rolling and difference features
     """
     
-    # Sort by date to ensure chronological order
-    df = df.sort_values("schedule_date").copy()
+    # Sort by date to ensure chronological order. Sorting and filtering return
+    # new frames, which copy-on-write lets us add columns to without copying
+    df = df.sort_values("schedule_date")
     
     # Keep only modern seasons
-    df = df[df["schedule_season"] >= MODERN_START_YEAR].copy()
+    df = df[df["schedule_season"] >= MODERN_START_YEAR]
     
     # Convert date to datetime for rest days calculation
     df['schedule_date'] = pd.to_datetime(df['schedule_date'])
     
-    # Initialize columns
-    rolling_cols = ["home_avg_points", "away_avg_points",
-                    "home_avg_allowed", "away_avg_allowed",
-                    "home_win_pct", "away_win_pct",
-                    "home_rest_days", "away_rest_days",
-                    "home_momentum", "away_momentum"]
-    
-    for col in rolling_cols:
-        df[col] = np.nan
-    
-    teams = pd.concat([df["team_home"], df["team_away"]]).unique()
-    
-    # Process each team efficiently
-    for team in teams:
-        # Get all games for this team
-        home_mask = df["team_home"] == team
-        away_mask = df["team_away"] == team
-        team_mask = home_mask | away_mask
-        
-        team_indices = df[team_mask].index
-        
-        # Calculate points scored, allowed, and wins
-        points_scored = np.where(home_mask, df["score_home"], 
-                                np.where(away_mask, df["score_away"], np.nan))
-        points_allowed = np.where(home_mask, df["score_away"],
-                                 np.where(away_mask, df["score_home"], np.nan))
-        won = ((home_mask & (df["score_home"] > df["score_away"])) |
-               (away_mask & (df["score_away"] > df["score_home"]))).astype(float)
-        
-        # Create series for this team only
-        team_points_scored = pd.Series(points_scored[team_mask], index=team_indices)
-        team_points_allowed = pd.Series(points_allowed[team_mask], index=team_indices)
-        team_won = pd.Series(won[team_mask], index=team_indices)
-        team_dates = df.loc[team_indices, 'schedule_date']
-        
-        # Calculate rest days (days since last game)
-        rest_days = team_dates.diff().dt.days
-        
-        # Calculate rolling stats with expanding window for first few games
-        rolling_avg_points = team_points_scored.shift(1).rolling(window, min_periods=1).mean()
-        rolling_avg_allowed = team_points_allowed.shift(1).rolling(window, min_periods=1).mean()
-        rolling_win_pct = team_won.shift(1).rolling(window, min_periods=1).mean()
-        
-        # Calculate momentum (trend in last N games) - positive means improving
-        # Compare recent avg to previous avg
-        recent_points = team_points_scored.shift(1).rolling(window, min_periods=1).mean()
-        older_points = team_points_scored.shift(window+1).rolling(window, min_periods=1).mean()
-        momentum = recent_points - older_points
-        
-        # Map back to main dataframe
-        df.loc[home_mask & team_mask, "home_avg_points"] = rolling_avg_points[home_mask & team_mask].values
-        df.loc[home_mask & team_mask, "home_avg_allowed"] = rolling_avg_allowed[home_mask & team_mask].values
-        df.loc[home_mask & team_mask, "home_win_pct"] = rolling_win_pct[home_mask & team_mask].values
-        df.loc[home_mask & team_mask, "home_rest_days"] = rest_days[home_mask & team_mask].values
-        df.loc[home_mask & team_mask, "home_momentum"] = momentum[home_mask & team_mask].values
-        
-        df.loc[away_mask & team_mask, "away_avg_points"] = rolling_avg_points[away_mask & team_mask].values
-        df.loc[away_mask & team_mask, "away_avg_allowed"] = rolling_avg_allowed[away_mask & team_mask].values
-        df.loc[away_mask & team_mask, "away_win_pct"] = rolling_win_pct[away_mask & team_mask].values
-        df.loc[away_mask & team_mask, "away_rest_days"] = rest_days[away_mask & team_mask].values
-        df.loc[away_mask & team_mask, "away_momentum"] = momentum[away_mask & team_mask].values
+    # New columns are built in their own frame and attached in one step, so
+    # df isn't fragmented by one insert per column
+    if resolve_backend(backend) == "polars":
+        rolling = polars_backend.rolling_game_features(df, window)
+    else:
+        rolling = rolling_game_features(df, window)
     
     # Fill remaining NaNs with neutral values
-    df["home_avg_points"] = df["home_avg_points"].fillna(21)  # NFL average ~21 points
-    df["away_avg_points"] = df["away_avg_points"].fillna(21)
-    df["home_avg_allowed"] = df["home_avg_allowed"].fillna(21)
-    df["away_avg_allowed"] = df["away_avg_allowed"].fillna(21)
-    df["home_win_pct"] = df["home_win_pct"].fillna(0.5)
-    df["away_win_pct"] = df["away_win_pct"].fillna(0.5)
-    df["home_rest_days"] = df["home_rest_days"].fillna(7)  # Typical week rest
-    df["away_rest_days"] = df["away_rest_days"].fillna(7)
-    df["home_momentum"] = df["home_momentum"].fillna(0)
-    df["away_momentum"] = df["away_momentum"].fillna(0)
+    rolling["home_avg_points"] = rolling["home_avg_points"].fillna(21)  # NFL average ~21 points
+    rolling["away_avg_points"] = rolling["away_avg_points"].fillna(21)
+    rolling["home_avg_allowed"] = rolling["home_avg_allowed"].fillna(21)
+    rolling["away_avg_allowed"] = rolling["away_avg_allowed"].fillna(21)
+    rolling["home_win_pct"] = rolling["home_win_pct"].fillna(0.5)
+    rolling["away_win_pct"] = rolling["away_win_pct"].fillna(0.5)
+    rolling["home_rest_days"] = rolling["home_rest_days"].fillna(7)  # Typical week rest
+    rolling["away_rest_days"] = rolling["away_rest_days"].fillna(7)
+    rolling["home_momentum"] = rolling["home_momentum"].fillna(0)
+    rolling["away_momentum"] = rolling["away_momentum"].fillna(0)
     
     # Create difference features
-    df["avg_points_diff"] = df["home_avg_points"] - df["away_avg_points"]
-    df["avg_allowed_diff"] = df["away_avg_allowed"] - df["home_avg_allowed"]
-    df["win_pct_diff"] = df["home_win_pct"] - df["away_win_pct"]
-    df["rest_days_diff"] = df["home_rest_days"] - df["away_rest_days"]
-    df["momentum_diff"] = df["home_momentum"] - df["away_momentum"]
+    add_differences(rolling, GAME_DIFFS)
     
-    return df
+    # copy() packs the new columns into one block; only they are copied, not df
+    return pd.concat([df, rolling.copy()], axis=1)
 
 
-def add_rolling_epa_features(df, window=ROLLING_WINDOW):
+def add_rolling_epa_features(df, window=ROLLING_WINDOW, backend="pandas"):
     """
     Add rolling EPA and success rate features for each team.
     
@@ -140,146 +188,159 @@ def add_rolling_epa_features(df, window=ROLLING_WINDOW):
     Args:
         df: DataFrame with nflfastR stats (home_epa_per_play, etc.)
         window: Number of games for rolling average
+        backend: "pandas" or "polars" (see polars_backend)
         
     Returns:
         pd.DataFrame: DataFrame with rolling EPA features
     """
     
-    # Sort by date
-    df = df.sort_values("schedule_date").copy()
+    # Sort by date (a new frame, no copy needed)
+    df = df.sort_values("schedule_date")
     
-    # Initialize columns for rolling EPA stats
-    epa_cols = [
-        "home_rolling_epa", "away_rolling_epa",
-        "home_rolling_pass_epa", "away_rolling_pass_epa",
-        "home_rolling_rush_epa", "away_rolling_rush_epa",
-        "home_rolling_success", "away_rolling_success",
-        "home_rolling_def_epa", "away_rolling_def_epa"
-    ]
-    
-    for col in epa_cols:
-        df[col] = np.nan
-    
-    # Get unique teams
     teams = pd.concat([df["team_home"], df["team_away"]]).unique()
     
     print(f"Calculating rolling EPA features for {len(teams)} teams...")
     
-    for team in teams:
-        # Get all games for this team
-        home_mask = df["team_home"] == team
-        away_mask = df["team_away"] == team
-        team_mask = home_mask | away_mask
-        
-        team_indices = df[team_mask].index
-        
-        # Extract EPA stats for this team (whether home or away)
-        epa_per_play = np.where(
-            home_mask, df["home_epa_per_play"],
-            np.where(away_mask, df["away_epa_per_play"], np.nan)
-        )
-        
-        pass_epa = np.where(
-            home_mask, df["home_pass_epa"],
-            np.where(away_mask, df["away_pass_epa"], np.nan)
-        )
-        
-        rush_epa = np.where(
-            home_mask, df["home_rush_epa"],
-            np.where(away_mask, df["away_rush_epa"], np.nan)
-        )
-        
-        success_rate = np.where(
-            home_mask, df["home_success_rate"],
-            np.where(away_mask, df["away_success_rate"], np.nan)
-        )
-        
-        def_epa_allowed = np.where(
-            home_mask, df["home_def_epa_allowed"],
-            np.where(away_mask, df["away_def_epa_allowed"], np.nan)
-        )
-        
-        # Create series for this team
-        team_epa = pd.Series(epa_per_play[team_mask], index=team_indices)
-        team_pass_epa = pd.Series(pass_epa[team_mask], index=team_indices)
-        team_rush_epa = pd.Series(rush_epa[team_mask], index=team_indices)
-        team_success = pd.Series(success_rate[team_mask], index=team_indices)
-        team_def_epa = pd.Series(def_epa_allowed[team_mask], index=team_indices)
-        
-        # Calculate rolling averages (shift by 1 to avoid lookahead bias)
-        rolling_epa = team_epa.shift(1).rolling(window, min_periods=1).mean()
-        rolling_pass_epa = team_pass_epa.shift(1).rolling(window, min_periods=1).mean()
-        rolling_rush_epa = team_rush_epa.shift(1).rolling(window, min_periods=1).mean()
-        rolling_success = team_success.shift(1).rolling(window, min_periods=1).mean()
-        rolling_def_epa = team_def_epa.shift(1).rolling(window, min_periods=1).mean()
-        
-        # Map back to dataframe
-        df.loc[home_mask & team_mask, "home_rolling_epa"] = rolling_epa[home_mask & team_mask].values
-        df.loc[home_mask & team_mask, "home_rolling_pass_epa"] = rolling_pass_epa[home_mask & team_mask].values
-        df.loc[home_mask & team_mask, "home_rolling_rush_epa"] = rolling_rush_epa[home_mask & team_mask].values
-        df.loc[home_mask & team_mask, "home_rolling_success"] = rolling_success[home_mask & team_mask].values
-        df.loc[home_mask & team_mask, "home_rolling_def_epa"] = rolling_def_epa[home_mask & team_mask].values
-        
-        df.loc[away_mask & team_mask, "away_rolling_epa"] = rolling_epa[away_mask & team_mask].values
-        df.loc[away_mask & team_mask, "away_rolling_pass_epa"] = rolling_pass_epa[away_mask & team_mask].values
-        df.loc[away_mask & team_mask, "away_rolling_rush_epa"] = rolling_rush_epa[away_mask & team_mask].values
-        df.loc[away_mask & team_mask, "away_rolling_success"] = rolling_success[away_mask & team_mask].values
-        df.loc[away_mask & team_mask, "away_rolling_def_epa"] = rolling_def_epa[away_mask & team_mask].values
-    
-    # Fill NaN values with league averages
-    df["home_rolling_epa"] = df["home_rolling_epa"].fillna(0)
-    df["away_rolling_epa"] = df["away_rolling_epa"].fillna(0)
-    df["home_rolling_pass_epa"] = df["home_rolling_pass_epa"].fillna(0)
-    df["away_rolling_pass_epa"] = df["away_rolling_pass_epa"].fillna(0)
-    df["home_rolling_rush_epa"] = df["home_rolling_rush_epa"].fillna(0)
-    df["away_rolling_rush_epa"] = df["away_rolling_rush_epa"].fillna(0)
-    df["home_rolling_success"] = df["home_rolling_success"].fillna(0.5)
-    df["away_rolling_success"] = df["away_rolling_success"].fillna(0.5)
-    df["home_rolling_def_epa"] = df["home_rolling_def_epa"].fillna(0)
-    df["away_rolling_def_epa"] = df["away_rolling_def_epa"].fillna(0)
-    
-    # Create difference features (home - away perspective)
-    df["epa_diff"] = df["home_rolling_epa"] - df["away_rolling_epa"]
-    df["pass_epa_diff"] = df["home_rolling_pass_epa"] - df["away_rolling_pass_epa"]
-    df["rush_epa_diff"] = df["home_rolling_rush_epa"] - df["away_rolling_rush_epa"]
-    df["success_rate_diff"] = df["home_rolling_success"] - df["away_rolling_success"]
-    df["def_epa_diff"] = df["away_rolling_def_epa"] - df["home_rolling_def_epa"]  # Lower is better for defense
-    
-    # Create interaction features with spread
-    df["spread_epa_interaction"] = df["spread_favorite"] * df["epa_diff"]
+    # Built in their own frame and attached in one step (see add_rolling_features)
+    if resolve_backend(backend) == "polars":
+        rolling = polars_backend.rolling_means(df, EPA_ROLLING_SPECS, window)
+    else:
+        rolling = rolling_means(df, EPA_ROLLING_SPECS, window)
+    
+    # Fill games without history with league averages
+    fill_rolling(rolling, EPA_ROLLING_SPECS)
+    
+    # Create difference features (home - away perspective); the spread
+    # interaction is added by encode_features once missing spreads are filled
+    add_differences(rolling, EPA_DIFFS)
     
     print("✓ Rolling EPA features added!")
     
-    return df
+    return pd.concat([df, rolling.copy()], axis=1)
 
 
-def calculate_home_field_advantage(df):
+def add_window_features(df, windows=SWEEP_WINDOWS, halflifes=SWEEP_HALFLIFES):
     """
-    Calculate historical home field advantage for each team.
-    This represents how much better each team performs at home vs away.
-    
+    Add the rolling metrics over several windows and as EWM means at once.
+
+    Columns are named by window, e.g. home_avg_points_8 or home_rolling_epa_ewm4,
+    and filled like their ROLLING_WINDOW counterparts. All of them come from one
+    cumulative-sum pass and one EWM pass per half-life (see rolling.window_means).
+
     Args:
-        df (pd.DataFrame): Game data with scores
-        
+        df: Games sorted by date, as returned by add_rolling_features
+        windows: Window sizes (games)
+        halflifes: EWM half-lives (games)
+
     Returns:
-        dict: Mapping of team name to home field advantage score
+        pd.DataFrame: DataFrame with the windowed columns
     """
-    teams = pd.concat([df["team_home"], df["team_away"]]).unique()
-    home_advantage = {}
+    specs = window_specs(df)
+    games = df.assign(
+        home_won=(df["score_home"] > df["score_away"]).astype(float),
+        away_won=(df["score_away"] > df["score_home"]).astype(float),
+    )
+    windowed = window_features(games, specs, windows, halflifes)
     
-    for team in teams:
-        # Home games
-        home_games = df[df["team_home"] == team]
-        home_win_pct = (home_games["score_home"] > home_games["score_away"]).mean()
-        
-        # Away games
-        away_games = df[df["team_away"] == team]
-        away_win_pct = (away_games["score_away"] > away_games["score_home"]).mean()
-        
-        # Home advantage is difference in win percentage
-        home_advantage[team] = home_win_pct - away_win_pct
+    print(f"✓ Added {len(windowed.columns)} windowed features "
+          f"(windows {list(windows)}, EWM half-lives {list(halflifes)})")
     
-    return home_advantage
+    return pd.concat([df, windowed], axis=1)
+
+
+def window_specs(df):
+    """Rolling specs available for df (EPA metrics only with nflfastR data)."""
+    has_nflfastr = 'home_epa_per_play' in df.columns
+    return GAME_ROLLING_SPECS + (EPA_ROLLING_SPECS if has_nflfastr else [])
+
+
+def window_variants(df, windows=SWEEP_WINDOWS, halflifes=SWEEP_HALFLIFES):
+    """
+    Column swaps for a window sweep.
+
+    Args:
+        df: Frame from encode_features(..., windows=...)
+        windows: Window sizes emitted
+        halflifes: EWM half-lives emitted
+
+    Returns:
+        dict: Variant label ("5", "ewm2", ...) -> {feature column: windowed column}
+    """
+    suffixes = [str(window) for window in windows] + [f"ewm{halflife}" for halflife in halflifes]
+    return {
+        suffix: {
+            f"{side}_{prefix}": f"{side}_{prefix}_{suffix}"
+            for _, _, prefix, _ in window_specs(df) for side in ["home", "away"]
+        }
+        for suffix in suffixes
+    }
+
+
+def window_variant(df, swaps):
+    """
+    Features of one window-sweep variant: the swapped per-team columns plus
+    the difference and interaction features recomputed from them.
+
+    Args:
+        df: Frame from encode_features(..., windows=...)
+        swaps: {feature column: windowed column}, one entry of window_variants
+
+    Returns:
+        pd.DataFrame: New values of every feature column the variant changes
+    """
+    variant = df[list(swaps)].assign(**{col: df[windowed] for col, windowed in swaps.items()})
+    add_differences(variant, {
+        name: pair for name, pair in {**GAME_DIFFS, **EPA_DIFFS}.items() if set(pair) <= set(swaps)
+    })
+    return add_interactions(variant, df)
+
+
+def expanding_home_field_advantage(df, decay=HFA_DECAY):
+    """
+    Home team's home win rate minus its away win rate, over completed games
+    before each game only.
+
+    Computed in one grouped cumulative sum over the long team-game frame.
+    With decay < 1 a game from k seasons before counts decay**k as much, so
+    the advantage follows changes of stadium, coach or roster.
+
+    Args:
+        df (pd.DataFrame): Games sorted by date
+        decay (float): Weight per season of age, in (0, 1] (1 = all games equal)
+
+    Returns:
+        pd.Series: Advantage per game, 0 until the team has both home and away results
+    """
+    completed = (df["score_home"].notna() & df["score_away"].notna()).astype(float)
+    long = team_game_frame(df.assign(
+        home_won=(df["score_home"] > df["score_away"]).astype(float),
+        away_won=(df["score_away"] > df["score_home"]).astype(float),
+        completed=completed,
+    ), {
+        "won": ("home_won", "away_won"),
+        "played": ("completed", "completed"),
+        "season": ("schedule_season", "schedule_season"),
+    })
+    is_home = np.tile([1.0, 0.0], len(df))
+
+    # Weighting each game by decay**-age before the cumulative sums and by
+    # decay**age after leaves decay**(seasons between) on every earlier game
+    age = (long["season"] - long["season"].min()).to_numpy(dtype=float)
+    scale = decay ** -age
+    results = pd.DataFrame({
+        "home_wins": long["won"] * long["played"] * is_home,
+        "home_games": long["played"] * is_home,
+        "away_wins": long["won"] * long["played"] * (1 - is_home),
+        "away_games": long["played"] * (1 - is_home),
+    }).mul(scale, axis=0)
+    prior = (results.groupby(long["team"], sort=False).cumsum() - results).mul(decay ** age, axis=0)
+
+    # Home team's record comes from its row of each game (rows 0::2)
+    home = prior.iloc[0::2]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        advantage = (home["home_wins"] / home["home_games"]).to_numpy() - \
+                    (home["away_wins"] / home["away_games"]).to_numpy()
+    return pd.Series(np.nan_to_num(advantage, nan=0.0), index=df.index)
 
 
 def add_weather_features(df):
@@ -293,13 +354,13 @@ def add_weather_features(df):
         pd.DataFrame: DataFrame with processed weather features
     """
     # Temperature - fill missing with 70 (typical dome/pleasant weather)
-    df["weather_temperature"] = pd.to_numeric(df["weather_temperature"], errors='coerce').fillna(70)
+    df["weather_temperature"] = df["weather_temperature"].fillna(70)
     
     # Wind - fill missing with 0 (dome or calm)
-    df["weather_wind_mph"] = pd.to_numeric(df["weather_wind_mph"], errors='coerce').fillna(0)
+    df["weather_wind_mph"] = df["weather_wind_mph"].fillna(0)
     
     # Humidity - fill missing with 50 (neutral)
-    df["weather_humidity"] = pd.to_numeric(df["weather_humidity"], errors='coerce').fillna(50)
+    df["weather_humidity"] = df["weather_humidity"].fillna(50)
     
     # Create weather severity flags
     df["extreme_cold"] = (df["weather_temperature"] < 32).astype(int)  # Freezing
@@ -320,14 +381,31 @@ def add_weather_features(df):
     return df
 
 
-def encode_features(df):
+def feature_params(df, backend="pandas", windows=None, ratings=False):
+    """
+    Parameters encode_features' output depends on besides its input, used as
+    part of the stage cache key.
+    """
+    return {
+        "rolling_window": ROLLING_WINDOW,
+        "modern_start_year": MODERN_START_YEAR,
+        "has_nflfastr": 'home_epa_per_play' in df.columns,
+        "backend": backend,
+        "windows": windows,
+        "hfa_decay": HFA_DECAY,
+        "ratings": ratings,
+        "halflifes": SWEEP_HALFLIFES if windows else None,
+    }
+
+
+def encode_features(df, backend="pandas", windows=None, ratings=False):
     """
     Prepares feature matrix (X) and target vector (y) for modeling.
     Steps:
     1. Encode team names as numeric labels.
     2. Add rolling offensive/defensive stats and difference features.
     3. Add rolling EPA features if nflfastR data is available.
-    4. Calculate home field advantage.
+    4. Calculate home field advantage from earlier games.
     5. Add weather features.
     6. Add playoff and neutral site indicators.
     7. Add interaction features.
@@ -336,6 +414,10 @@ def encode_features(df):
 
     Args:
         df (pd.DataFrame): Raw game data
+        backend (str): Backend for the rolling features ("pandas" or "polars")
+        windows (list): Also add the windowed and EWM columns for these window
+            sizes to df (not X) for a window sweep; see add_window_features
+        ratings (bool): Add opponent-adjusted team ratings (see ratings.py) to X
 
     Returns:
         X (pd.DataFrame): Features for model training
@@ -352,19 +434,24 @@ def encode_features(df):
     df["away_team_encoded"] = encoder.transform(df["team_away"])
     
     # Add rolling stats & difference features
-    df = add_rolling_features(df)
+    df = add_rolling_features(df, backend=backend)
     
     # Add rolling EPA features if nflfastR data is available
     has_nflfastr = 'home_epa_per_play' in df.columns
     if has_nflfastr:
         print("\n✓ nflfastR data detected - adding EPA features")
-        df = add_rolling_epa_features(df)
+        df = add_rolling_epa_features(df, backend=backend)
     else:
         print("\n⚠ No nflfastR data - training without EPA features")
     
-    # Calculate home field advantage
-    home_adv_dict = calculate_home_field_advantage(df)
-    df["home_field_advantage"] = df["team_home"].map(home_adv_dict)
+    if windows:
+        df = add_window_features(df, windows)
+    
+    if ratings:
+        df = add_rating_features(df)
+    
+    # Home field advantage from each team's earlier games only
+    df["home_field_advantage"] = expanding_home_field_advantage(df)
     
     # Add weather features
     df = add_weather_features(df)
@@ -375,15 +462,12 @@ def encode_features(df):
     # Add neutral site indicator (Super Bowl, London games, etc.)
     df["is_neutral_site"] = df["stadium_neutral"].fillna(0).astype(int)
     
-    # Fill missing spread and over/under values (convert to numeric first)
-    df["spread_favorite"] = pd.to_numeric(df["spread_favorite"], errors='coerce').fillna(0)
-    df["over_under_line"] = pd.to_numeric(df["over_under_line"], errors='coerce')
+    # Fill missing spread and over/under values (numeric from SPREADSPOKE_SCHEMA)
+    df["spread_favorite"] = df["spread_favorite"].fillna(0)
     df["over_under_line"] = df["over_under_line"].fillna(df["over_under_line"].median())
     
-    # Create interaction features
-    df["spread_strength_interaction"] = df["spread_favorite"] * df["avg_points_diff"]
-    df["spread_defense_interaction"] = df["spread_favorite"] * df["avg_allowed_diff"]
-    df["weather_offense_interaction"] = df["bad_weather"] * df["avg_points_diff"]
+    # Create interaction features (spread_epa_interaction only with nflfastR data)
+    add_interactions(df, df)
     
     # Over/under can predict game style (high scoring vs defensive)
     df["over_under_normalized"] = (df["over_under_line"] - df["over_under_line"].mean()) / df["over_under_line"].std()
@@ -462,6 +546,9 @@ def encode_features(df):
         feature_cols.extend(epa_feature_cols)
         print(f"✓ Added {len(epa_feature_cols)} EPA features to model")
     
+    if ratings:
+        feature_cols.extend(RATING_COLUMNS)
+    
     X = df[feature_cols]
     y = df["home_team_won"]
     
@@ -0,0 +1,154 @@
+"""
+franchises.py
+Canonical NFL franchise table.
+
+Every franchise gets a stable integer id, the abbreviations nflfastR has used for it,
+and each full name it has played under with the seasons that name was valid. Data
+sources that spell teams differently (spreadspoke full names, nflfastR abbreviations)
+are joined on these ids instead of on strings.
+
+Brendan Dileo, October 2026
+"""
+
+import pandas as pd
+
+# Id used for names or abbreviations not in the table
+UNKNOWN_ID = -1
+
+# (franchise_id, abbreviations, [(full name, first season, last season or None)])
+FRANCHISES = [
+    (1, ('ARI', 'PHO'), [
+        ('Chicago Cardinals', 1920, 1959),
+        ('St. Louis Cardinals', 1960, 1987),
+        ('Phoenix Cardinals', 1988, 1993),
+        ('Arizona Cardinals', 1994, None),
+    ]),
+    (2, ('ATL',), [('Atlanta Falcons', 1966, None)]),
+    (3, ('BAL',), [('Baltimore Ravens', 1996, None)]),
+    (4, ('BUF',), [('Buffalo Bills', 1960, None)]),
+    (5, ('CAR',), [('Carolina Panthers', 1995, None)]),
+    (6, ('CHI',), [('Chicago Bears', 1922, None)]),
+    (7, ('CIN',), [('Cincinnati Bengals', 1968, None)]),
+    (8, ('CLE',), [('Cleveland Browns', 1946, None)]),
+    (9, ('DAL',), [('Dallas Cowboys', 1960, None)]),
+    (10, ('DEN',), [('Denver Broncos', 1960, None)]),
+    (11, ('DET',), [('Detroit Lions', 1934, None)]),
+    (12, ('GB',), [('Green Bay Packers', 1921, None)]),
+    (13, ('HOU',), [('Houston Texans', 2002, None)]),
+    (14, ('IND',), [
+        ('Baltimore Colts', 1953, 1983),
+        ('Indianapolis Colts', 1984, None),
+    ]),
+    (15, ('JAX', 'JAC'), [('Jacksonville Jaguars', 1995, None)]),
+    (16, ('KC',), [
+        ('Dallas Texans', 1960, 1962),
+        ('Kansas City Chiefs', 1963, None),
+    ]),
+    (17, ('LAC', 'SD'), [
+        ('Los Angeles Chargers', 1960, 1960),
+        ('San Diego Chargers', 1961, 2016),
+        ('Los Angeles Chargers', 2017, None),
+    ]),
+    (18, ('LA', 'LAR', 'STL'), [
+        ('Cleveland Rams', 1937, 1945),
+        ('Los Angeles Rams', 1946, 1994),
+        ('St. Louis Rams', 1995, 2015),
+        ('Los Angeles Rams', 2016, None),
+    ]),
+    (19, ('LV', 'OAK'), [
+        ('Oakland Raiders', 1960, 1981),
+        ('Los Angeles Raiders', 1982, 1994),
+        ('Oakland Raiders', 1995, 2019),
+        ('Las Vegas Raiders', 2020, None),
+    ]),
+    (20, ('MIA',), [('Miami Dolphins', 1966, None)]),
+    (21, ('MIN',), [('Minnesota Vikings', 1961, None)]),
+    (22, ('NE',), [
+        ('Boston Patriots', 1960, 1970),
+        ('New England Patriots', 1971, None),
+    ]),
+    (23, ('NO',), [('New Orleans Saints', 1967, None)]),
+    (24, ('NYG',), [('New York Giants', 1925, None)]),
+    (25, ('NYJ',), [
+        ('New York Titans', 1960, 1962),
+        ('New York Jets', 1963, None),
+    ]),
+    (26, ('PHI',), [('Philadelphia Eagles', 1933, None)]),
+    (27, ('PIT',), [('Pittsburgh Steelers', 1940, None)]),
+    (28, ('SEA',), [('Seattle Seahawks', 1976, None)]),
+    (29, ('SF',), [('San Francisco 49ers', 1946, None)]),
+    (30, ('TB',), [('Tampa Bay Buccaneers', 1976, None)]),
+    (31, ('TEN',), [
+        ('Houston Oilers', 1960, 1996),
+        ('Tennessee Oilers', 1997, 1998),
+        ('Tennessee Titans', 1999, None),
+    ]),
+    (32, ('WAS', 'WSH'), [
+        ('Boston Redskins', 1933, 1936),
+        ('Washington Redskins', 1937, 2019),
+        ('Washington Football Team', 2020, 2021),
+        ('Washington Commanders', 2022, None),
+    ]),
+]
+
+# Lookup tables built once from FRANCHISES
+ABBR_TO_ID = {abbr: fid for fid, abbrs, _ in FRANCHISES for abbr in abbrs}
+NAME_TO_ID = {name: fid for fid, _, names in FRANCHISES for name, _, _ in names}
+
+
+def franchise_table():
+    """
+    The franchise table as a DataFrame, one row per (franchise, name) period.
+
+    Returns:
+        pd.DataFrame: franchise_id, abbreviation, name, first_season, last_season
+    """
+    rows = [
+        {
+            "franchise_id": fid,
+            "abbreviation": abbrs[0],
+            "name": name,
+            "first_season": first,
+            "last_season": last,
+        }
+        for fid, abbrs, names in FRANCHISES
+        for name, first, last in names
+    ]
+    return pd.DataFrame(rows)
+
+
+def _to_ids(values, lookup):
+    """Map team labels to franchise ids (UNKNOWN_ID when not found)."""
+    values = pd.Series(values)
+    # Map the few distinct labels rather than every row
+    codes, uniques = pd.factorize(values.astype(object))
+    unique_ids = pd.Series(uniques).map(lookup).fillna(UNKNOWN_ID).astype("int16").to_numpy()
+    ids = pd.Series(UNKNOWN_ID, index=values.index, dtype="int16")
+    ids[codes >= 0] = unique_ids[codes[codes >= 0]]
+    return ids
+
+
+def ids_from_abbreviations(abbreviations):
+    """Franchise ids for a Series of nflfastR abbreviations."""
+    return _to_ids(abbreviations, ABBR_TO_ID)
+
+
+def ids_from_names(names):
+    """Franchise ids for a Series of full team names (any historical name)."""
+    return _to_ids(names, NAME_TO_ID)
+
+
+def franchise_name(franchise_id, season):
+    """
+    Full name a franchise played under in a given season.
+
+    Returns:
+        str: Team name, or None if the franchise didn't exist that season
+    """
+    for fid, _, names in FRANCHISES:
+        if fid != franchise_id:
+            continue
+        for name, first, last in names:
+            if first <= season and (last is None or season <= last):
+                return name
+    return None
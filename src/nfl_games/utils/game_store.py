@@ -0,0 +1,142 @@
+"""
+game_store.py
+Persisted team-game statistics, partitioned by season and week.
+
+Aggregated nflfastR stats are stored as data/team_games/season=YYYY/week=WW/*.parquet
+with a manifest recording, per season, how many games are stored and whether the
+season was already over when it was aggregated. The pipeline then only aggregates
+game ids that are not stored yet. Player-game usage from the same pass is kept in
+an identically partitioned store under data/player_games, keyed by player.
+
+Brendan Dileo, October 2026
+"""
+
+import glob
+import json
+import os
+import shutil
+from datetime import datetime
+
+import pandas as pd
+
+# Local store location and manifest file name
+TEAM_GAMES_DIR = "data/team_games"
+MANIFEST_FILE = "manifest.json"
+
+# Player-game usage store, written alongside the team-game store
+PLAYER_GAMES_DIR = "data/player_games"
+
+# Columns identifying a stored row
+KEY_COLUMNS = ["game_id", "team"]
+PLAYER_KEY_COLUMNS = ["game_id", "player_id"]
+
+
+def partition_path(season, week, store_dir=TEAM_GAMES_DIR, table="team_games"):
+    """Path of the Parquet file holding one season/week partition."""
+    return os.path.join(store_dir, f"season={season}", f"week={week:02d}", f"{table}.parquet")
+
+
+def season_files(season, store_dir=TEAM_GAMES_DIR, table="*"):
+    """All partition files of a season, in week order."""
+    return sorted(glob.glob(os.path.join(store_dir, f"season={season}", "week=*", f"{table}.parquet")))
+
+
+def load_manifest(store_dir=TEAM_GAMES_DIR):
+    """Load the store manifest as a dict keyed by season (as a string)."""
+    path = os.path.join(store_dir, MANIFEST_FILE)
+    if not os.path.exists(path):
+        return {}
+
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def save_manifest(manifest, store_dir=TEAM_GAMES_DIR):
+    """Write the store manifest atomically."""
+    os.makedirs(store_dir, exist_ok=True)
+    path = os.path.join(store_dir, MANIFEST_FILE)
+    tmp_path = path + ".tmp"
+
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def record_season(manifest, season, games, complete, version):
+    """Update a season's manifest entry after new games were stored."""
+    manifest[str(season)] = {
+        "games": games,
+        "complete": complete,
+        "version": version,
+        "updated_at": datetime.now().isoformat(timespec="seconds"),
+    }
+
+
+def is_season_stored(manifest, season, version):
+    """A season needs no more work if it was stored complete by the current code version."""
+    entry = manifest.get(str(season))
+    return bool(entry) and entry.get("complete", False) and entry.get("version") == version
+
+
+def clear_season(season, store_dir=TEAM_GAMES_DIR):
+    """Delete every partition of a season."""
+    shutil.rmtree(os.path.join(store_dir, f"season={season}"), ignore_errors=True)
+
+
+def clear_store(store_dir=TEAM_GAMES_DIR):
+    """Delete the whole store (force rebuild)."""
+    shutil.rmtree(store_dir, ignore_errors=True)
+
+
+def stored_game_ids(season, store_dir=TEAM_GAMES_DIR):
+    """Set of game ids already stored for a season."""
+    game_ids = set()
+    for path in season_files(season, store_dir):
+        game_ids.update(pd.read_parquet(path, columns=["game_id"])["game_id"])
+    return game_ids
+
+
+def append_stats(stats, store_dir=TEAM_GAMES_DIR, table="team_games", keys=KEY_COLUMNS):
+    """
+    Add rows to the store, one partition per (season, week).
+
+    Existing partitions are merged with the new rows; a row whose key is
+    already stored is replaced.
+
+    Args:
+        stats: DataFrame with season, week and the key columns
+        store_dir: Store location
+        table: File name of the partition files
+        keys: Columns identifying a row (PLAYER_KEY_COLUMNS for player games)
+    """
+    for (season, week), rows in stats.groupby(["season", "week"], sort=True):
+        path = partition_path(int(season), int(week), store_dir, table)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        if os.path.exists(path):
+            rows = pd.concat([pd.read_parquet(path), rows], ignore_index=True)
+            rows = rows.drop_duplicates(subset=keys, keep="last")
+
+        rows = rows.sort_values(keys).reset_index(drop=True)
+
+        tmp_path = path + ".tmp"
+        rows.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, path)
+
+
+def read_store(seasons, store_dir=TEAM_GAMES_DIR, keys=KEY_COLUMNS):
+    """
+    Read the stored rows for some seasons.
+
+    Rows come back sorted by their key columns; for team games that is
+    (game_id, team), the same order aggregate_team_stats produces.
+
+    Returns:
+        pd.DataFrame: Stored rows, or None if nothing is stored
+    """
+    paths = [path for season in sorted(seasons) for path in season_files(season, store_dir)]
+    if not paths:
+        return None
+
+    stats = pd.concat([pd.read_parquet(path) for path in paths], ignore_index=True)
+    return stats.sort_values(keys).reset_index(drop=True)
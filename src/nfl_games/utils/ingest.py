@@ -0,0 +1,340 @@
+"""
+ingest.py
+In-season refresh of a single week of results.
+
+ingest_week(season, week) brings the local data up to date after a weekend of
+games without rebuilding anything else: it refreshes the season's play-by-play
+file, reads only that week's plays, writes their team-game and player-game
+aggregates into the stores, and adds (or completes) the week's rows in the
+spreadspoke CSV, built from the same play-by-play. The teams that played are
+recorded as dirty; refresh_team_state then brings the saved TeamState (the
+online rolling features) up to date from those teams' games only and clears
+them, instead of recomputing every team's features.
+
+Brendan Dileo, October 2026
+"""
+
+import json
+import os
+import re
+
+import numpy as np
+import pandas as pd
+
+from utils import game_store
+from utils.franchises import ABBR_TO_ID, UNKNOWN_ID, franchise_name
+from utils.load_data import (
+    DATA_PATH, GAME_KEY, PBP_COLUMNS, PLAYOFF_WEEKS, TEAM_STATS_VERSION,
+    aggregate_player_stats, aggregate_team_stats, spreadspoke_game_keys, sync_nflfastr_store
+)
+from utils.pbp_store import PBP_STORE_DIR, season_path
+from utils.schema import PBP_SCHEMA, apply_schema
+from utils.team_state import TEAM_STATE_FILE, load_team_state
+
+# Game-level play-by-play columns the spreadspoke rows are built from
+SCHEDULE_COLUMNS = [
+    'game_date', 'season_type', 'location', 'home_score', 'away_score',
+    'spread_line', 'total_line', 'stadium', 'roof', 'temp', 'wind', 'weather'
+]
+
+# Spreadspoke CSV columns, in file order
+SPREADSPOKE_COLUMNS = [
+    'schedule_date', 'schedule_season', 'schedule_week', 'schedule_playoff',
+    'team_home', 'score_home', 'score_away', 'team_away', 'team_favorite_id',
+    'spread_favorite', 'over_under_line', 'stadium', 'stadium_neutral',
+    'weather_temperature', 'weather_wind_mph', 'weather_humidity', 'weather_detail'
+]
+
+# Teams whose games changed since downstream caches were last rebuilt
+DIRTY_TEAMS_FILE = "cache/dirty_teams.json"
+
+
+def load_dirty_teams(path=DIRTY_TEAMS_FILE):
+    """
+    Teams with new results since they were last cleared.
+
+    Returns:
+        dict: Spreadspoke team name -> {"season", "week"} of its earliest new game
+    """
+    if not os.path.exists(path):
+        return {}
+
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def save_dirty_teams(dirty, path=DIRTY_TEAMS_FILE):
+    """Write the dirty-team registry atomically."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+
+    with open(tmp_path, "w") as f:
+        json.dump(dirty, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def mark_teams_dirty(teams, season, week, path=DIRTY_TEAMS_FILE):
+    """Record new games for some teams, keeping each team's earliest (season, week)."""
+    dirty = load_dirty_teams(path)
+    for team in teams:
+        entry = dirty.get(team)
+        if entry is None or (season, week) < (entry["season"], entry["week"]):
+            dirty[team] = {"season": int(season), "week": int(week)}
+    save_dirty_teams(dirty, path)
+
+
+def clear_dirty_teams(teams=None, path=DIRTY_TEAMS_FILE):
+    """Mark teams (None = all) as up to date after a downstream rebuild."""
+    dirty = load_dirty_teams(path)
+    for team in list(dirty) if teams is None else teams:
+        dirty.pop(team, None)
+    save_dirty_teams(dirty, path)
+
+
+def refresh_team_state(games, state_path=TEAM_STATE_FILE, dirty_path=DIRTY_TEAMS_FILE):
+    """
+    Update the saved TeamState with the games ingested since its last refresh.
+
+    Only games of dirty teams from the season of their earliest new game on
+    are passed to TeamState.update, and those teams are cleared afterwards.
+    A state with nothing recorded yet is built from every game.
+
+    Args:
+        games: Game frame (load_data, optionally merged with nflfastR stats)
+        state_path: Saved TeamState
+        dirty_path: Dirty-team registry
+
+    Returns:
+        TeamState: The updated (and saved) state
+    """
+    state = load_team_state(state_path)
+    dirty = load_dirty_teams(dirty_path)
+
+    if state.recorded:
+        if not dirty:
+            return state
+        season = min(entry["season"] for entry in dirty.values())
+        teams = games["team_home"].astype(str).isin(dirty) | games["team_away"].astype(str).isin(dirty)
+        games = games[teams & (games["schedule_season"] >= season)]
+
+    recorded = state.update(games)
+    state.save(state_path)
+    clear_dirty_teams(list(dirty), dirty_path)
+    print(f"✓ Team state refreshed: {recorded} game(s) recorded for {len(dirty)} dirty team(s)")
+    return state
+
+
+def read_week(season, week, store_dir=PBP_STORE_DIR):
+    """
+    Read one week of a stored season.
+
+    The week filter is pushed down to the Parquet reader, so only that week's
+    rows of PBP_COLUMNS and SCHEDULE_COLUMNS are materialized.
+
+    Returns:
+        pd.DataFrame: The week's plays (PBP_SCHEMA applied)
+    """
+    path = season_path(season, store_dir)
+    columns = PBP_COLUMNS + [col for col in SCHEDULE_COLUMNS if col not in PBP_COLUMNS]
+    plays = pd.read_parquet(path, columns=columns, filters=[("week", "==", week)])
+    return apply_schema(plays, PBP_SCHEMA)
+
+
+def week_label(season, week):
+    """Spreadspoke's schedule_week for an nflfastR week ("1".."18", "Wildcard", ...)."""
+    for label, (before_2021, from_2021) in PLAYOFF_WEEKS.items():
+        if week == (from_2021 if season >= 2021 else before_2021):
+            return label.capitalize()
+    return str(week)
+
+
+def weather_fields(roof, weather):
+    """
+    Humidity and spreadspoke-style weather detail from nflfastR's weather text.
+
+    nflfastR describes weather as e.g. "Light Rain Temp: 45° F, Humidity: 80%,
+    Wind: NW 10 mph"; spreadspoke keeps the conditions ("Light Rain") and marks
+    indoor games "DOME".
+    """
+    weather = weather if isinstance(weather, str) else ""
+    humidity = re.search(r"Humidity:\s*(\d+)", weather)
+    humidity = float(humidity.group(1)) if humidity else np.nan
+
+    if roof in ("dome", "closed"):
+        return humidity, "DOME"
+
+    detail = weather.split("Temp:")[0].strip(" ,")
+    return humidity, detail or None
+
+
+def schedule_rows(plays):
+    """
+    Spreadspoke rows for the games in some play-by-play.
+
+    Args:
+        plays: Play-by-play with SCHEDULE_COLUMNS (one or more complete games)
+
+    Returns:
+        pd.DataFrame: One row per game in SPREADSPOKE_COLUMNS order
+    """
+    games = plays.drop_duplicates("game_id").sort_values(["game_date", "game_id"])
+    rows = []
+
+    for game in games.itertuples(index=False):
+        season = int(game.season)
+        week = int(game.week)
+        home, away = str(game.home_team), str(game.away_team)
+        game_date = pd.Timestamp(game.game_date)
+        humidity, detail = weather_fields(game.roof, game.weather)
+
+        # nflfastR's spread_line is from the home side (positive = home favored)
+        spread = float(game.spread_line) if pd.notna(game.spread_line) else np.nan
+        if spread > 0:
+            favorite = home
+        elif spread < 0:
+            favorite = away
+        else:
+            favorite = "PICK" if spread == 0 else None
+
+        rows.append({
+            'schedule_date': f"{game_date.month}/{game_date.day}/{game_date.year}",
+            'schedule_season': season,
+            'schedule_week': week_label(season, week),
+            'schedule_playoff': game.season_type == "POST",
+            'team_home': franchise_name(ABBR_TO_ID[home], season),
+            'score_home': game.home_score,
+            'score_away': game.away_score,
+            'team_away': franchise_name(ABBR_TO_ID[away], season),
+            'team_favorite_id': favorite,
+            'spread_favorite': -abs(spread),
+            'over_under_line': game.total_line,
+            'stadium': game.stadium,
+            'stadium_neutral': game.location == "Neutral",
+            'weather_temperature': game.temp,
+            'weather_wind_mph': game.wind,
+            'weather_humidity': humidity,
+            'weather_detail': detail,
+        })
+
+    return pd.DataFrame(rows, columns=SPREADSPOKE_COLUMNS)
+
+
+def upsert_games(rows, csv_path=DATA_PATH):
+    """
+    Add games to the spreadspoke CSV, replacing rows for the same games.
+
+    Spreadspoke lists upcoming games with blank scores, so a game being
+    ingested may already have a row; that row is dropped and the complete
+    one appended. A row that only matches with home and away swapped (a
+    neutral-site game the sources list the other way round) is the same game,
+    as in merge_with_spreadspoke. Every other row is written back exactly as
+    it was read.
+
+    Args:
+        rows: Frame from schedule_rows
+        csv_path: Spreadspoke CSV
+
+    Returns:
+        tuple: (games added, games replaced)
+    """
+    existing = pd.read_csv(csv_path, dtype=str, keep_default_na=False)
+
+    # Same game = same (season, week, home franchise, away franchise), either way round
+    keys = spreadspoke_game_keys(existing)
+    new_keys = pd.MultiIndex.from_frame(spreadspoke_game_keys(rows)[GAME_KEY])
+    swapped_keys = keys.rename(columns={'home_id': 'away_id', 'away_id': 'home_id'})
+    known = ((keys['home_id'] != UNKNOWN_ID) & (keys['away_id'] != UNKNOWN_ID)).to_numpy()
+    is_replaced = (
+        pd.MultiIndex.from_frame(keys[GAME_KEY]).isin(new_keys) |
+        (pd.MultiIndex.from_frame(swapped_keys[GAME_KEY]).isin(new_keys) & known)
+    )
+
+    updated = pd.concat([existing[~is_replaced], rows[existing.columns]], ignore_index=True)
+
+    tmp_path = csv_path + ".tmp"
+    updated.to_csv(tmp_path, index=False)
+    os.replace(tmp_path, csv_path)
+
+    n_replaced = int(is_replaced.sum())
+    return len(rows) - n_replaced, n_replaced
+
+
+def ingest_week(season, week, offline=False, csv_path=DATA_PATH, store_dir=PBP_STORE_DIR,
+                backend="pandas"):
+    """
+    Add one week's results to every local store.
+
+    1. Refresh the season's play-by-play file (skipped offline)
+    2. Read only that week's plays from it
+    3. Aggregate them and write the team-game and player-game rows for those
+       games into their stores (replacing any earlier rows for the same games)
+    4. Add or complete the week's spreadspoke rows
+    5. Mark the teams that played as dirty for refresh_team_state
+
+    Running it twice for the same week leaves the stores unchanged.
+
+    Args:
+        season: Season of the week
+        week: nflfastR week number (playoff rounds continue after the last regular week)
+        offline: Use the stored season file without downloading it again
+        csv_path: Spreadspoke CSV to update
+        store_dir: Play-by-play store
+        backend: Team-stats aggregation backend ("pandas" or "polars")
+
+    Returns:
+        dict: games ingested, spreadspoke rows added / replaced and dirty teams,
+              or None if there is nothing to ingest
+    """
+    print(f"Ingesting {season} week {week}...")
+
+    try:
+        if not sync_nflfastr_store([season], store_dir, offline=offline, workers=1):
+            print(f"✗ No play-by-play available for {season}")
+            return None
+    except FileNotFoundError as e:
+        print(f"✗ {e}")
+        return None
+
+    plays = read_week(season, week, store_dir)
+    plays = plays[plays['home_score'].notna() & plays['away_score'].notna()]
+    if plays.empty:
+        print(f"⚠ No completed games in {season} week {week}")
+        return None
+
+    # Team-game and player-game aggregates for the week's games
+    team_stats = aggregate_team_stats(plays, backend=backend)
+    game_store.append_stats(team_stats)
+    game_store.append_stats(
+        aggregate_player_stats(plays), game_store.PLAYER_GAMES_DIR, "player_games",
+        keys=game_store.PLAYER_KEY_COLUMNS
+    )
+
+    # Keep the manifest's game count current. A season stored by an older
+    # aggregation is left for aggregate_nflfastr_seasons to rebuild. Only a
+    # season already aggregated in full stays complete: one ingested week
+    # doesn't make a season without an entry complete, even a finished one.
+    manifest = game_store.load_manifest()
+    entry = manifest.get(str(season))
+    if entry is None or entry.get("version") == TEAM_STATS_VERSION:
+        game_store.record_season(
+            manifest, season, len(game_store.stored_game_ids(season)),
+            complete=entry is not None and entry.get("complete", False), version=TEAM_STATS_VERSION
+        )
+        game_store.save_manifest(manifest)
+
+    # Spreadspoke rows for the same games
+    rows = schedule_rows(plays)
+    added, replaced = upsert_games(rows, csv_path)
+
+    teams = sorted(set(rows['team_home']) | set(rows['team_away']))
+    mark_teams_dirty(teams, season, week)
+
+    print(f"✓ Ingested {len(rows)} game(s): {added} new spreadspoke row(s), "
+          f"{replaced} completed, {len(teams)} team(s) marked dirty")
+
+    return {
+        "games": len(rows),
+        "rows_added": added,
+        "rows_replaced": replaced,
+        "teams": teams,
+    }
@@ -0,0 +1,78 @@
+"""
+lazy_import.py
+Import-on-first-use for heavy optional dependencies.
+
+A LazyModule stands in for a module and only imports it when one of its
+attributes is first used, so entry points that never train or download (e.g.
+loading a saved model to predict) don't pay for nfl_data_py, xgboost or
+lightgbm at startup. is_available checks whether a package is installed without
+importing it.
+
+Brendan Dileo, October 2026
+"""
+
+import importlib
+import importlib.util
+
+
+def is_available(name):
+    """
+    Check whether a package is installed, without importing it.
+
+    Only the top-level package is looked up; finding a submodule's spec would
+    import its parent package.
+
+    Args:
+        name: Module name, e.g. "xgboost" or "pyarrow.feather"
+
+    Returns:
+        bool: True if the package can be found
+    """
+    try:
+        return importlib.util.find_spec(name.partition(".")[0]) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+class LazyModule:
+    """
+    Proxy for a module that is imported the first time it is used.
+
+    Attribute access imports the module and forwards to it. Import errors
+    surface at that point, so callers that use an optional dependency should
+    call load() inside a try block.
+    """
+
+    def __init__(self, name):
+        """
+        Args:
+            name: Full module name to import on first use
+        """
+        self._name = name
+        self._module = None
+
+    def load(self):
+        """Import the module (once) and return it."""
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return self._module
+
+    @property
+    def is_loaded(self):
+        """Whether the module has been imported yet."""
+        return self._module is not None
+
+    def __getattr__(self, attr):
+        # Own attributes missing means __init__ never ran (e.g. during copying)
+        if attr in ("_name", "_module"):
+            raise AttributeError(attr)
+        return getattr(self.load(), attr)
+
+    def __repr__(self):
+        state = "loaded" if self.is_loaded else "not loaded"
+        return f"<LazyModule {self._name!r} ({state})>"
+
+
+def lazy_import(name):
+    """Module proxy that imports name on first use."""
+    return LazyModule(name)
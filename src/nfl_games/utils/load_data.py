@@ -6,24 +6,48 @@ Loads NFL game data from spreadspoke CSV and optionally merges with nflfastR dat
 Brendan Dileo, October 2025
 """
 
+import contextlib
+import multiprocessing
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
 import pandas as pd
 import numpy as np
 
+from utils import data_manifest, game_store, polars_backend
+from utils.csv_cache import read_csv_cached
+from utils.lazy_import import is_available, lazy_import
+from utils.polars_backend import resolve_backend
+from utils.franchises import (
+    ABBR_TO_ID, NAME_TO_ID, UNKNOWN_ID, franchise_name, ids_from_abbreviations, ids_from_names
+)
+from utils.schema import PBP_SCHEMA, SPREADSPOKE_SCHEMA, apply_schema
+from utils.pbp_store import (
+    DOWNLOAD_WORKERS, PBP_STORE_DIR, fetch_seasons, is_season_final, load_manifest,
+    missing_seasons, needs_refresh, read_season, save_manifest, season_path
+)
+
 # Spreadspoke dataset path
 DATA_PATH = "data/spreadspoke_scores.csv"
 
-# Check if nfl_data_py is available
-try:
-    import nfl_data_py as nfl
-    NFL_DATA_AVAILABLE = True
-except ImportError:
-    NFL_DATA_AVAILABLE = False
+# nfl_data_py is only imported if the direct download fails
+NFL_DATA_AVAILABLE = is_available("nfl_data_py")
+nfl = lazy_import("nfl_data_py")
 
 
-def load_data():
-    """Load the base spreadspoke dataset."""
+def load_data(use_cache=True):
+    """
+    Load the base spreadspoke dataset.
+    
+    The CSV is parsed once into a typed Feather file next to it; later loads
+    memory-map that file while the CSV is unchanged.
+    
+    Args:
+        use_cache: Whether to use the typed binary cache of the CSV
+    """
     try:
-        df = pd.read_csv(DATA_PATH)
+        df = read_csv_cached(DATA_PATH, SPREADSPOKE_SCHEMA, use_cache=use_cache)
         print(f"Data loaded successfully! Rows: {len(df)}, Columns: {len(df.columns)}")
         return df
     except FileNotFoundError:
@@ -31,54 +55,143 @@ def load_data():
         return None
 
 
-def download_nflfastr_data(seasons=None, cache=True):
+def unreadable_seasons(seasons, store_dir=PBP_STORE_DIR):
     """
-    Download play-by-play data from nflfastR.
+    Stored season files that can't be read (e.g. an interrupted copy).
+    
+    Files unchanged since the data manifest recorded them are trusted
+    without being opened; any other file has its Parquet footer read.
+    
+    Returns:
+        list: Seasons whose file exists but is truncated or corrupt
+    """
+    recorded = data_manifest.load_manifest()
+    corrupt = []
+    for season in seasons:
+        path = season_path(season, store_dir)
+        if not os.path.exists(path):
+            continue
+        try:
+            data_manifest.check_parquet(path, manifest=recorded)
+        except ValueError as e:
+            print(f"⚠ {e}")
+            corrupt.append(season)
+    return corrupt
+
+
+def sync_nflfastr_store(seasons, store_dir=PBP_STORE_DIR, cache=True, offline=False,
+                        workers=DOWNLOAD_WORKERS):
+    """
+    Make sure each season's play-by-play file is on disk.
+    
+    Missing, unrecorded and in-progress seasons are downloaded; finished
+    seasons already in the store are left alone.
     
     Args:
-        seasons: List of seasons to download (e.g., [2020, 2021, 2022])
-                 If None, downloads 2015-2024
-        cache: Whether to cache data locally (faster on subsequent runs)
+        seasons: Seasons to sync
+        store_dir: Store location (a throwaway directory when not caching)
+        cache: Whether store_dir is the persistent store (record fetches in its manifest)
+        offline: Never touch the network; fail if any season is not cached
+        workers: Number of seasons to download concurrently
         
     Returns:
-        pd.DataFrame: Play-by-play data
+        list: Seasons that have a file in store_dir, in the order given
     """
-    if not NFL_DATA_AVAILABLE:
-        raise ImportError("nfl_data_py is required. Install with: pip install nfl_data_py")
+    corrupt = unreadable_seasons(seasons, store_dir)
     
+    if offline:
+        missing = missing_seasons(seasons, store_dir)
+        if missing:
+            raise FileNotFoundError(
+                f"Offline mode: no cached play-by-play for seasons {missing}. "
+                "Run once with offline=False to download them."
+            )
+        if corrupt:
+            raise ValueError(
+                f"Offline mode: cached play-by-play for seasons {corrupt} is truncated or corrupt. "
+                "Run once with offline=False to download them again."
+            )
+        return list(seasons)
+    
+    print(f"Loading nflfastR data for seasons: {seasons[0]}-{seasons[-1]}")
+    
+    manifest = load_manifest(store_dir) if cache else {}
+    stale = [
+        season for season in seasons
+        if season in corrupt or needs_refresh(season, manifest, store_dir)
+    ]
+    
+    failed = {}
+    if stale:
+        print(f"Downloading {len(stale)} season(s) from GitHub with up to {workers} workers...")
+        print("Please be patient - this may take a few minutes...")
+        fetched, failed = fetch_seasons(stale, store_dir, workers=workers)
+        
+        if cache and fetched:
+            manifest.update({str(season): entry for season, entry in fetched.items()})
+            save_manifest(manifest, store_dir)
+    
+    available = []
+    for season in seasons:
+        if not os.path.exists(season_path(season, store_dir)):
+            # Download failed and nothing cached, continue with other seasons
+            continue
+        if season in failed:
+            print(f"  Using previously cached {season} data instead")
+        available.append(season)
+    
+    return available
+
+
+def iter_nflfastr_seasons(seasons=None, cache=True, offline=False, columns=None,
+                          workers=DOWNLOAD_WORKERS):
+    """
+    Yield nflfastR play-by-play one season at a time.
+    
+    Seasons are downloaded (or read from the local store) up front, then
+    read and yielded in order, so a consumer that reduces each season before
+    asking for the next never holds more than one season of plays.
+    
+    Args:
+        seasons: List of seasons to load (None = 2015-2024)
+        cache: Whether to cache data locally (faster on subsequent runs).
+               Finished seasons are read from the local store; only a season
+               still in progress is downloaded again.
+        offline: Never touch the network; fail if any season is not cached
+        columns: Optional list of columns to load (e.g. PBP_COLUMNS).
+                 Only these columns are read from each Parquet file.
+        workers: Number of seasons to download concurrently
+        
+    Yields:
+        tuple: (season, pd.DataFrame of that season's plays, with PBP_SCHEMA applied)
+    """
     if seasons is None:
         # Default to recent seasons (nflfastR data is best from 2015+)
         seasons = list(range(2015, 2025))
     
-    print(f"Downloading nflfastR data for seasons: {seasons[0]}-{seasons[-1]}")
-    print("This will download directly from GitHub...")
-    print("Please be patient - this may take a few minutes...")
+    if not offline and not NFL_DATA_AVAILABLE:
+        raise ImportError("nfl_data_py is required. Install with: pip install nfl_data_py")
     
-    # Direct download approach - more reliable than cache-based approach
-    all_pbp = []
+    # Without caching, seasons go to a throwaway directory instead of the store
+    store = contextlib.nullcontext(PBP_STORE_DIR) if cache else tempfile.TemporaryDirectory()
     
-    for season in seasons:
-        try:
-            url = f'https://github.com/nflverse/nflverse-data/releases/download/pbp/play_by_play_{season}.parquet'
-            print(f"  Downloading {season}...", end=" ", flush=True)
-            
-            # Download directly using pandas
-            season_pbp = pd.read_parquet(url)
-            all_pbp.append(season_pbp)
-            print(f"✓ ({len(season_pbp):,} plays)")
+    with store as store_dir:
+        available = sync_nflfastr_store(seasons, store_dir, cache, offline=offline, workers=workers)
+        
+        for season in available:
+            season_pbp = apply_schema(read_season(season, store_dir, columns=columns), PBP_SCHEMA)
+            print(f"  {season}: {len(season_pbp):,} plays")
+            yield season, season_pbp
             
-        except Exception as e:
-            print(f"✗ Failed: {e}")
-            # Continue to try other seasons
-            continue
+            # Drop our reference before reading the next season
+            del season_pbp
     
-    if not all_pbp:
+    if not available and not offline:
         # If direct download fails, try the nfl_data_py library as backup
         print("\nDirect download failed. Trying nfl_data_py library...")
         try:
-            pbp_data = nfl.import_pbp_data(seasons, cache=False)
+            pbp_data = nfl.import_pbp_data(seasons, columns=columns, cache=False)
             print(f"✓ Downloaded {len(pbp_data):,} plays via library")
-            return pbp_data
         except:
             raise ValueError(
                 "Failed to download nflfastR data. Please try:\n"
@@ -87,165 +200,686 @@ def download_nflfastr_data(seasons=None, cache=True):
                 "3. Try again later (GitHub rate limiting)\n"
                 "4. Or use the model without EPA features (answer 'n' when prompted)"
             )
+        for season, season_pbp in pbp_data.groupby('season', sort=True):
+            yield season, apply_schema(season_pbp, PBP_SCHEMA)
+
+
+def download_nflfastr_data(seasons=None, cache=True, offline=False, columns=None,
+                           workers=DOWNLOAD_WORKERS):
+    """
+    Download play-by-play data from nflfastR.
+    
+    Loads every season into a single frame; prefer iter_nflfastr_seasons or
+    aggregate_nflfastr_seasons when only per-season results are needed.
+    
+    Args:
+        seasons: List of seasons to download (e.g., [2020, 2021, 2022])
+                 If None, downloads 2015-2024
+        cache: Whether to cache data locally (faster on subsequent runs)
+        offline: Never touch the network; fail if any season is not cached
+        columns: Optional list of columns to load (e.g. PBP_COLUMNS)
+        workers: Number of seasons to download concurrently
+        
+    Returns:
+        pd.DataFrame: Play-by-play data
+    """
+    all_pbp = [
+        season_pbp for _, season_pbp in
+        iter_nflfastr_seasons(seasons, cache, offline=offline, columns=columns, workers=workers)
+    ]
     
     # Combine all seasons
     pbp_data = pd.concat(all_pbp, ignore_index=True)
-    print(f"\n✓ Successfully downloaded {len(pbp_data):,} total plays from {len(all_pbp)} seasons")
+    print(f"\n✓ Successfully loaded {len(pbp_data):,} total plays from {len(all_pbp)} seasons")
     
     return pbp_data
 
-def aggregate_team_stats(pbp_data):
+
+# Play-by-play columns read by aggregate_team_stats and aggregate_player_stats.
+# Loading only these keeps the pbp frame to a small fraction of the ~370 columns
+# nflfastR publishes.
+PBP_COLUMNS = [
+    # Game context
+    'game_id', 'season', 'week', 'home_team', 'away_team',
+    'posteam', 'defteam', 'play_type',
+    # Efficiency
+    'epa', 'success', 'yards_gained', 'air_yards', 'yards_after_catch',
+    # Play flags
+    'pass_attempt', 'rush_attempt', 'complete_pass', 'touchdown',
+    'interception', 'fumble_lost', 'fumble_forced', 'sack',
+    'pass_touchdown', 'rush_touchdown',
+    # Situation
+    'down', 'yardline_100', 'fixed_drive', 'wp', 'half_seconds_remaining',
+    'third_down_converted', 'third_down_failed',
+    # Players involved
+    'passer_player_id', 'passer_player_name',
+    'receiver_player_id', 'receiver_player_name',
+    'rusher_player_id', 'rusher_player_name'
+]
+
+# Bump when the output of the aggregation pass (team or player stats) changes
+# so stored seasons get rebuilt
+TEAM_STATS_VERSION = 4
+
+# Output columns of aggregate_team_stats, in order
+TEAM_STATS_COLUMNS = [
+    'game_id', 'team',
+    'epa_per_play', 'epa_total', 'epa_std',
+    'success_rate',
+    'pass_attempts', 'rush_attempts',
+    'explosive_plays',
+    'touchdowns',
+    'interceptions', 'fumbles_lost', 'turnovers',
+    'pass_epa', 'pass_success_rate', 'avg_air_yards', 'avg_yac', 'completion_pct',
+    'rush_epa', 'rush_success_rate', 'avg_rush_yards',
+    'red_zone_trips', 'red_zone_td_rate', 'third_downs', 'third_down_conv_rate',
+    'early_down_epa', 'neutral_pass_rate',
+    'def_epa_allowed', 'def_success_rate_allowed',
+    'sacks', 'def_interceptions', 'forced_fumbles', 'def_turnovers_created',
+    'season', 'week', 'home_team', 'away_team'
+]
+
+# Situational splits in TEAM_STATS_COLUMNS (left out with splits=False)
+SITUATIONAL_COLUMNS = [
+    'red_zone_trips', 'red_zone_td_rate', 'third_downs', 'third_down_conv_rate',
+    'early_down_epa', 'neutral_pass_rate'
+]
+
+# Neutral situation for pass rate: early down, win probability 20-80%,
+# outside the last two minutes of either half
+NEUTRAL_WP = (0.2, 0.8)
+NEUTRAL_MIN_HALF_SECONDS = 120
+
+
+def aggregate_team_stats(pbp_data, splits=True, backend="pandas"):
     """
     Aggregate play-by-play data into game-level team statistics.
     
     Creates advanced metrics like EPA (Expected Points Added), success rate,
     explosive play rate, etc. for each team in each game.
     
+    Indicator and masked-value columns (e.g. EPA on pass plays only, NaN
+    elsewhere) are built once, so every offense, pass and rush metric comes
+    out of a single grouped reduction by (game_id, posteam) and every defense
+    metric out of a second one by (game_id, defteam). All reductions are
+    built-in Cython aggregations; NaN masking makes a mean over the masked
+    column equal to the mean over the filtered plays.
+    
+    Situational splits use the same masking: red-zone trips and touchdown
+    trips are distinct drive numbers masked to red-zone plays, third-down
+    conversions are sums of nflfastR's conversion flags, and early-down EPA
+    and neutral-situation pass rate are means over masked columns.
+    
     Args:
-        pbp_data: Play-by-play DataFrame from nflfastR
+        pbp_data: Play-by-play DataFrame from nflfastR (needs PBP_COLUMNS)
+        splits: Include the situational splits (SITUATIONAL_COLUMNS)
+        backend: "pandas" or "polars" (see polars_backend)
         
     Returns:
         pd.DataFrame: Game-level team statistics
     """
     
+    if resolve_backend(backend) == "polars":
+        return polars_backend.aggregate_team_stats(pbp_data, splits)
+    
     # Filter to regular plays (exclude penalties, timeouts, etc.)
     plays = pbp_data[
         (pbp_data['play_type'].isin(['run', 'pass'])) &
         (pbp_data['epa'].notna())
-    ].copy()
+    ]
     
     print(f"Analyzing {len(plays):,} offensive plays...")
     
-    # Create game identifier
-    plays['game_id'] = plays['game_id'].astype(str)
-    
-    # First, get game context (season, week, home/away teams) separately
-    game_context = plays.groupby('game_id').agg({
-        'season': 'first',
-        'week': 'first',
-        'home_team': 'first',
-        'away_team': 'first'
-    }).reset_index()
-    
-    # Calculate stats for OFFENSE (posteam)
-    offense_stats = plays.groupby(['game_id', 'posteam']).agg({
-        # EPA metrics
-        'epa': ['mean', 'sum', 'std'],
-        
-        # Success rate (positive EPA plays)
-        'success': 'mean',
+    is_pass = plays['pass_attempt'] == 1
+    is_rush = plays['rush_attempt'] == 1
+    
+    # Precompute every column the reductions need, once
+    work = {
+        'game_id': plays['game_id'].astype(str),
+        'posteam': plays['posteam'],
+        'defteam': plays['defteam'],
         
-        # Play type breakdown
-        'pass_attempt': 'sum',
-        'rush_attempt': 'sum',
+        # Game context (constant within a game)
+        'season': plays['season'],
+        'week': plays['week'],
+        'home_team': plays['home_team'],
+        'away_team': plays['away_team'],
         
-        # Explosive plays (20+ yard gains)
-        'yards_gained': lambda x: (x >= 20).sum(),
+        # All plays
+        'epa': plays['epa'],
+        'success': plays['success'],
+        'pass_attempt': plays['pass_attempt'],
+        'rush_attempt': plays['rush_attempt'],
+        'explosive': plays['yards_gained'] >= 20,  # 20+ yard gains
+        'touchdown': plays['touchdown'],
+        'interception': plays['interception'],
+        'fumble_lost': plays['fumble_lost'],
+        'sack': plays['sack'],
+        'fumble_forced': plays['fumble_forced'],
         
-        # Scoring
-        'touchdown': 'sum',
+        # Pass plays only (NaN elsewhere)
+        'pass_epa': plays['epa'].where(is_pass),
+        'pass_success': plays['success'].where(is_pass),
+        'pass_air_yards': plays['air_yards'].where(is_pass),
+        'pass_yac': plays['yards_after_catch'].where(is_pass),
+        'pass_complete': plays['complete_pass'].where(is_pass),
         
-        # Turnovers
-        'interception': 'sum',
-        'fumble_lost': 'sum'
-    }).reset_index()
-    
-    # Flatten column names
-    offense_stats.columns = [
-        'game_id', 'team',
-        'epa_per_play', 'epa_total', 'epa_std',
-        'success_rate',
-        'pass_attempts', 'rush_attempts',
-        'explosive_plays',
-        'touchdowns',
-        'interceptions', 'fumbles_lost'
-    ]
-    
-    # Add total turnovers
-    offense_stats['turnovers'] = (
-        offense_stats['interceptions'] + offense_stats['fumbles_lost']
-    )
-    
-    # Calculate passing stats separately
-    pass_plays = plays[plays['pass_attempt'] == 1].groupby(['game_id', 'posteam']).agg({
-        'epa': 'mean',
-        'success': 'mean',
-        'air_yards': 'mean',
-        'yards_after_catch': 'mean',
-        'complete_pass': 'mean'
-    }).reset_index()
-    
-    pass_plays.columns = [
-        'game_id', 'team',
-        'pass_epa', 'pass_success_rate', 
-        'avg_air_yards', 'avg_yac', 'completion_pct'
-    ]
+        # Rush plays only (NaN elsewhere)
+        'rush_epa': plays['epa'].where(is_rush),
+        'rush_success': plays['success'].where(is_rush),
+        'rush_yards': plays['yards_gained'].where(is_rush),
+    }
+    situational = {}
     
-    # Calculate rushing stats separately
-    rush_plays = plays[plays['rush_attempt'] == 1].groupby(['game_id', 'posteam']).agg({
-        'epa': 'mean',
-        'success': 'mean',
-        'yards_gained': 'mean'
-    }).reset_index()
+    if splits:
+        is_early_down = plays['down'] <= 2
+        in_red_zone = plays['yardline_100'] <= 20
+        offense_td = (plays['pass_touchdown'] == 1) | (plays['rush_touchdown'] == 1)
+        is_neutral = (
+            is_early_down &
+            plays['wp'].between(*NEUTRAL_WP) &
+            (plays['half_seconds_remaining'] > NEUTRAL_MIN_HALF_SECONDS)
+        )
+        
+        work.update({
+            # Drive numbers on red-zone plays (NaN elsewhere)
+            'rz_drive': plays['fixed_drive'].where(in_red_zone),
+            'rz_td_drive': plays['fixed_drive'].where(in_red_zone & offense_td),
+            'third_down_converted': plays['third_down_converted'],
+            'third_down_failed': plays['third_down_failed'],
+            'early_epa': plays['epa'].where(is_early_down),
+            'neutral_pass': plays['pass_attempt'].where(is_neutral),
+        })
+        situational = {
+            'red_zone_trips': ('rz_drive', 'nunique'),
+            'red_zone_td_trips': ('rz_td_drive', 'nunique'),
+            'third_down_conversions': ('third_down_converted', 'sum'),
+            'third_down_failures': ('third_down_failed', 'sum'),
+            'early_down_epa': ('early_epa', 'mean'),
+            'neutral_pass_rate': ('neutral_pass', 'mean'),
+        }
     
-    rush_plays.columns = [
-        'game_id', 'team',
-        'rush_epa', 'rush_success_rate', 'avg_rush_yards'
-    ]
+    work = pd.DataFrame(work)
     
-    # Merge all offensive stats (without game_context yet)
-    team_stats = offense_stats.merge(
-        pass_plays, on=['game_id', 'team'], how='left'
-    ).merge(
-        rush_plays, on=['game_id', 'team'], how='left'
+    # OFFENSE (posteam): overall, passing, rushing and game context in one pass
+    team_stats = work.groupby(['game_id', 'posteam'], observed=True).agg(
+        epa_per_play=('epa', 'mean'),
+        epa_total=('epa', 'sum'),
+        epa_std=('epa', 'std'),
+        success_rate=('success', 'mean'),
+        pass_attempts=('pass_attempt', 'sum'),
+        rush_attempts=('rush_attempt', 'sum'),
+        explosive_plays=('explosive', 'sum'),
+        touchdowns=('touchdown', 'sum'),
+        interceptions=('interception', 'sum'),
+        fumbles_lost=('fumble_lost', 'sum'),
+        pass_epa=('pass_epa', 'mean'),
+        pass_success_rate=('pass_success', 'mean'),
+        avg_air_yards=('pass_air_yards', 'mean'),
+        avg_yac=('pass_yac', 'mean'),
+        completion_pct=('pass_complete', 'mean'),
+        rush_epa=('rush_epa', 'mean'),
+        rush_success_rate=('rush_success', 'mean'),
+        avg_rush_yards=('rush_yards', 'mean'),
+        season=('season', 'first'),
+        week=('week', 'first'),
+        home_team=('home_team', 'first'),
+        away_team=('away_team', 'first'),
+        **situational,
     )
+    team_stats.index.names = ['game_id', 'team']
+    
+    # Add total turnovers
+    team_stats['turnovers'] = team_stats['interceptions'] + team_stats['fumbles_lost']
     
     # Fill NaN values for games with no pass/rush attempts
     fill_cols = ['pass_epa', 'pass_success_rate', 'avg_air_yards', 'avg_yac', 
                  'completion_pct', 'rush_epa', 'rush_success_rate', 'avg_rush_yards']
-    team_stats[fill_cols] = team_stats[fill_cols].fillna(0)
     
-    # Calculate stats for DEFENSE (defteam) - opponent's EPA
-    defense_stats = plays.groupby(['game_id', 'defteam']).agg({
-        'epa': 'mean',
-        'success': 'mean',
-        'sack': 'sum',
-        'interception': 'sum',
-        'fumble_forced': 'sum'
-    }).reset_index()
-    
-    defense_stats.columns = [
-        'game_id', 'team',
-        'def_epa_allowed', 'def_success_rate_allowed',
-        'sacks', 'def_interceptions', 'forced_fumbles'
-    ]
+    if splits:
+        # Rates from the situational counts (0 when there was no opportunity)
+        team_stats['red_zone_td_rate'] = team_stats['red_zone_td_trips'] / team_stats['red_zone_trips']
+        team_stats['third_downs'] = (
+            team_stats['third_down_conversions'] + team_stats['third_down_failures']
+        )
+        team_stats['third_down_conv_rate'] = (
+            team_stats['third_down_conversions'] / team_stats['third_downs']
+        )
+        fill_cols += ['red_zone_td_rate', 'third_down_conv_rate', 'early_down_epa',
+                      'neutral_pass_rate']
     
-    # Merge offense and defense
-    team_stats = team_stats.merge(
-        defense_stats, on=['game_id', 'team'], how='left'
+    team_stats[fill_cols] = team_stats[fill_cols].fillna(0)
+    
+    # DEFENSE (defteam): opponent's EPA and takeaways
+    defense_stats = work.groupby(['game_id', 'defteam'], observed=True).agg(
+        def_epa_allowed=('epa', 'mean'),
+        def_success_rate_allowed=('success', 'mean'),
+        sacks=('sack', 'sum'),
+        def_interceptions=('interception', 'sum'),
+        forced_fumbles=('fumble_forced', 'sum'),
     )
+    defense_stats.index.names = ['game_id', 'team']
+    
+    # Line defense up with the offense rows (left join on game and team)
+    team_stats = team_stats.join(defense_stats, how='left')
     
     # Add defensive turnovers created
     team_stats['def_turnovers_created'] = (
         team_stats['def_interceptions'] + team_stats['forced_fumbles']
     )
     
-    # **CRITICAL FIX: Merge game_context ONCE at the very end**
-    # This was being merged twice in the original code, causing duplicate columns
-    team_stats = team_stats.merge(game_context, on='game_id', how='left')
+    output_cols = [col for col in TEAM_STATS_COLUMNS if splits or col not in SITUATIONAL_COLUMNS]
+    team_stats = team_stats.reset_index()[output_cols]
+    
+    # Team keys go back to plain strings (they may be categoricals from PBP_SCHEMA)
+    for col in ['team', 'home_team', 'away_team']:
+        team_stats[col] = team_stats[col].astype(str)
     
     print(f"✓ Aggregated stats for {len(team_stats)} team-games")
     
     return team_stats
 
 
-def merge_with_spreadspoke(spreadspoke_df, nflfastr_stats):
+# Output columns of aggregate_player_stats, in order
+PLAYER_STATS_COLUMNS = [
+    'game_id', 'player_id', 'player_name', 'team', 'season', 'week',
+    'pass_attempts', 'completions', 'passing_yards', 'passing_air_yards',
+    'passing_epa', 'passing_tds', 'interceptions',
+    'targets', 'receptions', 'receiving_yards', 'receiving_air_yards',
+    'receiving_epa', 'receiving_tds',
+    'carries', 'rushing_yards', 'rushing_epa', 'rushing_tds'
+]
+
+# Player stats that are counts of plays (stored as integers)
+PLAYER_COUNT_COLUMNS = [
+    'pass_attempts', 'completions', 'passing_tds', 'interceptions',
+    'targets', 'receptions', 'receiving_tds', 'carries', 'rushing_tds'
+]
+
+
+def aggregate_player_stats(pbp_data):
+    """
+    Aggregate play-by-play data into per-player game usage.
+    
+    Uses the same plays as aggregate_team_stats. Every play contributes one
+    row per role it has a player for (passer, receiver, rusher), carrying only
+    that role's values; the stacked rows are then summed per (game_id,
+    player_id) in one grouped reduction. A quarterback who also scrambles
+    therefore gets passing and rushing numbers on the same row.
+    
+    Args:
+        pbp_data: Play-by-play DataFrame from nflfastR (needs PBP_COLUMNS)
+        
+    Returns:
+        pd.DataFrame: One row per player per game (PLAYER_STATS_COLUMNS)
+    """
+    plays = pbp_data[
+        (pbp_data['play_type'].isin(['run', 'pass'])) &
+        (pbp_data['epa'].notna())
+    ]
+    
+    context = {
+        'game_id': plays['game_id'].astype(str),
+        'team': plays['posteam'],
+        'season': plays['season'],
+        'week': plays['week'],
+    }
+    is_attempt = (plays['pass_attempt'] == 1) & (plays['sack'] == 0)
+    completed_yards = plays['yards_gained'] * plays['complete_pass']
+    
+    def role_rows(id_col, name_col, **values):
+        """Rows for the plays that have a player in this role."""
+        has_player = plays[id_col].notna()
+        rows = pd.DataFrame({
+            **context,
+            'player_id': plays[id_col],
+            'player_name': plays[name_col],
+            **values,
+        })[has_player]
+        # Ids may be categoricals with different categories per role
+        return rows.astype({'player_id': str, 'player_name': str, 'team': str})
+    
+    roles = [
+        # Dropbacks, including sacks (which count toward EPA but not attempts)
+        role_rows(
+            'passer_player_id', 'passer_player_name',
+            pass_attempts=is_attempt,
+            completions=plays['complete_pass'],
+            passing_yards=completed_yards,
+            passing_air_yards=plays['air_yards'].where(is_attempt),
+            passing_epa=plays['epa'],
+            passing_tds=plays['pass_touchdown'],
+            interceptions=plays['interception'],
+        ),
+        role_rows(
+            'receiver_player_id', 'receiver_player_name',
+            targets=plays['pass_attempt'],
+            receptions=plays['complete_pass'],
+            receiving_yards=completed_yards,
+            receiving_air_yards=plays['air_yards'],
+            receiving_epa=plays['epa'],
+            receiving_tds=plays['pass_touchdown'],
+        ),
+        role_rows(
+            'rusher_player_id', 'rusher_player_name',
+            carries=plays['rush_attempt'],
+            rushing_yards=plays['yards_gained'],
+            rushing_epa=plays['epa'],
+            rushing_tds=plays['rush_touchdown'],
+        ),
+    ]
+    
+    value_cols = PLAYER_STATS_COLUMNS[6:]
+    stacked = pd.concat(roles, ignore_index=True)
+    
+    # Sums skip NaN, so a column a role doesn't carry adds nothing
+    player_stats = stacked.groupby(['game_id', 'player_id'], sort=True).agg(
+        player_name=('player_name', 'first'),
+        team=('team', 'first'),
+        season=('season', 'first'),
+        week=('week', 'first'),
+        **{col: (col, 'sum') for col in value_cols},
+    ).reset_index()[PLAYER_STATS_COLUMNS]
+    
+    player_stats = player_stats.astype({col: 'int32' for col in PLAYER_COUNT_COLUMNS})
+    
+    print(f"✓ Aggregated usage for {len(player_stats)} player-games")
+    
+    return player_stats
+
+
+def aggregate_season_file(season, store_dir=PBP_STORE_DIR, skip_game_ids=frozenset(),
+                          backend="pandas"):
+    """
+    Read one season's play-by-play file and aggregate it.
+    
+    Runs in a worker process when aggregating in parallel, so it takes a path
+    rather than a DataFrame and only the small team-game and player-game
+    results are sent back.
+    
+    Args:
+        season: Season to aggregate
+        store_dir: Play-by-play store to read from
+        skip_game_ids: Game ids to leave out (already aggregated)
+        backend: Team-stats aggregation backend ("pandas" or "polars")
+        
+    Returns:
+        tuple: (season, number of games aggregated, team-game stats or None,
+                player-game stats or None)
+    """
+    season_pbp = apply_schema(read_season(season, store_dir, columns=PBP_COLUMNS), PBP_SCHEMA)
+    if skip_game_ids:
+        season_pbp = season_pbp[~season_pbp['game_id'].astype(str).isin(skip_game_ids)]
+    
+    n_games = season_pbp['game_id'].nunique()
+    if not n_games:
+        return season, 0, None, None
+    team_stats = aggregate_team_stats(season_pbp, backend=backend)
+    return season, n_games, team_stats, aggregate_player_stats(season_pbp)
+
+
+def map_season_files(seasons, store_dir=PBP_STORE_DIR, n_jobs=1, skip_game_ids=None,
+                     backend="pandas"):
+    """
+    Aggregate season files, fanning seasons out to a process pool.
+    
+    Each worker reads its own season from disk. Results come back in the
+    order of seasons whatever order the workers finish in.
+    
+    Args:
+        seasons: Seasons to aggregate (each must have a file in store_dir)
+        store_dir: Play-by-play store to read from
+        n_jobs: Worker processes (1 = in this process, -1 = one per CPU)
+        skip_game_ids: Optional dict of season -> game ids to leave out
+        backend: Team-stats aggregation backend ("pandas" or "polars")
+        
+    Yields:
+        tuple: aggregate_season_file's result for each season
+    """
+    skip_game_ids = skip_game_ids or {}
+    skips = [skip_game_ids.get(season, frozenset()) for season in seasons]
+    stores = [store_dir] * len(seasons)
+    backends = [backend] * len(seasons)
+    
+    if n_jobs == -1:
+        n_jobs = os.cpu_count() or 1
+    n_jobs = min(n_jobs, len(seasons))
+    
+    if n_jobs <= 1:
+        yield from map(aggregate_season_file, seasons, stores, skips, backends)
+        return
+    
+    print(f"Aggregating {len(seasons)} season(s) with {n_jobs} worker processes...")
+    # Forking a process that has started Polars' thread pool can deadlock the
+    # child, so Polars workers start from a fresh interpreter instead
+    context = multiprocessing.get_context("spawn") if backend == "polars" else None
+    with ProcessPoolExecutor(max_workers=n_jobs, mp_context=context) as executor:
+        yield from executor.map(aggregate_season_file, seasons, stores, skips, backends)
+
+
+def aggregate_nflfastr_seasons(seasons=None, cache=True, offline=False,
+                               workers=DOWNLOAD_WORKERS, force_rebuild=False, n_jobs=1,
+                               backend="pandas"):
+    """
+    Stream play-by-play through aggregate_team_stats one season at a time.
+    
+    Each season is read, reduced to team-game rows and released before the
+    next one is read, so peak memory is one season of plays plus the small
+    aggregate instead of every play of every season. Game ids start with the
+    season, so concatenating per-season results in season order gives exactly
+    the frame aggregate_team_stats would return for all seasons at once.
+    
+    With n_jobs > 1 seasons are aggregated in parallel worker processes, each
+    reading its own season file; results are still combined in season order,
+    so the output is identical to the serial path.
+    
+    With cache enabled the results are kept in the team-game store, next to
+    the per-player usage built from the same plays (see load_player_games),
+    and only games that are not stored yet are aggregated. A season that was over when
+    it was stored is not read at all, so a weekly refresh only touches the
+    current season's new games.
+    
+    Args:
+        seasons: List of seasons for nflfastR (None = 2015-2024)
+        cache: Whether to cache nflfastR downloads and team-game stats
+        offline: Only use locally cached seasons, never download
+        workers: Number of seasons to download concurrently
+        force_rebuild: Discard the team-game store and aggregate everything again
+        n_jobs: Processes aggregating seasons (1 = serial, -1 = one per CPU)
+        backend: Team-stats aggregation backend ("pandas" or "polars")
+        
+    Returns:
+        pd.DataFrame: Game-level team statistics, or None if nothing loaded
+    """
+    seasons = sorted(seasons) if seasons is not None else list(range(2015, 2025))
+    
+    if not cache:
+        season_stats = []
+        if n_jobs != 1:
+            if not offline and not NFL_DATA_AVAILABLE:
+                raise ImportError("nfl_data_py is required. Install with: pip install nfl_data_py")
+            with tempfile.TemporaryDirectory() as store_dir:
+                available = sync_nflfastr_store(seasons, store_dir, cache, offline=offline, workers=workers)
+                for _, _, stats, _ in map_season_files(available, store_dir, n_jobs, backend=backend):
+                    if stats is not None:
+                        season_stats.append(stats)
+        else:
+            for season, season_pbp in iter_nflfastr_seasons(
+                seasons, cache, offline=offline, columns=PBP_COLUMNS, workers=workers
+            ):
+                season_stats.append(aggregate_team_stats(season_pbp, backend=backend))
+                del season_pbp
+        
+        if not season_stats:
+            return None
+        
+        return pd.concat(season_stats, ignore_index=True)
+    
+    if force_rebuild:
+        print("Rebuilding team-game store from scratch...")
+        game_store.clear_store()
+        game_store.clear_store(game_store.PLAYER_GAMES_DIR)
+    
+    manifest = game_store.load_manifest()
+    pending = []
+    for season in seasons:
+        if game_store.is_season_stored(manifest, season, TEAM_STATS_VERSION):
+            continue
+        if str(season) in manifest and manifest[str(season)].get("version") != TEAM_STATS_VERSION:
+            # Stored by an older aggregation, redo the whole season
+            game_store.clear_season(season)
+            game_store.clear_season(season, game_store.PLAYER_GAMES_DIR)
+            del manifest[str(season)]
+        pending.append(season)
+    
+    if len(pending) < len(seasons):
+        print(f"Team-game stats for {len(seasons) - len(pending)} finished season(s) already stored")
+    
+    def store_season(season, n_stored, n_new, stats, player_stats):
+        if n_new:
+            print(f"  {season}: aggregating {n_new} new game(s)")
+            game_store.append_stats(stats)
+            game_store.append_stats(
+                player_stats, game_store.PLAYER_GAMES_DIR, "player_games",
+                keys=game_store.PLAYER_KEY_COLUMNS
+            )
+        game_store.record_season(
+            manifest, season, n_stored + n_new,
+            complete=is_season_final(season), version=TEAM_STATS_VERSION
+        )
+        game_store.save_manifest(manifest)
+    
+    if pending and n_jobs != 1:
+        if not offline and not NFL_DATA_AVAILABLE:
+            raise ImportError("nfl_data_py is required. Install with: pip install nfl_data_py")
+        available = sync_nflfastr_store(pending, cache=cache, offline=offline, workers=workers)
+        stored = {season: game_store.stored_game_ids(season) for season in available}
+        for season, n_new, stats, player_stats in map_season_files(
+            available, n_jobs=n_jobs, skip_game_ids=stored, backend=backend
+        ):
+            store_season(season, len(stored[season]), n_new, stats, player_stats)
+    elif pending:
+        for season, season_pbp in iter_nflfastr_seasons(
+            pending, cache, offline=offline, columns=PBP_COLUMNS, workers=workers
+        ):
+            stored = game_store.stored_game_ids(season)
+            game_ids = season_pbp['game_id'].astype(str)
+            new_pbp = season_pbp[~game_ids.isin(stored)] if stored else season_pbp
+            del season_pbp
+            
+            n_new = new_pbp['game_id'].nunique()
+            if n_new:
+                store_season(season, len(stored), n_new,
+                             aggregate_team_stats(new_pbp, backend=backend),
+                             aggregate_player_stats(new_pbp))
+            else:
+                store_season(season, len(stored), 0, None, None)
+            del new_pbp
+    
+    return game_store.read_store(seasons)
+
+
+def load_player_games(seasons=None):
+    """
+    Read per-player game usage from the local player-game store.
+    
+    The store is filled by aggregate_nflfastr_seasons (with cache enabled) in
+    the same pass that builds the team-game stats, so nothing is downloaded.
+    
+    Args:
+        seasons: Seasons to read (None = 2015-2024)
+        
+    Returns:
+        pd.DataFrame: One row per player per game (PLAYER_STATS_COLUMNS),
+                      or None if nothing is stored
+    """
+    seasons = sorted(seasons) if seasons is not None else list(range(2015, 2025))
+    return game_store.read_store(
+        seasons, game_store.PLAYER_GAMES_DIR, keys=game_store.PLAYER_KEY_COLUMNS
+    )
+
+
+# nflfastR week numbers of the playoff rounds spreadspoke labels by name,
+# before and after the 2021 move to a 17-game (18-week) regular season
+PLAYOFF_WEEKS = {
+    'wildcard': (18, 19),
+    'division': (19, 20),
+    'conference': (20, 21),
+    'superbowl': (21, 22),
+}
+
+# Key identifying a game on both sides of the merge
+GAME_KEY = ['season', 'week', 'home_id', 'away_id']
+
+
+def spreadspoke_game_keys(spreadspoke_df):
+    """
+    Integer (season, week, home_id, away_id) keys for spreadspoke games.
+    
+    Playoff rounds ("Wildcard", "Division", ...) become nflfastR week numbers
+    and team names of any era map to franchise ids.
+    """
+    season = spreadspoke_df['schedule_season'].astype('int16')
+    week_label = spreadspoke_df['schedule_week'].astype(str).str.strip().str.lower()
+    week = pd.to_numeric(week_label, errors='coerce')
+    
+    for label, (before_2021, from_2021) in PLAYOFF_WEEKS.items():
+        is_round = week_label == label
+        week = week.mask(is_round, np.where(season >= 2021, from_2021, before_2021))
+    
+    return pd.DataFrame({
+        'season': season,
+        'week': week.fillna(-1).astype('int16'),
+        'home_id': ids_from_names(spreadspoke_df['team_home']),
+        'away_id': ids_from_names(spreadspoke_df['team_away']),
+    }, index=spreadspoke_df.index)
+
+
+def nflfastr_game_stats(nflfastr_stats):
+    """
+    Reshape team-game stats into one row per game with home_/away_ columns.
+    
+    Returns:
+        pd.DataFrame: Game stats indexed by GAME_KEY
+    """
+    stats = nflfastr_stats.assign(
+        season=nflfastr_stats['season'].astype('int16'),
+        week=nflfastr_stats['week'].astype('int16'),
+        home_id=ids_from_abbreviations(nflfastr_stats['home_team']),
+        away_id=ids_from_abbreviations(nflfastr_stats['away_team']),
+    )
+    
+    value_cols = [col for col in stats.columns
+                  if col not in GAME_KEY + ['game_id', 'team', 'home_team', 'away_team']]
+    
+    is_home = stats['team'] == stats['home_team']
+    is_away = stats['team'] == stats['away_team']
+    
+    home_stats = stats.loc[is_home].set_index(GAME_KEY)[value_cols].add_prefix('home_')
+    away_stats = stats.loc[is_away].set_index(GAME_KEY)[value_cols].add_prefix('away_')
+    
+    # join leaves one block per column; copy() packs them so the merged
+    # frame isn't fragmented before feature engineering adds to it
+    return home_stats.join(away_stats, how='outer').copy()
+
+
+def merge_with_spreadspoke(spreadspoke_df, nflfastr_stats, max_listed=10):
     """
     Merge nflfastR statistics with the existing spreadspoke dataset.
     
+    Both sides are keyed by integer (season, week, home franchise id, away
+    franchise id), so historical names such as "Washington Redskins" or
+    "Oakland Raiders" match their nflfastR abbreviations and playoff rounds
+    match their week numbers. Each spreadspoke game is then an indexed lookup
+    into the game stats. Games that only match with home and away swapped
+    (neutral sites) take their stats swapped back.
+    
+    Unmatched games on either side are listed instead of silently dropped.
+    
     Args:
         spreadspoke_df: Original spreadspoke DataFrame
         nflfastr_stats: Aggregated nflfastR team statistics
+        max_listed: How many unmatched games to print per side
         
     Returns:
         pd.DataFrame: Merged dataset with both sources
@@ -253,100 +887,78 @@ def merge_with_spreadspoke(spreadspoke_df, nflfastr_stats):
     
     print("Merging nflfastR data with spreadspoke dataset...")
     
-    # Standardize team names (nflfastR uses abbreviations)
-    team_name_map = {
-        'ARI': 'Arizona Cardinals',
-        'ATL': 'Atlanta Falcons',
-        'BAL': 'Baltimore Ravens',
-        'BUF': 'Buffalo Bills',
-        'CAR': 'Carolina Panthers',
-        'CHI': 'Chicago Bears',
-        'CIN': 'Cincinnati Bengals',
-        'CLE': 'Cleveland Browns',
-        'DAL': 'Dallas Cowboys',
-        'DEN': 'Denver Broncos',
-        'DET': 'Detroit Lions',
-        'GB': 'Green Bay Packers',
-        'HOU': 'Houston Texans',
-        'IND': 'Indianapolis Colts',
-        'JAX': 'Jacksonville Jaguars',
-        'KC': 'Kansas City Chiefs',
-        'LAC': 'Los Angeles Chargers',
-        'LA': 'Los Angeles Rams',
-        'LV': 'Las Vegas Raiders',
-        'MIA': 'Miami Dolphins',
-        'MIN': 'Minnesota Vikings',
-        'NE': 'New England Patriots',
-        'NO': 'New Orleans Saints',
-        'NYG': 'New York Giants',
-        'NYJ': 'New York Jets',
-        'PHI': 'Philadelphia Eagles',
-        'PIT': 'Pittsburgh Steelers',
-        'SEA': 'Seattle Seahawks',
-        'SF': 'San Francisco 49ers',
-        'TB': 'Tampa Bay Buccaneers',
-        'TEN': 'Tennessee Titans',
-        'WAS': 'Washington Commanders',
-        # Historical names
-        'OAK': 'Oakland Raiders',
-        'SD': 'San Diego Chargers',
-        'STL': 'St. Louis Rams'
-    }
+    spreadspoke_teams = set(spreadspoke_df['team_home'].dropna()) | set(spreadspoke_df['team_away'].dropna())
+    unknown = (
+        sorted(set(nflfastr_stats['team'].dropna()) - set(ABBR_TO_ID)) +
+        sorted(spreadspoke_teams - set(NAME_TO_ID))
+    )
+    if unknown:
+        print(f"⚠ Teams missing from the franchise table: {', '.join(map(str, unknown))}")
+    
+    game_stats = nflfastr_game_stats(nflfastr_stats)
+    keys = spreadspoke_game_keys(spreadspoke_df)
     
-    # Convert team abbreviations to full names
-    nflfastr_stats['team'] = nflfastr_stats['team'].map(team_name_map)
-    nflfastr_stats['home_team'] = nflfastr_stats['home_team'].map(team_name_map)
-    nflfastr_stats['away_team'] = nflfastr_stats['away_team'].map(team_name_map)
-    
-    # Create separate dataframes for home and away teams
-    home_stats = nflfastr_stats[
-        nflfastr_stats['team'] == nflfastr_stats['home_team']
-    ].copy()
-    
-    away_stats = nflfastr_stats[
-        nflfastr_stats['team'] == nflfastr_stats['away_team']
-    ].copy()
-    
-    # Rename columns to indicate home/away
-    home_cols = {col: f'home_{col}' for col in home_stats.columns 
-                 if col not in ['game_id', 'season', 'week', 'home_team', 'away_team']}
-    away_cols = {col: f'away_{col}' for col in away_stats.columns 
-                 if col not in ['game_id', 'season', 'week', 'home_team', 'away_team']}
-    
-    home_stats = home_stats.rename(columns=home_cols)
-    away_stats = away_stats.rename(columns=away_cols)
-    
-    # Merge home and away into single game row
-    game_stats = home_stats.merge(
-        away_stats,
-        on=['game_id', 'season', 'week', 'home_team', 'away_team'],
-        how='outer'
+    # Direct lookup, then home/away swapped for games the sources disagree on
+    positions = game_stats.index.get_indexer(pd.MultiIndex.from_frame(keys[GAME_KEY]))
+    swapped_keys = keys.rename(columns={'home_id': 'away_id', 'away_id': 'home_id'})
+    swapped_positions = game_stats.index.get_indexer(
+        pd.MultiIndex.from_frame(swapped_keys[GAME_KEY])
     )
+    use_swapped = (positions < 0) & (swapped_positions >= 0)
+    positions = np.where(use_swapped, swapped_positions, positions)
+    
+    # Unknown teams never match, even against each other
+    known = ((keys['home_id'] != UNKNOWN_ID) & (keys['away_id'] != UNKNOWN_ID)).to_numpy()
+    use_swapped &= known
+    positions = np.where(known, positions, -1)
     
-    # Convert week to string to match spreadspoke format
-    game_stats['week'] = game_stats['week'].astype(str)
+    # Unmatched games (position -1) come back as all-NaN rows
+    matched_stats = game_stats.reset_index(drop=True).reindex(positions).reset_index(drop=True)
     
-    # Merge with spreadspoke data
-    merged_df = spreadspoke_df.merge(
-        game_stats,
-        left_on=['schedule_season', 'schedule_week', 'team_home', 'team_away'],
-        right_on=['season', 'week', 'home_team', 'away_team'],
-        how='left'
+    if use_swapped.any():
+        # Swapped games: the nflfastR "home" columns describe the spreadspoke away team
+        matched_stats = pd.DataFrame({
+            col: np.where(
+                use_swapped,
+                matched_stats[('away_' if col.startswith('home_') else 'home_') + col[5:]],
+                matched_stats[col]
+            )
+            for col in matched_stats.columns
+        })
+    
+    merged_df = pd.concat(
+        [spreadspoke_df.reset_index(drop=True), matched_stats], axis=1
     )
     
-    # Drop duplicate columns
-    merged_df = merged_df.drop(columns=['season', 'week', 'home_team', 'away_team', 'game_id'], 
-                                errors='ignore')
+    # Report games without a counterpart, limited to seasons nflfastR covers
+    covered = keys['season'].isin(game_stats.index.get_level_values('season').unique())
+    missing_stats = spreadspoke_df.loc[covered.to_numpy() & (positions < 0)]
+    used = np.zeros(len(game_stats), dtype=bool)
+    used[positions[positions >= 0]] = True
+    unused_stats = game_stats.index[~used]
     
-    # Count how many games got nflfastR data
-    n_matched = merged_df['home_epa_per_play'].notna().sum()
+    n_matched = int((positions >= 0).sum())
     n_total = len(merged_df)
     print(f"✓ Matched nflfastR data for {n_matched:,}/{n_total:,} games ({n_matched/n_total*100:.1f}%)")
+    if use_swapped.any():
+        print(f"  {int(use_swapped.sum())} game(s) matched with home/away swapped (neutral site)")
+    
+    if len(missing_stats):
+        print(f"⚠ {len(missing_stats)} spreadspoke game(s) in nflfastR seasons have no nflfastR stats:")
+        for _, game in missing_stats.head(max_listed).iterrows():
+            print(f"    {game['schedule_season']} week {game['schedule_week']}: "
+                  f"{game['team_away']} @ {game['team_home']}")
+    if len(unused_stats):
+        print(f"⚠ {len(unused_stats)} nflfastR game(s) have no spreadspoke game:")
+        for season, week, home_id, away_id in unused_stats[:max_listed]:
+            print(f"    {season} week {week}: "
+                  f"{franchise_name(away_id, season)} @ {franchise_name(home_id, season)}")
     
     return merged_df
 
 
-def load_data_with_nflfastr(seasons=None, cache=True, use_nflfastr=True):
+def load_data_with_nflfastr(seasons=None, cache=True, use_nflfastr=True, offline=False,
+                            force_rebuild=False, n_jobs=1, backend="pandas"):
     """
     Complete pipeline: load spreadspoke data and optionally merge nflfastR data.
     
@@ -354,6 +966,10 @@ def load_data_with_nflfastr(seasons=None, cache=True, use_nflfastr=True):
         seasons: List of seasons for nflfastR (None = 2015-2024)
         cache: Whether to cache nflfastR downloads
         use_nflfastr: Whether to load nflfastR data (False = spreadspoke only)
+        offline: Only use locally cached nflfastR seasons, never download
+        force_rebuild: Re-aggregate every season instead of only new games
+        n_jobs: Processes aggregating seasons in parallel (1 = serial, -1 = one per CPU)
+        backend: Team-stats aggregation backend ("pandas" or "polars")
         
     Returns:
         pd.DataFrame: Dataset with or without nflfastR features
@@ -366,7 +982,7 @@ def load_data_with_nflfastr(seasons=None, cache=True, use_nflfastr=True):
     
     # Optionally add nflfastR data
     if use_nflfastr:
-        if not NFL_DATA_AVAILABLE:
+        if not NFL_DATA_AVAILABLE and not offline:
             print("\nWARNING: nfl_data_py not installed!")
             print("Install with: pip install nfl_data_py")
             print("Continuing with spreadspoke data only...\n")
@@ -377,24 +993,27 @@ def load_data_with_nflfastr(seasons=None, cache=True, use_nflfastr=True):
         print("="*60)
         
         try:
-            # Download play-by-play data
-            pbp_data = download_nflfastr_data(seasons, cache)
+            # Aggregate play-by-play into game-level stats, one season at a time
+            team_stats = aggregate_nflfastr_seasons(
+                seasons, cache, offline=offline, force_rebuild=force_rebuild, n_jobs=n_jobs,
+                backend=backend
+            )
             
             # Check if data was actually downloaded
-            if pbp_data is None or len(pbp_data) == 0:
+            if team_stats is None or len(team_stats) == 0:
                 print("\n⚠ No data returned from nflfastR")
                 print("Continuing with spreadspoke data only...\n")
                 return df
             
-            # Aggregate into game-level stats
-            team_stats = aggregate_team_stats(pbp_data)
-            
             # Merge with spreadspoke
             df = merge_with_spreadspoke(df, team_stats)
             
             print("\n✓ nflfastR data integration complete!")
             print(f"✓ Added {len([col for col in df.columns if 'epa' in col.lower()])} EPA-related features")
             
+        except FileNotFoundError as e:
+            print(f"\n⚠ {e}")
+            print("Continuing with spreadspoke data only...\n")
         except ImportError as e:
             print(f"\n⚠ Import error: {e}")
             print("Make sure nfl_data_py is installed: pip install nfl_data_py")
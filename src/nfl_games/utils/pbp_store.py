@@ -0,0 +1,290 @@
+"""
+pbp_store.py
+Season-partitioned on-disk store for nflfastR play-by-play data.
+
+Each season is kept as its own Parquet file under data/nflfastr/season=YYYY/, with a
+manifest recording the row count, source checksum and fetch time of every season.
+Finished seasons never change, so they are read from disk; only a season that is
+still being played is downloaded again.
+
+Brendan Dileo, October 2026
+"""
+
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+
+import pandas as pd
+import requests
+
+# Local store location and manifest file name
+PBP_STORE_DIR = "data/nflfastr"
+MANIFEST_FILE = "manifest.json"
+
+# nflverse release asset for a single season of play-by-play
+PBP_URL = "https://github.com/nflverse/nflverse-data/releases/download/pbp/play_by_play_{season}.parquet"
+
+# Download chunk size in bytes
+CHUNK_SIZE = 1 << 20
+
+# Concurrent season downloads and retries per season
+DOWNLOAD_WORKERS = 4
+DOWNLOAD_RETRIES = 3
+
+
+def season_path(season, store_dir=PBP_STORE_DIR):
+    """Path of the Parquet file holding a single season."""
+    return os.path.join(store_dir, f"season={season}", f"play_by_play_{season}.parquet")
+
+
+def is_season_final(season, today=None):
+    """
+    Check whether a season is over and its play-by-play can no longer change.
+
+    A season starts in September and ends with the Super Bowl in February,
+    so season N is final from March of year N+1 onward.
+    """
+    today = today or datetime.now()
+    return season < today.year - 1 or (season == today.year - 1 and today.month >= 3)
+
+
+def load_manifest(store_dir=PBP_STORE_DIR):
+    """Load the store manifest as a dict keyed by season (as a string)."""
+    path = os.path.join(store_dir, MANIFEST_FILE)
+    if not os.path.exists(path):
+        return {}
+
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def save_manifest(manifest, store_dir=PBP_STORE_DIR):
+    """Write the store manifest atomically."""
+    os.makedirs(store_dir, exist_ok=True)
+    path = os.path.join(store_dir, MANIFEST_FILE)
+    tmp_path = path + ".tmp"
+
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def count_rows(path):
+    """Row count of a Parquet file, read from its footer."""
+    import pyarrow.parquet as pq
+    return pq.ParquetFile(path).metadata.num_rows
+
+
+def _hash_file(path, digest):
+    """Feed an existing file into a running hash."""
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+
+
+def _response_validator(response):
+    """
+    Validator identifying the version of a downloaded file: its strong ETag,
+    else its Last-Modified date (None if the server sent neither).
+    """
+    etag = response.headers.get("ETag")
+    if etag and not etag.startswith("W/"):
+        return etag
+    return response.headers.get("Last-Modified")
+
+
+def _load_validator(tmp_path):
+    """Validator saved next to a partial download (None if there is none)."""
+    try:
+        with open(tmp_path + ".json", "r") as f:
+            return json.load(f).get("validator")
+    except (OSError, ValueError):
+        return None
+
+
+def _save_validator(tmp_path, validator):
+    """Record the validator of the file a partial download belongs to."""
+    with open(tmp_path + ".json", "w") as f:
+        json.dump({"validator": validator}, f)
+
+
+def _discard_partial(tmp_path):
+    """Remove a partial download and its validator."""
+    for stale in [tmp_path, tmp_path + ".json"]:
+        if os.path.exists(stale):
+            os.remove(stale)
+
+
+def fetch_season(season, path, url_template=None):
+    """
+    Download one season of play-by-play to `path`.
+
+    The file is streamed to `path + ".part"` and only moved into place once its
+    Parquet footer can be read, so an interrupted download never leaves a
+    truncated season behind. The ETag (or Last-Modified date) of the file is
+    saved next to the partial file; a later attempt resumes from its end with
+    an HTTP Range request guarded by If-Range, so the server sends the whole
+    file instead if it changed since. A partial file without a validator, or
+    whose validator no longer matches, is discarded.
+
+    Args:
+        season: Season to download
+        path: Destination Parquet file
+        url_template: URL with a {season} placeholder (default PBP_URL)
+
+    Returns:
+        dict: Manifest entry (season, rows, checksum, fetched_at)
+    """
+    url_template = url_template or PBP_URL
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".part"
+    digest = hashlib.sha256()
+
+    validator = _load_validator(tmp_path)
+    if validator is None:
+        _discard_partial(tmp_path)
+    offset = os.path.getsize(tmp_path) if os.path.exists(tmp_path) else 0
+    headers = {"Range": f"bytes={offset}-", "If-Range": validator} if offset else None
+
+    with requests.get(url_template.format(season=season), headers=headers,
+                      stream=True, timeout=60) as response:
+        if response.status_code == 416:
+            # Partial file is no longer valid for this resource, start over
+            _discard_partial(tmp_path)
+            return fetch_season(season, path, url_template)
+        response.raise_for_status()
+
+        if response.status_code == 206 and _response_validator(response) != validator:
+            # Server ignored If-Range and sent part of a different file
+            _discard_partial(tmp_path)
+            return fetch_season(season, path, url_template)
+
+        # 200 is the whole (possibly newer) file: the partial file is replaced
+        if response.status_code == 206:
+            _hash_file(tmp_path, digest)
+            mode = "ab"
+        else:
+            mode = "wb"
+            _save_validator(tmp_path, _response_validator(response))
+
+        with open(tmp_path, mode) as f:
+            for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                f.write(chunk)
+                digest.update(chunk)
+
+    try:
+        rows = count_rows(tmp_path)
+    except Exception:
+        # Unreadable footer means a corrupt download; don't resume from it
+        _discard_partial(tmp_path)
+        raise
+
+    os.replace(tmp_path, path)
+    _discard_partial(tmp_path)
+
+    return {
+        "season": season,
+        "rows": rows,
+        "checksum": f"sha256:{digest.hexdigest()}",
+        "fetched_at": datetime.now().isoformat(timespec="seconds"),
+    }
+
+
+def _fetch_with_retries(season, path, url_template, retries, backoff):
+    """Run fetch_season, retrying failures with exponential backoff."""
+    for attempt in range(retries + 1):
+        try:
+            return fetch_season(season, path, url_template)
+        except requests.HTTPError as e:
+            # Missing seasons (404 etc.) won't appear on retry, rate limits might
+            status = e.response.status_code if e.response is not None else None
+            if attempt == retries or (status is not None and 400 <= status < 500 and status != 429):
+                raise
+            time.sleep(backoff * 2 ** attempt)
+        except Exception:
+            if attempt == retries:
+                raise
+            time.sleep(backoff * 2 ** attempt)
+
+
+def fetch_seasons(seasons, store_dir=PBP_STORE_DIR, workers=DOWNLOAD_WORKERS,
+                  retries=DOWNLOAD_RETRIES, backoff=1.0, url_template=None):
+    """
+    Download several seasons concurrently into a store directory.
+
+    Each season is a separate release asset, so they are fetched in parallel by
+    a thread pool; a full backfill takes about as long as the largest season.
+    Failed seasons are retried with backoff and resume from their partial file.
+
+    Args:
+        seasons: Seasons to download
+        store_dir: Directory to write season files into
+        workers: Number of concurrent downloads
+        retries: Extra attempts per season after the first failure
+        backoff: Base delay in seconds between attempts (doubles each retry)
+        url_template: URL with a {season} placeholder (default PBP_URL)
+
+    Returns:
+        tuple: (fetched, failed) where fetched maps season to its manifest
+               entry and failed maps season to the error message
+    """
+    fetched = {}
+    failed = {}
+
+    if not seasons:
+        return fetched, failed
+
+    workers = max(1, min(workers, len(seasons)))
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(_fetch_with_retries, season, season_path(season, store_dir),
+                            url_template, retries, backoff): season
+            for season in seasons
+        }
+
+        for future in as_completed(futures):
+            season = futures[future]
+            try:
+                fetched[season] = future.result()
+                print(f"  ✓ {season} ({fetched[season]['rows']:,} plays)")
+            except Exception as e:
+                failed[season] = str(e)
+                print(f"  ✗ {season} failed: {e}")
+
+    print(f"Downloaded {len(fetched)}/{len(seasons)} seasons", end="")
+    if failed:
+        print(f" (failed: {', '.join(str(season) for season in sorted(failed))})")
+    else:
+        print()
+
+    return fetched, failed
+
+
+def needs_refresh(season, manifest, store_dir=PBP_STORE_DIR):
+    """A season must be downloaded if it is missing, unrecorded, or still in progress."""
+    if not os.path.exists(season_path(season, store_dir)):
+        return True
+    if str(season) not in manifest:
+        return True
+    return not is_season_final(season)
+
+
+def missing_seasons(seasons, store_dir=PBP_STORE_DIR):
+    """Seasons with no local Parquet file."""
+    return [season for season in seasons if not os.path.exists(season_path(season, store_dir))]
+
+
+def read_season(season, store_dir=PBP_STORE_DIR, columns=None):
+    """
+    Read one season from the store.
+
+    Args:
+        season: Season to read
+        store_dir: Store location
+        columns: Optional list of columns to read (None = all ~370 columns)
+    """
+    return pd.read_parquet(season_path(season, store_dir), columns=columns)
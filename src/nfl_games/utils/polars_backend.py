@@ -0,0 +1,272 @@
+"""
+polars_backend.py
+Polars implementations of the aggregation and rolling-feature kernels.
+
+aggregate_team_stats, add_rolling_features and add_rolling_epa_features take a
+backend argument; with backend="polars" the heavy part of each runs here as a
+Polars lazy query (multi-threaded, optimized as a whole) instead of pandas.
+Frames go in and come out as pandas, so callers and train_model don't change,
+and the results match the pandas backend up to floating-point rounding.
+
+Brendan Dileo, October 2026
+"""
+
+import numpy as np
+import pandas as pd
+
+from utils.lazy_import import is_available, lazy_import
+
+# Polars is optional; without it every backend falls back to pandas
+POLARS_AVAILABLE = is_available("polars")
+pl = lazy_import("polars")
+
+BACKENDS = ("pandas", "polars")
+
+
+def resolve_backend(backend):
+    """
+    Validate a backend name, falling back to pandas if Polars isn't installed.
+
+    Args:
+        backend: "pandas" or "polars"
+
+    Returns:
+        str: Backend to use
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend {backend!r}, expected one of {BACKENDS}")
+
+    if backend == "polars" and not POLARS_AVAILABLE:
+        print("⚠ polars not installed, using the pandas backend. Install with: pip install polars")
+        return "pandas"
+
+    return backend
+
+
+def aggregate_team_stats(pbp_data, splits=True):
+    """
+    Polars version of load_data.aggregate_team_stats (see there for the metrics).
+
+    Masked means become filtered aggregations inside one group_by per side of
+    the ball; NaN is read as null, so means and counts skip it like pandas.
+
+    Args:
+        pbp_data: Play-by-play DataFrame from nflfastR (needs PBP_COLUMNS)
+        splits: Include the situational splits (SITUATIONAL_COLUMNS)
+
+    Returns:
+        pd.DataFrame: Game-level team statistics
+    """
+    from utils.load_data import (
+        NEUTRAL_MIN_HALF_SECONDS, NEUTRAL_WP, PBP_COLUMNS, SITUATIONAL_COLUMNS, TEAM_STATS_COLUMNS
+    )
+
+    columns = [col for col in PBP_COLUMNS if col in pbp_data.columns and not col.endswith("_name")]
+    plays = (
+        pl.from_pandas(pbp_data[columns], nan_to_null=True)
+        .lazy()
+        .with_columns(pl.col(pl.Categorical).cast(pl.String), pl.col("game_id").cast(pl.String))
+        .filter(pl.col("play_type").is_in(["run", "pass"]) & pl.col("epa").is_not_null())
+    )
+
+    is_pass = pl.col("pass_attempt") == 1
+    is_rush = pl.col("rush_attempt") == 1
+
+    # Sums keep the column's dtype, as pandas does (polars widens integers)
+    dtypes = plays.collect_schema()
+
+    def total(col):
+        return pl.col(col).sum().cast(dtypes[col])
+
+    offense = [
+        pl.col("epa").mean().alias("epa_per_play"),
+        pl.col("epa").sum().alias("epa_total"),
+        pl.col("epa").std().alias("epa_std"),
+        pl.col("success").mean().alias("success_rate"),
+        total("pass_attempt").alias("pass_attempts"),
+        total("rush_attempt").alias("rush_attempts"),
+        (pl.col("yards_gained") >= 20).sum().cast(pl.Int64).alias("explosive_plays"),
+        total("touchdown").alias("touchdowns"),
+        total("interception").alias("interceptions"),
+        total("fumble_lost").alias("fumbles_lost"),
+        pl.col("epa").filter(is_pass).mean().alias("pass_epa"),
+        pl.col("success").filter(is_pass).mean().alias("pass_success_rate"),
+        pl.col("air_yards").filter(is_pass).mean().alias("avg_air_yards"),
+        pl.col("yards_after_catch").filter(is_pass).mean().alias("avg_yac"),
+        pl.col("complete_pass").filter(is_pass).mean().alias("completion_pct"),
+        pl.col("epa").filter(is_rush).mean().alias("rush_epa"),
+        pl.col("success").filter(is_rush).mean().alias("rush_success_rate"),
+        pl.col("yards_gained").filter(is_rush).mean().alias("avg_rush_yards"),
+        pl.col("season").first(),
+        pl.col("week").first(),
+        pl.col("home_team").first(),
+        pl.col("away_team").first(),
+    ]
+    fill_cols = ["pass_epa", "pass_success_rate", "avg_air_yards", "avg_yac",
+                 "completion_pct", "rush_epa", "rush_success_rate", "avg_rush_yards"]
+    derived = [(pl.col("interceptions") + pl.col("fumbles_lost")).alias("turnovers")]
+
+    if splits:
+        is_early_down = pl.col("down") <= 2
+        in_red_zone = (pl.col("yardline_100") <= 20) & pl.col("fixed_drive").is_not_null()
+        offense_td = (pl.col("pass_touchdown") == 1) | (pl.col("rush_touchdown") == 1)
+        is_neutral = (
+            is_early_down &
+            pl.col("wp").is_between(*NEUTRAL_WP) &
+            (pl.col("half_seconds_remaining") > NEUTRAL_MIN_HALF_SECONDS)
+        )
+        offense += [
+            pl.col("fixed_drive").filter(in_red_zone).n_unique().cast(pl.Int64).alias("red_zone_trips"),
+            pl.col("fixed_drive").filter(in_red_zone & offense_td).n_unique().cast(pl.Int64)
+            .alias("red_zone_td_trips"),
+            total("third_down_converted").alias("third_down_conversions"),
+            total("third_down_failed").alias("third_down_failures"),
+            pl.col("epa").filter(is_early_down).mean().alias("early_down_epa"),
+            pl.col("pass_attempt").filter(is_neutral).mean().alias("neutral_pass_rate"),
+        ]
+        third_downs = pl.col("third_down_conversions") + pl.col("third_down_failures")
+        derived += [
+            (pl.col("red_zone_td_trips") / pl.col("red_zone_trips")).alias("red_zone_td_rate"),
+            third_downs.alias("third_downs"),
+            (pl.col("third_down_conversions") / third_downs).alias("third_down_conv_rate"),
+        ]
+        fill_cols += ["red_zone_td_rate", "third_down_conv_rate", "early_down_epa",
+                      "neutral_pass_rate"]
+
+    defense = [
+        pl.col("epa").mean().alias("def_epa_allowed"),
+        pl.col("success").mean().alias("def_success_rate_allowed"),
+        total("sack").alias("sacks"),
+        total("interception").alias("def_interceptions"),
+        total("fumble_forced").alias("forced_fumbles"),
+    ]
+
+    # 0/0 rates come out NaN (not null); both are filled like pandas' fillna(0)
+    team_stats = (
+        plays.group_by("game_id", "posteam").agg(offense)
+        .with_columns(derived)
+        .with_columns(pl.col(fill_cols).fill_nan(None).fill_null(0))
+        .join(plays.group_by("game_id", "defteam").agg(defense),
+              left_on=["game_id", "posteam"], right_on=["game_id", "defteam"], how="left")
+        .rename({"posteam": "team"})
+        .with_columns(
+            (pl.col("def_interceptions") + pl.col("forced_fumbles")).alias("def_turnovers_created")
+        )
+        .sort("game_id", "team")
+    )
+
+    output_cols = [col for col in TEAM_STATS_COLUMNS if splits or col not in SITUATIONAL_COLUMNS]
+    team_stats = team_stats.select(output_cols).collect().to_pandas()
+
+    print(f"✓ Aggregated stats for {len(team_stats)} team-games (polars)")
+
+    return team_stats
+
+
+def team_game_rows(df, values):
+    """
+    Long frame with one row per team per game, in game order within each team.
+
+    Args:
+        df: Game frame with team_home / team_away, in chronological order
+        values: Dict of output name -> (home-side column, away-side column)
+
+    Returns:
+        pl.LazyFrame: Columns game (row position in df), side, team and the values
+    """
+    columns = ["team_home", "team_away"] + sorted({col for pair in values.values() for col in pair})
+    games = pl.from_pandas(df[columns].reset_index(drop=True), nan_to_null=True).with_row_index("game")
+
+    sides = [
+        games.select(
+            "game",
+            pl.lit(side).alias("side"),
+            pl.col(f"team_{side}").cast(pl.String).alias("team"),
+            *[pl.col(pair[i]).alias(name) for name, pair in values.items()],
+        )
+        for i, side in enumerate(["home", "away"])
+    ]
+    return pl.concat(sides).lazy().sort("team", "game")
+
+
+def previous_mean(col, window, lag=1):
+    """
+    Mean of a team's last window values before the current game, like pandas'
+    shift(lag).rolling(window, min_periods=1).mean() over each team's games.
+
+    Computed in float64 like the pandas loops, whatever the column's dtype.
+    """
+    return pl.col(col).cast(pl.Float64).shift(lag).rolling_mean(window, min_samples=1).over("team")
+
+
+def game_columns(rows, index, names):
+    """
+    Spread per-team rows back to home_/away_ columns aligned with the game frame.
+
+    Args:
+        rows: Collected output of team_game_rows plus computed columns
+        index: Index of the game frame
+        names: Computed columns to spread
+
+    Returns:
+        pd.DataFrame: home_<name> and away_<name> for every name
+    """
+    columns = {}
+    for side in ["home", "away"]:
+        side_rows = rows.filter(pl.col("side") == side).sort("game")
+        for name in names:
+            columns[f"{side}_{name}"] = side_rows[name].to_numpy().astype(np.float64)
+    return pd.DataFrame(columns, index=index)
+
+
+def rolling_game_features(df, window):
+    """
+    Polars version of add_rolling_features' per-team loop.
+
+    Args:
+        df: Modern-season games sorted by date, schedule_date as datetime
+        window: Number of games in each rolling average
+
+    Returns:
+        pd.DataFrame: Unfilled home_/away_ avg_points, avg_allowed, win_pct,
+                      rest_days and momentum, indexed like df
+    """
+    df = df.assign(
+        home_won=(df["score_home"] > df["score_away"]).astype(float),
+        away_won=(df["score_away"] > df["score_home"]).astype(float),
+    )
+    rows = team_game_rows(df, {
+        "scored": ("score_home", "score_away"),
+        "allowed": ("score_away", "score_home"),
+        "won": ("home_won", "away_won"),
+        "date": ("schedule_date", "schedule_date"),
+    })
+    rows = rows.with_columns(
+        previous_mean("scored", window).alias("avg_points"),
+        previous_mean("allowed", window).alias("avg_allowed"),
+        previous_mean("won", window).alias("win_pct"),
+        pl.col("date").diff().dt.total_days().over("team").alias("rest_days"),
+        (previous_mean("scored", window) - previous_mean("scored", window, window + 1))
+        .alias("momentum"),
+    ).collect()
+
+    return game_columns(rows, df.index, ["avg_points", "avg_allowed", "win_pct", "rest_days", "momentum"])
+
+
+def rolling_means(df, specs, window):
+    """
+    Polars version of rolling.rolling_means (rolling EPA features).
+
+    Args:
+        df: Games sorted by date
+        specs: (home_col, away_col, output_prefix, fill_value) tuples
+        window: Number of games in each rolling average
+
+    Returns:
+        pd.DataFrame: Unfilled home_/away_<prefix> for every spec
+    """
+    names = [prefix for _, _, prefix, _ in specs]
+    rows = team_game_rows(df, {prefix: (home_col, away_col) for home_col, away_col, prefix, _ in specs})
+    rows = rows.with_columns(previous_mean(name, window) for name in names).collect()
+
+    return game_columns(rows, df.index, names)
@@ -9,9 +9,36 @@ Handles simple preprocessing steps for NFL game data, by creating the target col
 Brendan Dileo, October 2025
 """
 
-def preprocess(df):
-    # Make a safe copy to avoid modifying original DataFrame
-    df = df.copy()
+import pandas as pd
+
+
+def use_copy_on_write():
+    """
+    Turn on pandas copy-on-write (always on from pandas 3.0).
+
+    With it, frames derived from another (filters, sorts, column selections)
+    share memory until one of them is written to, so pipeline stages can add
+    columns to the frame they were given instead of defensively copying it.
+    """
+    if int(pd.__version__.split(".")[0]) < 3:
+        pd.set_option("mode.copy_on_write", True)
+
+
+def preprocess(df, copy=True):
+    """
+    Add the 'home_team_won' target column.
+
+    Args:
+        df (pd.DataFrame): Game data
+        copy (bool): Work on a copy so the caller's frame is untouched. The
+                     pipeline passes False for a frame it owns, and the
+                     column is added in place.
+
+    Returns:
+        pd.DataFrame: Game data with the target column
+    """
+    if copy:
+        df = df.copy()
 
     # Add target column: 1 if home team won, 0 otherwise
     df.loc[:, "home_team_won"] = (df["score_home"] > df["score_away"]).astype(int)
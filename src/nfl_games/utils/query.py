@@ -0,0 +1,213 @@
+"""
+query.py
+In-process SQL over the local Parquet stores.
+
+The team-game, player-game and play-by-play stores are hive-partitioned by season
+(and week), so a query that filters on season or week only opens the matching
+files, and only the columns it selects are read from them. With DuckDB installed
+every store is a SQL view:
+
+    query("SELECT avg(epa) FROM pbp WHERE season = 2023 AND posteam = 'KC' AND qtr >= 3")
+
+The team_games, player_games and play_by_play helpers return pandas frames for
+the common "some seasons, some teams, some columns" reads and fall back to
+pyarrow (file pruning plus filter pushdown) when DuckDB is not installed.
+
+Brendan Dileo, October 2026
+"""
+
+import glob
+import os
+
+import pandas as pd
+
+from utils.game_store import PLAYER_GAMES_DIR, TEAM_GAMES_DIR
+from utils.lazy_import import is_available, lazy_import
+from utils.pbp_store import PBP_STORE_DIR
+
+# DuckDB runs the SQL; without it the helpers read through pyarrow
+DUCKDB_AVAILABLE = is_available("duckdb")
+duckdb = lazy_import("duckdb")
+ds = lazy_import("pyarrow.dataset")
+
+# Spreadspoke dataset path (same as load_data.DATA_PATH)
+GAMES_CSV = "data/spreadspoke_scores.csv"
+
+# View name -> (file pattern, DuckDB types of the partition columns). The types
+# match the columns stored in the files so partition values ("week=03") read
+# back as the same integers the pyarrow path returns
+STORES = {
+    "team_games": (
+        os.path.join(TEAM_GAMES_DIR, "season=*", "week=*", "team_games.parquet"),
+        "{'season': SMALLINT, 'week': TINYINT}",
+    ),
+    "player_games": (
+        os.path.join(PLAYER_GAMES_DIR, "season=*", "week=*", "player_games.parquet"),
+        "{'season': SMALLINT, 'week': TINYINT}",
+    ),
+    "pbp": (
+        os.path.join(PBP_STORE_DIR, "season=*", "play_by_play_*.parquet"),
+        "{'season': BIGINT}",
+    ),
+}
+
+
+def connect(views=None):
+    """
+    Open an in-memory DuckDB connection with a view for every local store.
+
+    Views: team_games, player_games, pbp (one per store that has files) and
+    games (the spreadspoke CSV). Partition columns (season, week) come from
+    the directory names, which is what lets DuckDB skip files.
+
+    Args:
+        views: Names of the views to register (None = all)
+
+    Returns:
+        duckdb.DuckDBPyConnection: Connection with the views registered
+
+    Raises:
+        ImportError: If DuckDB is not installed
+    """
+    if not DUCKDB_AVAILABLE:
+        raise ImportError("duckdb is required for SQL queries. Install with: pip install duckdb")
+
+    con = duckdb.connect()
+    for view, (pattern, hive_types) in STORES.items():
+        if (views is None or view in views) and glob.glob(pattern):
+            con.execute(
+                f"CREATE VIEW {view} AS SELECT * FROM read_parquet('{pattern}', "
+                f"hive_partitioning = true, hive_types = {hive_types}, union_by_name = true)"
+            )
+    if (views is None or "games" in views) and os.path.exists(GAMES_CSV):
+        con.execute(f"CREATE VIEW games AS SELECT * FROM read_csv_auto('{GAMES_CSV}')")
+
+    return con
+
+
+def query(sql, params=None):
+    """
+    Run a SQL query against the local stores.
+
+    Args:
+        sql: Query over the team_games, player_games, pbp and games views
+        params: Optional list of values for ? placeholders
+
+    Returns:
+        pd.DataFrame: Query result
+    """
+    con = connect()
+    try:
+        return con.execute(sql, params or []).df()
+    finally:
+        con.close()
+
+
+def _as_list(values):
+    """None, a scalar or an iterable as a list (None stays None)."""
+    if values is None:
+        return None
+    if isinstance(values, (str, int)):
+        return [values]
+    return list(values)
+
+
+def _select(store, columns, seasons, filters):
+    """
+    Read rows of one store, pruning partitions by season.
+
+    Args:
+        store: Key of STORES
+        columns: Columns to return (None = all)
+        seasons: Seasons to read (None = all)
+        filters: Dict of column -> allowed values (AND-ed)
+
+    Returns:
+        pd.DataFrame: Matching rows
+    """
+    seasons = _as_list(seasons)
+    filters = {col: _as_list(values) for col, values in filters.items() if values is not None}
+
+    if seasons is not None:
+        filters["season"] = seasons
+
+    if DUCKDB_AVAILABLE:
+        select = ", ".join(columns) if columns else "*"
+        conditions, params = [], []
+        for col, values in filters.items():
+            conditions.append(f"{col} IN ({', '.join('?' * len(values))})")
+            params.extend(values)
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+
+        con = connect([store])
+        try:
+            if not con.execute("SHOW TABLES").fetchall():
+                return pd.DataFrame(columns=columns)
+            return con.execute(f"SELECT {select} FROM {store}{where}", params).df()
+        finally:
+            con.close()
+
+    # Only open the files of the requested seasons
+    pattern = STORES[store][0]
+    season_globs = (
+        [pattern.replace("season=*", f"season={season}") for season in seasons]
+        if seasons is not None else [pattern]
+    )
+    paths = sorted(path for pattern in season_globs for path in glob.glob(pattern))
+    if not paths:
+        return pd.DataFrame(columns=columns)
+
+    expression = None
+    for col, values in filters.items():
+        condition = ds.field(col).isin(values)
+        expression = condition if expression is None else expression & condition
+
+    table = ds.dataset(paths, format="parquet").to_table(columns=columns, filter=expression)
+    return table.to_pandas()
+
+
+def team_games(seasons=None, teams=None, weeks=None, columns=None):
+    """
+    Stored team-game stats for some seasons, teams and weeks.
+
+    Args:
+        seasons: Season or seasons (None = all stored)
+        teams: nflfastR abbreviation(s) (None = all)
+        weeks: Week or weeks (None = all)
+        columns: Columns to return (None = all)
+
+    Returns:
+        pd.DataFrame: One row per team-game
+    """
+    return _select("team_games", columns, seasons, {"team": teams, "week": weeks})
+
+
+def player_games(seasons=None, players=None, teams=None, columns=None):
+    """
+    Stored player-game usage for some seasons, players and teams.
+
+    Args:
+        seasons: Season or seasons (None = all stored)
+        players: nflfastR player id(s) (None = all)
+        teams: nflfastR abbreviation(s) (None = all)
+        columns: Columns to return (None = all)
+
+    Returns:
+        pd.DataFrame: One row per player-game
+    """
+    return _select("player_games", columns, seasons, {"player_id": players, "team": teams})
+
+
+def play_by_play(seasons=None, teams=None, columns=None):
+    """
+    Cached play-by-play for some seasons and offenses.
+
+    Args:
+        seasons: Season or seasons (None = all cached)
+        teams: Offense abbreviation(s), matched against posteam (None = all)
+        columns: Columns to return (None = all ~370)
+
+    Returns:
+        pd.DataFrame: Plays
+    """
+    return _select("pbp", columns, seasons, {"posteam": teams})
@@ -0,0 +1,174 @@
+"""
+ratings.py
+Opponent-adjusted team ratings, solved week by week.
+
+Every team-game gives one equation: points scored = intercept + the team's
+offense rating - the opponent's defense rating (+ a league-wide home edge when
+the team is at home). Before each calendar week the ratings are the ridge
+solution over all earlier games, with older weeks (and past seasons) weighted
+down. The normal equations are kept as a sparse matrix that is decayed and
+added to once per week, and the conjugate gradient solve starts from the
+previous week's ratings, so solving every week since 2002 takes a fraction of
+a second. A game's ratings only use games from earlier weeks.
+
+Brendan Dileo, October 2026
+"""
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from scipy.sparse.linalg import cg
+
+from utils.franchises import UNKNOWN_ID, ids_from_names
+
+# Ridge penalty on the team ratings and home edge (in games' worth of evidence)
+RIDGE_ALPHA = 5.0
+
+# Weight kept by earlier games each week, and at the start of a new season
+WEEKLY_DECAY = 0.97
+SEASON_DECAY = 0.6
+
+# Relative tolerance of the conjugate gradient solves
+CG_RTOL = 1e-10
+
+# Weeks run Tuesday to Monday (2000-01-04 was a Tuesday)
+WEEK_ORIGIN = pd.Timestamp("2000-01-04")
+
+RATING_COLUMNS = [
+    "home_off_rating", "home_def_rating",
+    "away_off_rating", "away_def_rating",
+    "rating_margin",
+]
+
+
+def team_codes(df):
+    """
+    Integer code per team for the home and away columns.
+
+    Teams are identified by franchise, so a relocated team keeps its ratings;
+    names without a known franchise are kept apart by name.
+
+    Returns:
+        tuple: (home codes, away codes, number of teams)
+    """
+    names = pd.concat([df["team_home"], df["team_away"]]).astype(str)
+    ids = np.asarray(ids_from_names(names))
+    keys = np.where(ids != UNKNOWN_ID, ids.astype(str), "name:" + names.to_numpy())
+    codes, teams = pd.factorize(keys)
+    return codes[:len(df)], codes[len(df):], len(teams)
+
+
+def week_numbers(dates):
+    """Calendar week (Tuesday to Monday) of each date."""
+    return ((pd.to_datetime(dates) - WEEK_ORIGIN).dt.days // 7).to_numpy()
+
+
+def at_home(df):
+    """1 for games with a home team, 0 at neutral sites."""
+    if "stadium_neutral" not in df.columns:
+        return np.ones(len(df))
+    return 1.0 - df["stadium_neutral"].fillna(False).astype(float).to_numpy()
+
+
+def design_matrix(df, home, away, n_teams):
+    """
+    Sparse equations for every team-game.
+
+    Rows 2i and 2i+1 are game i's home and away offense. Columns: offense
+    ratings (n_teams), defense ratings (n_teams), home edge, intercept.
+
+    Returns:
+        tuple: (sparse design matrix, points scored, row weights (1 = completed game))
+    """
+    n = len(df)
+
+    rows = np.repeat(np.arange(2 * n), 4)
+    offense = np.column_stack([home, away]).ravel()
+    defense = np.column_stack([away, home]).ravel() + n_teams
+    home_col = np.full(2 * n, 2 * n_teams)
+    intercept = np.full(2 * n, 2 * n_teams + 1)
+    cols = np.column_stack([offense, defense, home_col, intercept]).ravel()
+    values = np.column_stack([
+        np.ones(2 * n), -np.ones(2 * n), np.column_stack([at_home(df), np.zeros(n)]).ravel(), np.ones(2 * n)
+    ]).ravel()
+    design = sparse.csr_matrix((values, (rows, cols)), shape=(2 * n, 2 * n_teams + 2))
+
+    points = np.column_stack([df["score_home"], df["score_away"]]).astype(float).ravel()
+    completed = ~np.isnan(points)
+    completed = np.repeat(completed.reshape(-1, 2).all(axis=1), 2)
+    return design, np.where(completed, points, 0.0), completed.astype(float)
+
+
+def weekly_ratings(df, alpha=RIDGE_ALPHA, decay=WEEKLY_DECAY, season_decay=SEASON_DECAY):
+    """
+    Point-in-time ratings for every game.
+
+    Args:
+        df (pd.DataFrame): Games sorted by date (team_home, team_away,
+            schedule_date, schedule_season, scores; stadium_neutral if available)
+        alpha: Ridge penalty
+        decay: Weight kept by earlier games per week
+        season_decay: Extra weight kept at the start of a new season
+
+    Returns:
+        pd.DataFrame: RATING_COLUMNS indexed like df, from games before each game's week
+    """
+    home, away, n_teams = team_codes(df)
+    design, points, weights = design_matrix(df, home, away, n_teams)
+    n_params = design.shape[1]
+
+    weeks = week_numbers(df["schedule_date"])
+    seasons = df["schedule_season"].to_numpy()
+    starts = np.flatnonzero(np.r_[True, weeks[1:] != weeks[:-1]])
+    ends = np.r_[starts[1:], len(df)]
+
+    # Everything but the intercept is shrunk towards 0 (an average team)
+    penalty = sparse.diags(np.r_[np.full(n_params - 1, alpha), 1e-6])
+    normal = sparse.csr_matrix((n_params, n_params))
+    rhs = np.zeros(n_params)
+    solution = np.zeros(n_params)
+    ratings = np.zeros((len(df), n_params))
+
+    for start, end in zip(starts, ends):
+        ratings[start:end] = solution
+
+        # Older evidence fades, then this week's games are added
+        keep = decay * (season_decay if start and seasons[start] != seasons[start - 1] else 1.0)
+        week = design[2 * start:2 * end]
+        week_weights = weights[2 * start:2 * end]
+        normal = keep * normal + week.T @ sparse.diags(week_weights) @ week
+        rhs = keep * rhs + week.T @ (week_weights * points[2 * start:2 * end])
+
+        solution, _ = cg(normal + penalty, rhs, x0=solution, rtol=CG_RTOL, atol=0.0)
+
+    off = ratings[:, :n_teams]
+    defense = ratings[:, n_teams:2 * n_teams]
+    rows = np.arange(len(df))
+    home_edge = ratings[:, 2 * n_teams] * at_home(df)
+    features = pd.DataFrame({
+        "home_off_rating": off[rows, home],
+        "home_def_rating": defense[rows, home],
+        "away_off_rating": off[rows, away],
+        "away_def_rating": defense[rows, away],
+    }, index=df.index)
+    features["rating_margin"] = (
+        features["home_off_rating"] - features["away_def_rating"] + home_edge -
+        (features["away_off_rating"] - features["home_def_rating"])
+    )
+    return features
+
+
+def add_rating_features(df, alpha=RIDGE_ALPHA, decay=WEEKLY_DECAY, season_decay=SEASON_DECAY):
+    """
+    Add opponent-adjusted offense/defense ratings and the rating margin.
+
+    Args:
+        df (pd.DataFrame): Games sorted by date
+        alpha, decay, season_decay: See weekly_ratings
+
+    Returns:
+        pd.DataFrame: DataFrame with RATING_COLUMNS
+    """
+    ratings = weekly_ratings(df, alpha, decay, season_decay)
+    print(f"✓ Opponent-adjusted ratings added ({len(np.unique(week_numbers(df['schedule_date'])))} weekly solves)")
+    return pd.concat([df, ratings], axis=1)
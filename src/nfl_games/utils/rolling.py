@@ -0,0 +1,193 @@
+"""
+rolling.py
+Generic per-team rolling-window engine for game-level features.
+
+Features are described by specs of (home_col, away_col, output_prefix, fill_value):
+the value a team posted in a game is home_col when it was at home and away_col
+when it was away, and the output is the mean of its previous N values as
+home_<prefix> / away_<prefix>. Every spec is computed in one grouped pass over a
+long frame with one row per team per game, so adding a rolling metric costs a
+spec entry instead of another loop over teams.
+
+Brendan Dileo, October 2026
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def team_game_frame(df, values):
+    """
+    Long frame with one row per team per game.
+
+    Rows are interleaved (game 0 home, game 0 away, game 1 home, ...), so each
+    team's rows are in df's order and a groupby on team sees its games in
+    sequence without sorting. Home values are rows [0::2], away values [1::2].
+
+    Args:
+        df (pd.DataFrame): Games in chronological order
+        values (dict): Output name -> (home-side column, away-side column)
+
+    Returns:
+        pd.DataFrame: team plus one column per value, with a RangeIndex
+    """
+    def interleave(home, away):
+        return np.column_stack([np.asarray(home), np.asarray(away)]).ravel()
+
+    long = {"team": interleave(df["team_home"].astype(str), df["team_away"].astype(str))}
+    for name, (home_col, away_col) in values.items():
+        long[name] = interleave(df[home_col], df[away_col])
+    return pd.DataFrame(long)
+
+
+def previous_means(long, columns, window, lag=1):
+    """
+    Mean of each team's last window values before the current game, like
+    shift(lag).rolling(window, min_periods=1).mean() over each team's games.
+
+    Args:
+        long (pd.DataFrame): Frame from team_game_frame
+        columns (list): Columns to average (computed in float64)
+        window (int): Number of games in each mean
+        lag (int): Games to skip back before the window starts
+
+    Returns:
+        pd.DataFrame: One column per input column, aligned with long
+    """
+    teams = long["team"]
+    previous = long[columns].astype(float).groupby(teams, sort=False).shift(lag)
+    return (
+        previous.groupby(teams, sort=False)
+        .rolling(window, min_periods=1).mean()
+        .droplevel(0).sort_index()
+    )
+
+
+def split_sides(long_values, index):
+    """
+    Spread per-team rows back into home_ and away_ columns.
+
+    Args:
+        long_values (pd.DataFrame): Columns aligned with a team_game_frame
+        index: Index of the game frame
+
+    Returns:
+        pd.DataFrame: home_<name> and away_<name> for every column, in pairs
+    """
+    columns = {}
+    for name in long_values.columns:
+        values = long_values[name].to_numpy(dtype=float)
+        columns[f"home_{name}"] = values[0::2]
+        columns[f"away_{name}"] = values[1::2]
+    return pd.DataFrame(columns, index=index)
+
+
+def rolling_means(df, specs, window):
+    """
+    Unfilled rolling means for every spec in one grouped pass.
+
+    Args:
+        df (pd.DataFrame): Games sorted by date
+        specs (list): (home_col, away_col, output_prefix, fill_value) tuples
+        window (int): Number of previous games in each mean
+
+    Returns:
+        pd.DataFrame: home_<prefix> and away_<prefix> for every spec, indexed like df
+    """
+    long = team_game_frame(df, {prefix: (home_col, away_col) for home_col, away_col, prefix, _ in specs})
+    prefixes = [prefix for _, _, prefix, _ in specs]
+    return split_sides(previous_means(long, prefixes, window), df.index)
+
+
+def fill_rolling(rolling, specs):
+    """Fill the games without enough history with each spec's fill value (in place)."""
+    for _, _, prefix, fill_value in specs:
+        for side in ["home", "away"]:
+            rolling[f"{side}_{prefix}"] = rolling[f"{side}_{prefix}"].fillna(fill_value)
+    return rolling
+
+
+def window_means(long, columns, windows, halflifes=()):
+    """
+    Previous-game means over several windows plus exponentially weighted means.
+
+    Each team's rows are made contiguous once; one cumulative sum (and count)
+    of the shifted values then gives the mean over any window as a difference
+    of two prefix sums, so every window costs two lookups instead of another
+    rolling pass. EWM means come from one grouped ewm per half-life.
+
+    Args:
+        long (pd.DataFrame): Frame from team_game_frame
+        columns (list): Columns to average
+        windows (list): Window sizes (games)
+        halflifes (list): EWM half-lives (games)
+
+    Returns:
+        pd.DataFrame: <col>_<window> and <col>_ewm<halflife> columns, aligned with long
+    """
+    teams = long["team"]
+    previous = long[columns].astype(float).groupby(teams, sort=False).shift(1)
+
+    # Team blocks: order puts each team's rows together, in game order
+    codes = pd.factorize(teams)[0]
+    order = np.argsort(codes, kind="stable")
+    sorted_codes = codes[order]
+    position = np.arange(len(order))
+    block_start = np.maximum.accumulate(
+        np.where(np.r_[True, sorted_codes[1:] != sorted_codes[:-1]], position, 0)
+    )
+
+    values = previous.to_numpy()[order]
+    present = ~np.isnan(values)
+    zeros = np.zeros((1, len(columns)))
+    sums = np.vstack([zeros, np.cumsum(np.where(present, values, 0), axis=0)])
+    counts = np.vstack([zeros, np.cumsum(present, axis=0)])
+
+    means = {}
+    end = position + 1
+    for window in windows:
+        start = np.maximum(end - window, block_start)
+        count = counts[end] - counts[start]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = np.where(count > 0, (sums[end] - sums[start]) / count, np.nan)
+        unsorted = np.empty_like(mean)
+        unsorted[order] = mean
+        for i, col in enumerate(columns):
+            means[f"{col}_{window}"] = unsorted[:, i]
+
+    for halflife in halflifes:
+        ewm = (
+            previous.groupby(teams, sort=False)
+            .ewm(halflife=halflife).mean()
+            .droplevel(0).sort_index()
+        )
+        for col in columns:
+            means[f"{col}_ewm{halflife}"] = ewm[col].to_numpy()
+
+    return pd.DataFrame(means, index=long.index)
+
+
+def window_features(df, specs, windows, halflifes=()):
+    """
+    Filled multi-window and EWM means for every spec in one pass.
+
+    Args:
+        df (pd.DataFrame): Games sorted by date
+        specs (list): (home_col, away_col, output_prefix, fill_value) tuples
+        windows (list): Window sizes (games)
+        halflifes (list): EWM half-lives (games)
+
+    Returns:
+        pd.DataFrame: home_/away_<prefix>_<window> and home_/away_<prefix>_ewm<halflife>
+    """
+    long = team_game_frame(df, {prefix: (home_col, away_col) for home_col, away_col, prefix, _ in specs})
+    prefixes = [prefix for _, _, prefix, _ in specs]
+    features = split_sides(window_means(long, prefixes, windows, halflifes), df.index)
+
+    suffixes = [str(window) for window in windows] + [f"ewm{halflife}" for halflife in halflifes]
+    for _, _, prefix, fill_value in specs:
+        for suffix in suffixes:
+            for side in ["home", "away"]:
+                col = f"{side}_{prefix}_{suffix}"
+                features[col] = features[col].fillna(fill_value)
+    return features
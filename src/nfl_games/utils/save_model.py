@@ -10,16 +10,22 @@ import pickle
 import os
 from datetime import datetime
 
+from utils.data_manifest import manifest_hash, update_manifest
 
-def save_model(model, encoder, filename=None, model_dir="saved_models"):
+
+def save_model(model, encoder, filename=None, model_dir="saved_models", data_manifest=None):
     """
     Save trained model and encoder to disk.
     
+    The hash of the data manifest is saved with them, identifying the exact
+    data files the model was trained on.
+    
     Args:
         model: Trained model to save
         encoder: LabelEncoder for teams
         filename: Optional filename (default: auto-generated with timestamp)
         model_dir: Directory to save models
+        data_manifest: Data manifest to record (default: refreshed from data/)
         
     Returns:
         str: Path to saved model file
@@ -34,11 +40,16 @@ def save_model(model, encoder, filename=None, model_dir="saved_models"):
     
     filepath = os.path.join(model_dir, filename)
     
+    if data_manifest is None:
+        data_manifest = update_manifest()
+    
     # Save both model and encoder together
     model_data = {
         "model": model,
         "encoder": encoder,
-        "timestamp": datetime.now().isoformat()
+        "timestamp": datetime.now().isoformat(),
+        "data_manifest_hash": manifest_hash(data_manifest),
+        "data_files": len(data_manifest)
     }
     
     with open(filepath, "wb") as f:
@@ -66,6 +77,7 @@ def load_model(filepath):
     
     print(f"✓ Model loaded from: {filepath}")
     print(f"  Saved on: {model_data.get('timestamp', 'Unknown')}")
+    print(f"  Data manifest: {model_data.get('data_manifest_hash', 'Unknown')}")
     
     return model_data["model"], model_data["encoder"]
 
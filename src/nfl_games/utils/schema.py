@@ -0,0 +1,144 @@
+"""
+schema.py
+Declared column dtypes for the play-by-play and spreadspoke frames.
+
+nflfastR publishes 0/1 flags as float64 and team abbreviations as Python strings,
+and spreadspoke's CSV is parsed with type inference. Applying a compact schema at
+load time stores flags as int8, metrics as float32 and teams / play types as
+categoricals, which cuts the memory of both frames several times over.
+
+Brendan Dileo, October 2026
+"""
+
+import pandas as pd
+
+# Pseudo-dtypes understood by apply_schema:
+#   "flag" - 0/1 indicator stored as int8, missing treated as 0
+#   "team" - categorical sharing one set of categories across all team columns
+#   "date" - parsed to datetime64, unparseable values become NaT
+FLAG = "flag"
+TEAM = "team"
+DATE = "date"
+
+PBP_SCHEMA = {
+    # Game context
+    'season': 'int16',
+    'week': 'int8',
+    'home_team': TEAM,
+    'away_team': TEAM,
+    'posteam': TEAM,
+    'defteam': TEAM,
+    'play_type': 'category',
+
+    # Metrics
+    'epa': 'float32',
+    'yards_gained': 'float32',
+    'air_yards': 'float32',
+    'yards_after_catch': 'float32',
+
+    # Situation (NaN on some non-plays, so kept as floats)
+    'down': 'float32',
+    'yardline_100': 'float32',
+    'fixed_drive': 'float32',
+    'wp': 'float32',
+    'half_seconds_remaining': 'float32',
+
+    # Play flags
+    'success': FLAG,
+    'pass_attempt': FLAG,
+    'rush_attempt': FLAG,
+    'complete_pass': FLAG,
+    'touchdown': FLAG,
+    'interception': FLAG,
+    'fumble_lost': FLAG,
+    'fumble_forced': FLAG,
+    'sack': FLAG,
+    'pass_touchdown': FLAG,
+    'rush_touchdown': FLAG,
+    'third_down_converted': FLAG,
+    'third_down_failed': FLAG,
+
+    # Players (a few hundred distinct per season)
+    'passer_player_id': 'category',
+    'passer_player_name': 'category',
+    'receiver_player_id': 'category',
+    'receiver_player_name': 'category',
+    'rusher_player_id': 'category',
+    'rusher_player_name': 'category',
+}
+
+SPREADSPOKE_SCHEMA = {
+    'schedule_date': DATE,
+    'schedule_season': 'int16',
+    'team_home': TEAM,
+    'team_away': TEAM,
+    'score_home': 'float32',
+    'score_away': 'float32',
+    'team_favorite_id': 'category',
+    'spread_favorite': 'float32',
+    'over_under_line': 'float32',
+    'stadium': 'category',
+    'weather_temperature': 'float32',
+    'weather_wind_mph': 'float32',
+    'weather_humidity': 'float32',
+}
+
+
+def frame_memory(df):
+    """Deep memory usage of a frame in bytes."""
+    return int(df.memory_usage(deep=True).sum())
+
+
+def memory_report(label, before, after):
+    """Print a before/after memory line."""
+    print(f"{label}: {before / 1e6:,.1f} MB -> {after / 1e6:,.1f} MB "
+          f"({before / max(after, 1):.1f}x smaller)")
+
+
+def apply_schema(df, schema, report=False, label="Frame"):
+    """
+    Cast a frame's columns to a declared schema.
+
+    Columns missing from the frame are skipped and columns not in the schema
+    are left alone. Numeric columns are coerced first, so strings that fail to
+    parse become NaN exactly like pd.to_numeric(..., errors='coerce').
+
+    Args:
+        df: DataFrame to convert
+        schema: Mapping of column name to dtype (or FLAG / TEAM)
+        report: Print memory usage before and after
+        label: Name used in the memory report
+
+    Returns:
+        pd.DataFrame: Frame with the schema applied
+    """
+    before = frame_memory(df) if report else None
+    present = {col: dtype for col, dtype in schema.items() if col in df.columns}
+
+    # All team columns share one categorical dtype so they compare and merge cleanly
+    team_cols = [col for col, dtype in present.items() if dtype == TEAM]
+    if team_cols:
+        teams = set()
+        for col in team_cols:
+            teams.update(df[col].dropna().unique())
+        team_dtype = pd.CategoricalDtype(sorted(teams))
+
+    converted = {}
+    for col, dtype in present.items():
+        if dtype == TEAM:
+            converted[col] = df[col].astype(team_dtype)
+        elif dtype == DATE:
+            converted[col] = pd.to_datetime(df[col], errors='coerce')
+        elif dtype == 'category':
+            converted[col] = df[col].astype('category')
+        elif dtype == FLAG:
+            converted[col] = pd.to_numeric(df[col], errors='coerce').fillna(0).astype('int8')
+        else:
+            converted[col] = pd.to_numeric(df[col], errors='coerce').astype(dtype)
+
+    df = df.assign(**converted)
+
+    if report:
+        memory_report(label, before, frame_memory(df))
+
+    return df
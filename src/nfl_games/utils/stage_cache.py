@@ -0,0 +1,252 @@
+"""
+stage_cache.py
+Content-addressed on-disk cache for pipeline stages.
+
+A stage's output is stored under a key built from a hash of its input frame,
+its parameters and a hash of the source of the modules that implement it. The
+same input through the same code always finds the same entry, and editing the
+feature code or a parameter simply misses and recomputes. Entries are kept as
+Parquet (frames) and NumPy (targets) files and the least recently used ones are
+evicted once the cache grows past a size cap.
+
+Brendan Dileo, October 2026
+"""
+
+import hashlib
+import inspect
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+# Cache location and size cap
+STAGE_CACHE_DIR = "cache/stages"
+MAX_CACHE_BYTES = 2 * 1024**3
+
+# Bump to invalidate every entry (e.g. after changing the storage format)
+CACHE_VERSION = 1
+
+META_FILE = "meta.json"
+
+
+def frame_fingerprint(df):
+    """
+    Hash of a frame's contents, index, column names and dtypes.
+
+    Args:
+        df: DataFrame to fingerprint
+
+    Returns:
+        str: Hex digest
+    """
+    digest = hashlib.sha256()
+    digest.update(repr([(str(col), str(dtype)) for col, dtype in df.dtypes.items()]).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def source_modules(module_name):
+    """
+    A module plus every utils module it imports from, directly or through
+    other utils modules (e.g. features -> ratings -> franchises).
+    """
+    names = {module_name}
+    pending = [module_name]
+    while pending:
+        for value in vars(sys.modules[pending.pop()]).values():
+            name = value.__name__ if inspect.ismodule(value) else getattr(value, "__module__", None)
+            if isinstance(name, str) and name.startswith("utils.") and name in sys.modules and name not in names:
+                names.add(name)
+                pending.append(name)
+    return names
+
+
+def code_fingerprint(*funcs):
+    """Hash of the source of the modules defining funcs, so code edits miss the cache."""
+    digest = hashlib.sha256(str(CACHE_VERSION).encode())
+    for module_name in sorted(set().union(*(source_modules(func.__module__) for func in funcs))):
+        digest.update(inspect.getsource(sys.modules[module_name]).encode())
+    return digest.hexdigest()
+
+
+def stage_key(func, df, params):
+    """
+    Cache key of running func on df with params.
+
+    Args:
+        func: Stage function
+        df: Input frame
+        params: JSON-serializable dict of parameters the stage depends on
+
+    Returns:
+        str: Hex key
+    """
+    digest = hashlib.sha256()
+    digest.update(func.__qualname__.encode())
+    digest.update(code_fingerprint(func).encode())
+    digest.update(json.dumps(params, sort_keys=True, default=str).encode())
+    digest.update(frame_fingerprint(df).encode())
+    return digest.hexdigest()
+
+
+def entry_size(path):
+    """Total bytes of the files in a cache entry."""
+    return sum(entry.stat().st_size for entry in os.scandir(path) if entry.is_file())
+
+
+def touch(path):
+    """
+    Stamp a metadata file with the current time. Set explicitly because the
+    kernel's file timestamps only advance once per clock tick, which would
+    leave entries used in quick succession tied for eviction.
+    """
+    now = time.time_ns()
+    os.utime(path, ns=(now, now))
+
+
+def save_entry(key, outputs, cache_dir=STAGE_CACHE_DIR):
+    """
+    Store a stage's outputs.
+
+    DataFrames are written as Parquet, Series as NumPy arrays (re-indexed
+    from the first frame on load). Files go to a temporary directory that
+    is renamed into place, so a crash never leaves a partial entry.
+
+    Args:
+        key: Cache key
+        outputs: Tuple of DataFrames and Series returned by the stage
+        cache_dir: Cache location
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_dir = tempfile.mkdtemp(dir=cache_dir, prefix=".tmp-")
+    parts = []
+
+    try:
+        for i, value in enumerate(outputs):
+            if isinstance(value, pd.DataFrame):
+                value.to_parquet(os.path.join(tmp_dir, f"{i}.parquet"))
+                parts.append({"kind": "frame"})
+            else:
+                np.save(os.path.join(tmp_dir, f"{i}.npy"), value.to_numpy(), allow_pickle=False)
+                parts.append({"kind": "series", "name": value.name, "dtype": str(value.dtype)})
+
+        with open(os.path.join(tmp_dir, META_FILE), "w") as f:
+            json.dump({"parts": parts}, f)
+        touch(os.path.join(tmp_dir, META_FILE))
+
+        entry_dir = os.path.join(cache_dir, key)
+        if os.path.exists(entry_dir):
+            shutil.rmtree(entry_dir)
+        os.replace(tmp_dir, entry_dir)
+    except BaseException:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+
+
+def load_entry(key, cache_dir=STAGE_CACHE_DIR):
+    """
+    Load a stored stage output and mark it as recently used.
+
+    Returns:
+        tuple: The stage outputs, or None if the key is not cached
+    """
+    entry_dir = os.path.join(cache_dir, key)
+    meta_path = os.path.join(entry_dir, META_FILE)
+    if not os.path.exists(meta_path):
+        return None
+
+    with open(meta_path, "r") as f:
+        parts = json.load(f)["parts"]
+
+    outputs = []
+    index = None
+    for i, part in enumerate(parts):
+        if part["kind"] == "frame":
+            frame = pd.read_parquet(os.path.join(entry_dir, f"{i}.parquet"))
+            index = frame.index if index is None else index
+            outputs.append(frame)
+        else:
+            values = np.load(os.path.join(entry_dir, f"{i}.npy"), allow_pickle=False)
+            outputs.append(pd.Series(values, index=index, name=part["name"], dtype=part["dtype"]))
+
+    # Modification time of the metadata file orders entries for eviction
+    touch(meta_path)
+    return tuple(outputs)
+
+
+def evict(cache_dir=STAGE_CACHE_DIR, max_bytes=MAX_CACHE_BYTES):
+    """
+    Delete least recently used entries until the cache fits in max_bytes.
+
+    Returns:
+        int: Number of entries deleted
+    """
+    if not os.path.isdir(cache_dir):
+        return 0
+
+    entries = []
+    for entry in os.scandir(cache_dir):
+        meta_path = os.path.join(entry.path, META_FILE)
+        if entry.is_dir() and os.path.exists(meta_path):
+            entries.append((os.stat(meta_path).st_mtime_ns, entry_size(entry.path), entry.path))
+
+    total = sum(size for _, size, _ in entries)
+    removed = 0
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        shutil.rmtree(path, ignore_errors=True)
+        total -= size
+        removed += 1
+
+    return removed
+
+
+def cached_stage(func, df, params, use_cache=True, cache_dir=STAGE_CACHE_DIR,
+                 max_bytes=MAX_CACHE_BYTES, kwargs=None):
+    """
+    Run a pipeline stage through the cache.
+
+    Args:
+        func: Stage function taking df and returning a tuple of frames / series
+              whose series share the index of the first frame (e.g. encode_features)
+        df: Input frame
+        params: Parameters the stage's output depends on
+        use_cache: Whether to use (and write) the cache
+        cache_dir: Cache location
+        max_bytes: Size cap applied after writing a new entry
+        kwargs: Keyword arguments for func (anything that changes its output
+                must also be in params)
+
+    Returns:
+        tuple: The stage outputs
+    """
+    kwargs = kwargs or {}
+    if not use_cache:
+        return func(df, **kwargs)
+
+    key = stage_key(func, df, params)
+    try:
+        outputs = load_entry(key, cache_dir)
+    except Exception as e:
+        print(f"⚠ Could not read cached {func.__name__} output ({e}), recomputing")
+        outputs = None
+
+    if outputs is not None:
+        print(f"✓ Loaded cached {func.__name__} output ({key[:12]})")
+        return outputs
+
+    outputs = func(df, **kwargs)
+
+    try:
+        save_entry(key, outputs, cache_dir)
+        evict(cache_dir, max_bytes)
+    except (OSError, ValueError, TypeError, ImportError) as e:
+        print(f"⚠ Could not cache {func.__name__} output: {e}")
+
+    return outputs
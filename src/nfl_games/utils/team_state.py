@@ -0,0 +1,306 @@
+"""
+team_state.py
+Online per-team state behind the rolling features.
+
+add_rolling_features and add_rolling_epa_features recompute every team's history
+from scratch. TeamState keeps what those features need instead: for each team a
+ring buffer with a running sum per metric (points scored, allowed, wins, the
+rolling EPA metrics and the older window behind momentum) and the date of its
+last game. Recording a finished game costs O(window); the features for a team's
+next game are read straight from its buffers, and match what encode_features
+computes for that game (to floating-point rounding for the EPA means).
+
+Brendan Dileo, October 2026
+"""
+
+import math
+import os
+import pickle
+from collections import deque
+
+import pandas as pd
+
+from utils.features import (
+    EPA_DIFFS, EPA_ROLLING_SPECS, GAME_DIFFS, GAME_ROLLING_SPECS, MODERN_START_YEAR, ROLLING_WINDOW
+)
+
+# Persisted state
+TEAM_STATE_FILE = "cache/team_state.pkl"
+
+# Defaults for teams without history, as in add_rolling_features
+GAME_FILLS = {prefix: fill_value for _, _, prefix, fill_value in GAME_ROLLING_SPECS}
+REST_DAYS_FILL = 7
+MOMENTUM_FILL = 0
+
+
+def as_float(value):
+    """Float value of a possibly missing number (None / NA -> NaN)."""
+    return math.nan if pd.isna(value) else float(value)
+
+
+def game_key(date, team_home, team_away):
+    """Key identifying a recorded game."""
+    return pd.Timestamp(date), str(team_home), str(team_away)
+
+
+class RollingWindow:
+    """
+    Ring buffer of a team's last N values with a running sum of the present ones.
+
+    Missing values take a slot without counting towards the mean, like
+    rolling(N, min_periods=1).mean() over a series with NaNs.
+    """
+
+    def __init__(self, size):
+        """
+        Args:
+            size: Number of values kept
+        """
+        self.values = deque(maxlen=size)
+        self.total = 0.0
+        self.count = 0
+
+    def push(self, value):
+        """
+        Add a value, dropping the oldest one if the buffer is full.
+
+        Returns:
+            tuple: (True, dropped value) if a value was dropped, else (False, None)
+        """
+        dropped = len(self.values) == self.values.maxlen
+        old = self.values[0] if dropped else None
+        if dropped and not math.isnan(old):
+            self.total -= old
+            self.count -= 1
+
+        self.values.append(value)
+        if not math.isnan(value):
+            self.total += value
+            self.count += 1
+        if not self.count:
+            self.total = 0.0
+
+        return dropped, old
+
+    def mean(self):
+        """Mean of the present values (NaN if there are none)."""
+        return self.total / self.count if self.count else math.nan
+
+
+class TeamHistory:
+    """Rolling windows and last game date of one team."""
+
+    def __init__(self, window):
+        """
+        Args:
+            window: Number of games in each rolling mean
+        """
+        self.scored = RollingWindow(window)
+        # The window before the recent one, for momentum
+        self.older_scored = RollingWindow(window)
+        self.allowed = RollingWindow(window)
+        self.won = RollingWindow(window)
+        self.epa = {prefix: RollingWindow(window) for _, _, prefix, _ in EPA_ROLLING_SPECS}
+        self.last_date = None
+
+    def record(self, date, scored, allowed, epa_values):
+        """Add one game (O(window) at most, O(1) amortized)."""
+        dropped, old = self.scored.push(scored)
+        if dropped:
+            self.older_scored.push(old)
+        self.allowed.push(allowed)
+        # An unplayed game (missing score) counts as not won, as in the batch features
+        self.won.push(float(scored > allowed))
+        for prefix, value in epa_values.items():
+            self.epa[prefix].push(value)
+        self.last_date = date
+
+    def features(self, date):
+        """Unfilled per-team features for a game on date."""
+        recent = self.scored.mean()
+        rest_days = (date - self.last_date).days if self.last_date is not None else math.nan
+        features = {
+            "avg_points": recent,
+            "avg_allowed": self.allowed.mean(),
+            "win_pct": self.won.mean(),
+            "rest_days": float(rest_days),
+            "momentum": recent - self.older_scored.mean(),
+        }
+        features.update({prefix: buffer.mean() for prefix, buffer in self.epa.items()})
+        return features
+
+
+class TeamState:
+    """
+    Per-team rolling state, updated one game at a time.
+
+    Feed games in date order with record_game (or update with a frame of
+    games), then ask game_features for the features of an upcoming game.
+    Recorded games are remembered by (date, home team, away team), so update
+    can be called again with the same frame once more scores are in.
+    """
+
+    def __init__(self, window=ROLLING_WINDOW):
+        """
+        Args:
+            window: Number of games in each rolling mean (ROLLING_WINDOW for
+                the features the model is trained on)
+        """
+        self.window = window
+        self.teams = {}
+        self.recorded = set()
+        self.last_date = None
+        # Earliest date update has to look at again: the last recorded date,
+        # or an earlier one with a game that was still missing its score
+        self.resume_date = None
+
+    def team(self, name):
+        """History of a team (empty for a team not seen yet)."""
+        if name not in self.teams:
+            self.teams[name] = TeamHistory(self.window)
+        return self.teams[name]
+
+    def record_game(self, game):
+        """
+        Add one game's result to both teams' windows.
+
+        Args:
+            game: Mapping or row with team_home, team_away, schedule_date,
+                  score_home, score_away and, if available, the home_/away_
+                  nflfastR columns in EPA_ROLLING_SPECS
+        """
+        get = game.get if hasattr(game, "get") else lambda col, default=None: getattr(game, col, default)
+        date = pd.Timestamp(get("schedule_date"))
+        score_home, score_away = as_float(get("score_home")), as_float(get("score_away"))
+
+        home_epa = {prefix: as_float(get(home_col)) for home_col, _, prefix, _ in EPA_ROLLING_SPECS}
+        away_epa = {prefix: as_float(get(away_col)) for _, away_col, prefix, _ in EPA_ROLLING_SPECS}
+        self.team(str(get("team_home"))).record(date, score_home, score_away, home_epa)
+        self.team(str(get("team_away"))).record(date, score_away, score_home, away_epa)
+        self.recorded.add(game_key(date, get("team_home"), get("team_away")))
+
+        if self.last_date is None or date > self.last_date:
+            self.last_date = date
+
+    def update(self, games, completed_only=True):
+        """
+        Record every game not recorded yet.
+
+        Only games from resume_date on are considered, so a weekly update
+        builds keys for a handful of rows rather than the whole history. A
+        game skipped for lacking a score (e.g. a late game on the same day as
+        recorded ones) holds resume_date back and is picked up by a later
+        update once its score is in.
+
+        Args:
+            games: Game frame (spreadspoke columns, optionally merged with nflfastR)
+            completed_only: Skip games without a final score
+
+        Returns:
+            int: Number of games recorded
+        """
+        dates = pd.to_datetime(games["schedule_date"])
+        candidates = games["schedule_season"] >= MODERN_START_YEAR
+        if self.resume_date is not None:
+            candidates &= dates >= self.resume_date
+        new = games[candidates].assign(schedule_date=dates[candidates])
+
+        pending = None
+        if completed_only:
+            complete = new["score_home"].notna() & new["score_away"].notna()
+            pending = new.loc[~complete, "schedule_date"].min()
+            new = new[complete]
+        keys = map(game_key, new["schedule_date"], new["team_home"], new["team_away"])
+        new = new[[key not in self.recorded for key in keys]]
+
+        for game in new.sort_values("schedule_date").to_dict("records"):
+            self.record_game(game)
+        self.resume_date = self.last_date if pd.isna(pending) else min(pending, self.last_date or pending)
+        return len(new)
+
+    def game_features(self, team_home, team_away, date, epa=True):
+        """
+        Rolling features of an upcoming game, filled and with difference
+        features, as encode_features would compute them for that game.
+
+        Args:
+            team_home: Home team (spreadspoke name)
+            team_away: Away team
+            date: Game date
+            epa: Include the rolling EPA features
+
+        Returns:
+            dict: Feature name -> value
+        """
+        date = pd.Timestamp(date)
+        fills = {**GAME_FILLS, "rest_days": REST_DAYS_FILL, "momentum": MOMENTUM_FILL}
+        if epa:
+            fills.update({prefix: fill_value for _, _, prefix, fill_value in EPA_ROLLING_SPECS})
+
+        features = {}
+        for side, name in [("home", team_home), ("away", team_away)]:
+            team_features = self.team(str(name)).features(date)
+            for key, fill_value in fills.items():
+                value = team_features[key]
+                features[f"{side}_{key}"] = fill_value if math.isnan(value) else value
+
+        diffs = {**GAME_DIFFS, **(EPA_DIFFS if epa else {})}
+        for name, (minuend, subtrahend) in diffs.items():
+            features[name] = features[minuend] - features[subtrahend]
+        return features
+
+    def save(self, path=TEAM_STATE_FILE):
+        """Write the state to disk atomically."""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = path + ".tmp"
+
+        with open(tmp_path, "wb") as f:
+            pickle.dump(self, f)
+        os.replace(tmp_path, path)
+
+
+def load_team_state(path=TEAM_STATE_FILE, window=ROLLING_WINDOW):
+    """
+    Load the saved team state, or an empty one if there is none (or it was
+    built with a different window, or without recorded-game keys).
+
+    Returns:
+        TeamState: State to update and read features from
+    """
+    if os.path.exists(path):
+        with open(path, "rb") as f:
+            state = pickle.load(f)
+        if not hasattr(state, "resume_date"):
+            print("⚠ Saved team state predates recorded-game keys, starting over")
+        elif state.window == window:
+            return state
+        else:
+            print(f"⚠ Saved team state uses a {state.window}-game window, starting over")
+
+    return TeamState(window)
+
+
+def replay_features(games, window=ROLLING_WINDOW):
+    """
+    Features of every game from the state just before it, in the batch order
+    (modern seasons, sorted by date), recording each game after reading it.
+
+    Args:
+        games: Game frame as passed to encode_features
+        window: Number of games in each rolling mean
+
+    Returns:
+        tuple: (pd.DataFrame of features indexed like the games, final TeamState)
+    """
+    games = games.sort_values("schedule_date")
+    games = games[games["schedule_season"] >= MODERN_START_YEAR]
+    games = games.assign(schedule_date=pd.to_datetime(games["schedule_date"]))
+    epa = "home_epa_per_play" in games.columns
+
+    state = TeamState(window)
+    rows = []
+    for game in games.to_dict("records"):
+        rows.append(state.game_features(game["team_home"], game["team_away"], game["schedule_date"], epa))
+        state.record_game(game)
+
+    return pd.DataFrame(rows, index=games.index), state
@@ -0,0 +1,58 @@
+"""
+conftest.py
+Shared fixtures for the pipeline tests (run with: python -m pytest tests).
+
+The tests import the pipeline the way main.py does (from utils... / models...),
+so src/nfl_games is put on the path. Data comes from the same synthetic
+generators the benchmarks use.
+
+Brendan Dileo, October 2026
+"""
+
+import contextlib
+import io
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src", "nfl_games"))
+
+from benchmark import make_synthetic_pbp, make_synthetic_schedule, make_synthetic_spreadspoke  # noqa: E402
+from utils.load_data import aggregate_team_stats, merge_with_spreadspoke  # noqa: E402
+from utils.preprocess import preprocess, use_copy_on_write  # noqa: E402
+
+# Pipeline stages expect copy-on-write, as in main.py
+use_copy_on_write()
+
+
+@pytest.fixture(scope="session")
+def synthetic_pbp():
+    """Six seasons of synthetic play-by-play."""
+    return make_synthetic_pbp(range(2019, 2025))
+
+
+@pytest.fixture(scope="session")
+def schedule():
+    """Six seasons of synthetic games (no play-by-play), the last week unplayed."""
+    return make_synthetic_schedule(list(range(2019, 2025)))
+
+
+@pytest.fixture(scope="session")
+def synthetic_spreadspoke(synthetic_pbp):
+    """Spreadspoke-style schedule for the synthetic play-by-play."""
+    return make_synthetic_spreadspoke(synthetic_pbp)
+
+
+@pytest.fixture(scope="session")
+def team_stats(synthetic_pbp):
+    """Team-game stats aggregated from the synthetic play-by-play."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        return aggregate_team_stats(synthetic_pbp)
+
+
+@pytest.fixture
+def merged_games(synthetic_spreadspoke, team_stats):
+    """Preprocessed games merged with nflfastR stats (a fresh frame per test)."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        return preprocess(merge_with_spreadspoke(synthetic_spreadspoke, team_stats), copy=False)
@@ -0,0 +1,57 @@
+"""
+test_aggregate.py
+The single-pass team-stat kernel matches the groupby implementation it replaced,
+its situational splits match filtered groupbys, and a process pool gives the
+same result as the serial path.
+
+Brendan Dileo, October 2026
+"""
+
+import contextlib
+import io
+
+import numpy as np
+import pandas as pd
+
+from benchmark import legacy_aggregate_team_stats, reference_situational_splits, synthetic_store
+from utils.load_data import aggregate_nflfastr_seasons, aggregate_team_stats
+from utils.schema import PBP_SCHEMA, apply_schema
+
+SPLIT_COLUMNS = [
+    "red_zone_trips", "red_zone_td_rate", "third_downs", "third_down_conv_rate",
+    "early_down_epa", "neutral_pass_rate",
+]
+
+
+def quiet(func, *args, **kwargs):
+    """Call func with its progress prints silenced."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        return func(*args, **kwargs)
+
+
+def test_kernel_matches_five_groupbys(synthetic_pbp):
+    expected = quiet(legacy_aggregate_team_stats, synthetic_pbp)
+    result = quiet(aggregate_team_stats, synthetic_pbp, splits=False)
+    pd.testing.assert_frame_equal(result, expected)
+
+
+def test_situational_splits_match_filtered_groupbys(synthetic_pbp):
+    plays = apply_schema(synthetic_pbp, PBP_SCHEMA)
+    base = quiet(aggregate_team_stats, plays, splits=False)
+    result = quiet(aggregate_team_stats, plays)
+
+    # The splits only add columns
+    pd.testing.assert_frame_equal(result[base.columns], base)
+
+    expected = reference_situational_splits(plays)
+    actual = result.set_index(["game_id", "team"]).loc[expected.index]
+    for col in SPLIT_COLUMNS:
+        np.testing.assert_allclose(actual[col], expected[col], rtol=1e-4, atol=1e-5, err_msg=col)
+
+
+def test_process_pool_matches_serial():
+    seasons = [2022, 2023, 2024]
+    with synthetic_store(seasons, weeks=4):
+        expected = quiet(aggregate_nflfastr_seasons, seasons, offline=True, force_rebuild=True)
+        result = quiet(aggregate_nflfastr_seasons, seasons, offline=True, force_rebuild=True, n_jobs=2)
+    pd.testing.assert_frame_equal(result, expected, check_exact=True)
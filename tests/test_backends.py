@@ -0,0 +1,44 @@
+"""
+test_backends.py
+The Polars backend gives the same results as pandas.
+
+Brendan Dileo, October 2026
+"""
+
+import contextlib
+import io
+
+import pandas as pd
+import pytest
+
+from utils.features import encode_features
+from utils.load_data import aggregate_team_stats
+from utils.schema import PBP_SCHEMA, apply_schema
+
+pytest.importorskip("polars")
+
+
+def quiet(func, *args, **kwargs):
+    """Call func with its progress prints silenced."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        return func(*args, **kwargs)
+
+
+def test_aggregate_team_stats_matches_pandas(synthetic_pbp, team_stats):
+    result = quiet(aggregate_team_stats, synthetic_pbp, backend="polars")
+    pd.testing.assert_frame_equal(result, team_stats, rtol=1e-5, atol=1e-9)
+
+
+def test_aggregate_team_stats_matches_pandas_with_schema(synthetic_pbp):
+    # float32 columns (PBP_SCHEMA) agree to float32 precision
+    plays = apply_schema(synthetic_pbp, PBP_SCHEMA)
+    expected = quiet(aggregate_team_stats, plays)
+    result = quiet(aggregate_team_stats, plays, backend="polars")
+    pd.testing.assert_frame_equal(result, expected, rtol=1e-5, atol=1e-5)
+
+
+def test_encode_features_matches_pandas(merged_games):
+    X, y, _ = quiet(encode_features, merged_games.copy())
+    X_polars, y_polars, _ = quiet(encode_features, merged_games.copy(), backend="polars")
+    pd.testing.assert_frame_equal(X_polars, X, check_exact=False, rtol=1e-9, atol=1e-9)
+    pd.testing.assert_series_equal(y_polars, y, check_exact=True)
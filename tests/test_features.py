@@ -0,0 +1,98 @@
+"""
+test_features.py
+Feature engineering matches the reference implementations in benchmark.py, and
+window-sweep variants rebuild every feature that depends on the window.
+
+Brendan Dileo, October 2026
+"""
+
+import contextlib
+import io
+
+import numpy as np
+import pandas as pd
+
+from benchmark import add_synthetic_epa, legacy_rolling_epa_features, legacy_rolling_game_features
+from utils.features import (
+    EPA_DIFFS, EPA_ROLLING_SPECS, GAME_DIFFS, INTERACTIONS, ROLLING_WINDOW, add_rolling_features, encode_features,
+    add_rolling_epa_features, rolling_game_features, window_variant, window_variants
+)
+from utils.rolling import rolling_means
+
+# First-game defaults of add_rolling_features
+ROLLING_FILLS = {"avg_points": 21, "avg_allowed": 21, "win_pct": 0.5, "rest_days": 7, "momentum": 0}
+
+
+def test_rolling_game_features_match_per_team_loop(schedule):
+    expected = legacy_rolling_game_features(schedule, ROLLING_WINDOW)
+    pd.testing.assert_frame_equal(rolling_game_features(schedule, ROLLING_WINDOW), expected, check_exact=True)
+
+
+def test_add_rolling_features_fills_first_games(schedule):
+    expected = legacy_rolling_game_features(schedule, ROLLING_WINDOW)
+    expected = expected.fillna({f"{side}_{name}": fill for name, fill in ROLLING_FILLS.items()
+                                for side in ["home", "away"]})
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = add_rolling_features(schedule)
+
+    result = result.loc[expected.index]
+    pd.testing.assert_frame_equal(result[expected.columns], expected, check_exact=True)
+    for name, (minuend, subtrahend) in GAME_DIFFS.items():
+        pd.testing.assert_series_equal(result[name], expected[minuend] - expected[subtrahend], check_names=False)
+
+    # Every team's first game (week 1 of the first season) gets the defaults
+    first_week = (schedule["schedule_season"] == schedule["schedule_season"].min()) & (schedule["week"] == 1)
+    for name, fill in ROLLING_FILLS.items():
+        for side in ["home", "away"]:
+            assert (result.loc[first_week, f"{side}_{name}"] == fill).all()
+
+
+def test_rolling_epa_means_match_per_team_loop(schedule):
+    # EPA missing before 2021, as for seasons without nflfastR data
+    games = add_synthetic_epa(schedule, first_season=2021)
+    expected = legacy_rolling_epa_features(games, ROLLING_WINDOW)
+    pd.testing.assert_frame_equal(rolling_means(games, EPA_ROLLING_SPECS, ROLLING_WINDOW), expected, check_exact=True)
+
+
+def test_add_rolling_epa_features_fills_and_diffs(schedule):
+    games = add_synthetic_epa(schedule, first_season=2021)
+    expected = legacy_rolling_epa_features(games, ROLLING_WINDOW)
+    expected = expected.fillna({f"{side}_{prefix}": fill for _, _, prefix, fill in EPA_ROLLING_SPECS
+                                for side in ["home", "away"]})
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = add_rolling_epa_features(games).loc[expected.index]
+
+    pd.testing.assert_frame_equal(result[expected.columns], expected, check_exact=True)
+    for name, (minuend, subtrahend) in EPA_DIFFS.items():
+        pd.testing.assert_series_equal(result[name], expected[minuend] - expected[subtrahend], check_names=False)
+
+
+def encode(merged_games):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return encode_features(merged_games, windows=[ROLLING_WINDOW, 8])
+
+
+def test_rolling_window_variant_reproduces_features(merged_games):
+    # Games without a spread get the same (filled) interactions in X and the variant
+    merged_games.loc[merged_games.index[::50], "spread_favorite"] = np.nan
+    X, _, df = encode(merged_games)
+    assert X["spread_epa_interaction"].notna().all()
+    variant = window_variant(df, window_variants(df, [ROLLING_WINDOW, 8], [])[str(ROLLING_WINDOW)])
+
+    assert set(INTERACTIONS) | {"avg_points_diff", "epa_diff"} <= set(variant.columns)
+    pd.testing.assert_frame_equal(variant.loc[X.index], X[variant.columns], check_names=False)
+
+
+def test_variant_recomputes_diffs_and_interactions(merged_games):
+    X, _, df = encode(merged_games)
+    variant = window_variant(df, window_variants(df, [ROLLING_WINDOW, 8], [])["8"])
+
+    pd.testing.assert_series_equal(
+        variant["avg_points_diff"], df["home_avg_points_8"] - df["away_avg_points_8"], check_names=False
+    )
+    pd.testing.assert_series_equal(
+        variant["spread_epa_interaction"],
+        df["spread_favorite"] * (df["home_rolling_epa_8"] - df["away_rolling_epa_8"]), check_names=False
+    )
+    # Features that don't depend on the window are left alone
+    assert "rest_days_diff" not in variant.columns
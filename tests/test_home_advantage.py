@@ -0,0 +1,29 @@
+"""
+test_home_advantage.py
+The expanding home field advantage only uses each team's earlier games.
+
+Brendan Dileo, October 2026
+"""
+
+import pandas as pd
+import pytest
+
+from benchmark import reference_home_field_advantage
+from utils.features import expanding_home_field_advantage
+
+
+@pytest.mark.parametrize("decay", [1.0, 0.8])
+def test_expanding_advantage_matches_earlier_games_reference(schedule, decay):
+    sample = schedule[schedule["schedule_season"] >= 2023]
+    expected = reference_home_field_advantage(sample, decay)
+    pd.testing.assert_series_equal(expanding_home_field_advantage(sample, decay), expected, rtol=1e-9, atol=1e-12)
+
+
+def test_later_results_do_not_change_earlier_games(schedule):
+    result = expanding_home_field_advantage(schedule)
+    changed = schedule.copy()
+    last_season = changed["schedule_season"] == changed["schedule_season"].max()
+    changed.loc[last_season, ["score_home", "score_away"]] = changed.loc[last_season, ["score_away", "score_home"]].to_numpy()
+
+    earlier = ~last_season
+    pd.testing.assert_series_equal(expanding_home_field_advantage(changed)[earlier], result[earlier])
@@ -0,0 +1,103 @@
+"""
+test_ingest.py
+Weekly ingest writes each game to the spreadspoke CSV once.
+
+Brendan Dileo, October 2026
+"""
+
+import contextlib
+import io
+import os
+
+import pandas as pd
+
+from benchmark import add_schedule_columns, make_synthetic_pbp, make_synthetic_spreadspoke, synthetic_store
+from utils import game_store
+from utils.ingest import SPREADSPOKE_COLUMNS, ingest_week, load_dirty_teams, refresh_team_state, upsert_games
+from utils.load_data import DATA_PATH, TEAM_STATS_VERSION, load_data
+from utils.pbp_store import season_path
+from utils.team_state import replay_features
+
+
+def game(home, away, week="6", score_home="", score_away="", neutral="FALSE"):
+    """One spreadspoke row as read from the CSV (all strings)."""
+    row = dict.fromkeys(SPREADSPOKE_COLUMNS, "")
+    row.update({
+        "schedule_date": "10/13/2024", "schedule_season": "2024", "schedule_week": week,
+        "schedule_playoff": "FALSE", "team_home": home, "team_away": away,
+        "score_home": score_home, "score_away": score_away, "stadium_neutral": neutral,
+    })
+    return row
+
+
+def test_upsert_replaces_direct_and_swapped_matches(tmp_path):
+    csv_path = str(tmp_path / "spreadspoke_scores.csv")
+    pd.DataFrame([
+        game("Green Bay Packers", "Arizona Cardinals"),
+        # London game listed with home and away the other way round
+        game("Chicago Bears", "Jacksonville Jaguars", neutral="TRUE"),
+        game("Dallas Cowboys", "Detroit Lions", week="5", score_home="9", score_away="47"),
+    ]).to_csv(csv_path, index=False)
+
+    rows = pd.DataFrame([
+        game("Green Bay Packers", "Arizona Cardinals", score_home="34", score_away="13"),
+        game("Jacksonville Jaguars", "Chicago Bears", score_home="16", score_away="35", neutral="TRUE"),
+        game("Houston Texans", "New England Patriots", score_home="41", score_away="21"),
+    ])
+    added, replaced = upsert_games(rows, csv_path)
+
+    assert (added, replaced) == (1, 2)
+    result = pd.read_csv(csv_path, dtype=str, keep_default_na=False)
+    assert len(result) == 4
+    assert (result["score_home"] != "").all()
+    assert result.iloc[0]["team_home"] == "Dallas Cowboys"
+
+
+def test_ingest_week_does_not_mark_unaggregated_season_complete():
+    season = 2023
+    with synthetic_store([]):
+        pbp = make_synthetic_pbp([season], weeks=4, seed=season)
+        spreadspoke = make_synthetic_spreadspoke(pbp)
+        pbp = add_schedule_columns(pbp, spreadspoke)
+        os.makedirs(os.path.dirname(season_path(season)), exist_ok=True)
+        pbp.to_parquet(season_path(season), index=False)
+        spreadspoke[spreadspoke["schedule_week"] != "4"].to_csv(DATA_PATH, index=False, date_format="%m/%d/%Y")
+
+        # A finished season with no manifest entry gets a single week ingested
+        with contextlib.redirect_stdout(io.StringIO()):
+            ingest_week(season, 4, offline=True)
+
+        manifest = game_store.load_manifest()
+        assert manifest[str(season)]["complete"] is False
+        assert not game_store.is_season_stored(manifest, season, TEAM_STATS_VERSION)
+
+
+def test_refresh_team_state_consumes_dirty_teams():
+    season, week = 2023, 4
+    with synthetic_store([]):
+        pbp = make_synthetic_pbp([season], weeks=week, seed=season)
+        spreadspoke = make_synthetic_spreadspoke(pbp)
+        pbp = add_schedule_columns(pbp, spreadspoke)
+        os.makedirs(os.path.dirname(season_path(season)), exist_ok=True)
+        pbp.to_parquet(season_path(season), index=False)
+        spreadspoke[spreadspoke["schedule_week"] != str(week)].to_csv(
+            DATA_PATH, index=False, date_format="%m/%d/%Y"
+        )
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            # State built from the games before the new week, then the week is ingested
+            refresh_team_state(load_data())
+            summary = ingest_week(season, week, offline=True)
+            games = load_data()
+            assert set(load_dirty_teams()) == set(summary["teams"])
+
+            state = refresh_team_state(games)
+            assert load_dirty_teams() == {}
+            # Nothing dirty: the saved state is returned as is
+            assert refresh_team_state(games).recorded == state.recorded
+
+        _, expected = replay_features(games)
+        assert state.recorded == expected.recorded
+        date = games["schedule_date"].max() + pd.Timedelta(days=7)
+        for team in summary["teams"]:
+            assert state.team(team).features(date) == expected.team(team).features(date)
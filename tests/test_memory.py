@@ -0,0 +1,32 @@
+"""
+test_memory.py
+Peak memory of the feature pipeline stays within a multiple of its output.
+
+Brendan Dileo, October 2026
+"""
+
+import contextlib
+import io
+import tracemalloc
+
+from benchmark import run_pipeline
+from utils.schema import frame_memory
+
+# Peak traced memory allowed for merge -> preprocess -> encode_features,
+# as a multiple of the final frame's size
+PEAK_MEMORY_MULTIPLE = 3.0
+
+
+def test_pipeline_peak_memory(synthetic_spreadspoke, team_stats):
+    with contextlib.redirect_stdout(io.StringIO()):
+        # Warm-up run so one-off allocations (imports, caches) aren't counted
+        run_pipeline(synthetic_spreadspoke, team_stats)
+        tracemalloc.start()
+        try:
+            _, _, df = run_pipeline(synthetic_spreadspoke, team_stats)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+    assert peak <= PEAK_MEMORY_MULTIPLE * frame_memory(df), \
+        f"feature pipeline peak {peak / frame_memory(df):.1f}x the final frame"
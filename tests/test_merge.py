@@ -0,0 +1,99 @@
+"""
+test_merge.py
+merge_with_spreadspoke joins on franchise ids: historical names, playoff weeks,
+neutral-site games listed the other way round, and reported misses.
+
+Brendan Dileo, October 2026
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.franchises import UNKNOWN_ID, franchise_name, ids_from_abbreviations, ids_from_names
+from utils.load_data import PLAYOFF_WEEKS, merge_with_spreadspoke, spreadspoke_game_keys
+
+
+def team_games(season, week, home, away, home_epa, away_epa):
+    """nflfastR team-game rows (one per team) for one game."""
+    game_id = f"{season}_{week:02d}_{away}_{home}"
+    return [
+        {"game_id": game_id, "season": season, "week": week, "team": team,
+         "home_team": home, "away_team": away, "epa_per_play": epa}
+        for team, epa in [(home, home_epa), (away, away_epa)]
+    ]
+
+
+def spreadspoke(*games):
+    """Spreadspoke rows from (season, week label, home name, away name)."""
+    return pd.DataFrame(games, columns=["schedule_season", "schedule_week", "team_home", "team_away"])
+
+
+def merge(schedule, stats, capsys=None):
+    merged = merge_with_spreadspoke(schedule, pd.DataFrame(stats))
+    return merged if capsys is None else (merged, capsys.readouterr().out)
+
+
+@pytest.mark.parametrize("name, abbreviation, season", [
+    ("Oakland Raiders", "LV", 2019),
+    ("Oakland Raiders", "OAK", 2019),
+    ("Las Vegas Raiders", "LV", 2020),
+    ("San Diego Chargers", "LAC", 2016),
+    ("Los Angeles Chargers", "SD", 2017),
+    ("St. Louis Rams", "LA", 2015),
+    ("Washington Redskins", "WAS", 2019),
+])
+def test_historical_names_match_abbreviations(name, abbreviation, season):
+    assert ids_from_names([name])[0] == ids_from_abbreviations([abbreviation])[0] != UNKNOWN_ID
+
+    merged = merge(spreadspoke((season, "3", name, "Denver Broncos")),
+                   team_games(season, 3, abbreviation, "DEN", 0.2, -0.1))
+    assert merged.loc[0, "home_epa_per_play"] == pytest.approx(0.2)
+    assert merged.loc[0, "away_epa_per_play"] == pytest.approx(-0.1)
+
+
+def test_franchise_name_follows_relocations():
+    raiders = ids_from_abbreviations(["LV"])[0]
+    assert [franchise_name(raiders, season) for season in [1990, 2019, 2020]] == \
+        ["Los Angeles Raiders", "Oakland Raiders", "Las Vegas Raiders"]
+    assert ids_from_names(["Springfield Atoms"])[0] == UNKNOWN_ID
+
+
+@pytest.mark.parametrize("label", list(PLAYOFF_WEEKS))
+@pytest.mark.parametrize("season", [2020, 2021])
+def test_playoff_rounds_map_to_weeks(label, season):
+    week = PLAYOFF_WEEKS[label][season >= 2021]
+    schedule = spreadspoke((season, label.capitalize(), "Kansas City Chiefs", "Buffalo Bills"))
+    assert spreadspoke_game_keys(schedule).loc[0, "week"] == week
+
+    merged = merge(schedule, team_games(season, week, "KC", "BUF", 0.3, 0.1))
+    assert merged.loc[0, "home_epa_per_play"] == pytest.approx(0.3)
+
+
+def test_neutral_site_game_listed_swapped(capsys):
+    # Spreadspoke lists the London game with the Jaguars at home, nflfastR the other way round
+    merged, out = merge(
+        spreadspoke((2023, "5", "Jacksonville Jaguars", "Buffalo Bills")),
+        team_games(2023, 5, "BUF", "JAX", -0.2, 0.1), capsys
+    )
+    assert merged.loc[0, "home_epa_per_play"] == pytest.approx(0.1)
+    assert merged.loc[0, "away_epa_per_play"] == pytest.approx(-0.2)
+    assert "1 game(s) matched with home/away swapped" in out
+
+
+def test_unmatched_games_are_reported(capsys):
+    schedule = spreadspoke(
+        (2023, "1", "Green Bay Packers", "Chicago Bears"),
+        (2023, "2", "Detroit Lions", "Seattle Seahawks"),
+        # Before nflfastR's seasons: not reported
+        (1999, "1", "Detroit Lions", "Seattle Seahawks"),
+    )
+    stats = team_games(2023, 1, "GB", "CHI", 0.1, 0.0) + team_games(2023, 3, "MIN", "NYG", 0.0, 0.0)
+    merged, out = merge(schedule, stats, capsys)
+
+    assert np.isnan(merged.loc[1, "home_epa_per_play"]) and np.isnan(merged.loc[2, "home_epa_per_play"])
+    assert "Matched nflfastR data for 1/3 games" in out
+    assert "1 spreadspoke game(s) in nflfastR seasons have no nflfastR stats" in out
+    assert "2023 week 2: Seattle Seahawks @ Detroit Lions" in out
+    assert "1 nflfastR game(s) have no spreadspoke game" in out
+    assert "2023 week 3: New York Giants @ Minnesota Vikings" in out
@@ -0,0 +1,172 @@
+"""
+test_pbp_store.py
+Season downloads against a local HTTP stand-in for the nflverse release assets:
+retries, fail-fast on missing seasons, and resuming partial files.
+
+Brendan Dileo, October 2026
+"""
+
+import hashlib
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pandas as pd
+import pytest
+
+from utils.pbp_store import _fetch_with_retries, count_rows, fetch_season, fetch_seasons, season_path
+
+
+class ReleaseHandler(BaseHTTPRequestHandler):
+    """Serves server.files with ETags, Range/If-Range, and scripted failures."""
+
+    def do_GET(self):
+        name = self.path.lstrip("/")
+        self.server.requests.append((name, dict(self.headers)))
+
+        failures = self.server.failures.get(name)
+        if failures:
+            self.send_error(failures.pop(0))
+            return
+        if name not in self.server.files:
+            self.send_error(404)
+            return
+
+        body = self.server.files[name]
+        etag = f'"{hashlib.md5(body).hexdigest()}"'
+        range_header = self.headers.get("Range")
+        if range_header and self.headers.get("If-Range") == etag:
+            start = int(range_header.removeprefix("bytes=").rstrip("-"))
+            if start >= len(body):
+                self.send_error(416)
+                return
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{len(body) - 1}/{len(body)}")
+            body = body[start:]
+        else:
+            self.send_response(200)
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def parquet_bytes(season, tmp_path, rows=500):
+    """A small play-by-play Parquet file for one season."""
+    path = tmp_path / f"fixture_{season}.parquet"
+    pd.DataFrame({"season": season, "play_id": range(rows), "epa": 0.1}).to_parquet(path)
+    return path.read_bytes()
+
+
+@pytest.fixture
+def server(tmp_path):
+    """Local release server with play_by_play_2023 and _2024 (2022 is missing)."""
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), ReleaseHandler)
+    httpd.files = {f"play_by_play_{season}.parquet": parquet_bytes(season, tmp_path) for season in [2023, 2024]}
+    httpd.failures = {}
+    httpd.requests = []
+    httpd.url_template = f"http://127.0.0.1:{httpd.server_address[1]}/play_by_play_{{season}}.parquet"
+
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def checksum(body):
+    return f"sha256:{hashlib.sha256(body).hexdigest()}"
+
+
+def write_partial(path, body, validator):
+    """Leave a partial download (and its validator) as an interrupted fetch would."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    (path.parent / (path.name + ".part")).write_bytes(body)
+    (path.parent / (path.name + ".part.json")).write_text(json.dumps({"validator": validator}))
+
+
+def test_fetch_seasons_downloads_and_reports_missing(server, tmp_path):
+    store = tmp_path / "store"
+    fetched, failed = fetch_seasons([2022, 2023, 2024], str(store), workers=3, retries=2,
+                                    backoff=0, url_template=server.url_template)
+
+    assert sorted(fetched) == [2023, 2024]
+    assert list(failed) == [2022] and "404" in failed[2022]
+    for season in fetched:
+        body = server.files[f"play_by_play_{season}.parquet"]
+        assert fetched[season]["rows"] == 500
+        assert fetched[season]["checksum"] == checksum(body)
+        assert open(season_path(season, str(store)), "rb").read() == body
+    # A missing season fails fast instead of being retried
+    assert [name for name, _ in server.requests].count("play_by_play_2022.parquet") == 1
+
+
+def test_server_errors_are_retried(server, tmp_path):
+    server.failures["play_by_play_2024.parquet"] = [503, 500]
+    path = str(tmp_path / "play_by_play_2024.parquet")
+
+    entry = _fetch_with_retries(2024, path, server.url_template, retries=3, backoff=0)
+    assert entry["rows"] == 500
+    assert len(server.requests) == 3
+
+
+def test_server_errors_give_up_after_retries(server, tmp_path):
+    server.failures["play_by_play_2024.parquet"] = [503, 503, 503]
+    path = str(tmp_path / "play_by_play_2024.parquet")
+
+    with pytest.raises(Exception, match="503"):
+        _fetch_with_retries(2024, path, server.url_template, retries=2, backoff=0)
+    assert len(server.requests) == 3
+
+
+def test_resume_appends_to_matching_partial(server, tmp_path):
+    body = server.files["play_by_play_2024.parquet"]
+    path = tmp_path / "play_by_play_2024.parquet"
+    first = f'"{hashlib.md5(body).hexdigest()}"'
+    write_partial(path, body[:len(body) // 2], first)
+
+    entry = fetch_season(2024, str(path), server.url_template)
+
+    _, headers = server.requests[-1]
+    assert headers["Range"] == f"bytes={len(body) // 2}-" and headers["If-Range"] == first
+    assert path.read_bytes() == body and entry["checksum"] == checksum(body)
+    assert not (tmp_path / "play_by_play_2024.parquet.part.json").exists()
+
+
+def test_changed_file_discards_partial(server, tmp_path):
+    # The partial file belongs to an older version of the asset
+    old = parquet_bytes(2024, tmp_path, rows=300)
+    path = tmp_path / "play_by_play_2024.parquet"
+    write_partial(path, old[:len(old) // 2], f'"{hashlib.md5(old).hexdigest()}"')
+
+    entry = fetch_season(2024, str(path), server.url_template)
+
+    body = server.files["play_by_play_2024.parquet"]
+    assert path.read_bytes() == body and entry["checksum"] == checksum(body)
+    assert count_rows(str(path)) == 500
+
+
+def test_partial_without_validator_is_discarded(server, tmp_path):
+    body = server.files["play_by_play_2024.parquet"]
+    path = tmp_path / "play_by_play_2024.parquet"
+    (tmp_path / "play_by_play_2024.parquet.part").write_bytes(b"stale bytes")
+
+    fetch_season(2024, str(path), server.url_template)
+
+    _, headers = server.requests[-1]
+    assert "Range" not in headers
+    assert path.read_bytes() == body
+
+
+def test_unsatisfiable_range_restarts(server, tmp_path):
+    body = server.files["play_by_play_2024.parquet"]
+    path = tmp_path / "play_by_play_2024.parquet"
+    write_partial(path, body + b"extra", f'"{hashlib.md5(body).hexdigest()}"')
+
+    entry = fetch_season(2024, str(path), server.url_template)
+
+    assert [("Range" in headers) for _, headers in server.requests] == [True, False]
+    assert path.read_bytes() == body and entry["checksum"] == checksum(body)
@@ -0,0 +1,51 @@
+"""
+test_ratings.py
+Weekly sparse ratings match dense refits, use earlier weeks only and recover
+team strength.
+
+Brendan Dileo, October 2026
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmark import TEAMS, make_synthetic_schedule, reference_weekly_ratings
+from utils.features import MODERN_START_YEAR
+from utils.ratings import RIDGE_ALPHA, SEASON_DECAY, WEEKLY_DECAY, team_codes, week_numbers, weekly_ratings
+
+# Offense strength the ratings should recover (points above average)
+STRENGTH = dict(zip(TEAMS, np.linspace(-6, 6, len(TEAMS))))
+
+
+@pytest.fixture(scope="module")
+def rated_games():
+    """Full modern history with team strength added to the scores."""
+    games = make_synthetic_schedule(list(range(MODERN_START_YEAR, 2025)))
+    games["score_home"] += games["team_home"].map(STRENGTH).astype("float32")
+    games["score_away"] += games["team_away"].map(STRENGTH).astype("float32")
+    return games
+
+
+def test_sparse_ratings_match_dense_refits(schedule):
+    expected = reference_weekly_ratings(schedule, RIDGE_ALPHA, WEEKLY_DECAY, SEASON_DECAY)
+    ratings = weekly_ratings(schedule)
+    home, away, n_teams = team_codes(schedule)
+    rows = np.arange(len(schedule))
+    np.testing.assert_allclose(ratings["home_off_rating"], expected[rows, home], atol=1e-6)
+    np.testing.assert_allclose(ratings["away_def_rating"], expected[rows, n_teams + away], atol=1e-6)
+
+
+def test_first_week_has_no_ratings(schedule):
+    ratings = weekly_ratings(schedule)
+    weeks = week_numbers(schedule["schedule_date"])
+    assert (ratings.loc[weeks == weeks.min()] == 0).all().all()
+
+
+def test_ratings_recover_team_strength(rated_games):
+    ratings = weekly_ratings(rated_games)
+    late = rated_games["schedule_season"] == 2024
+    fitted = pd.Series(ratings.loc[late, "home_off_rating"].to_numpy(), index=rated_games.loc[late, "team_home"])
+    fitted = fitted.groupby(level=0).mean()
+    # Scores are noisy (sd ~13 points) next to the +-6 point strengths
+    assert np.corrcoef(fitted[TEAMS], [STRENGTH[team] for team in TEAMS])[0, 1] > 0.8
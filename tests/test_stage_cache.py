@@ -0,0 +1,126 @@
+"""
+test_stage_cache.py
+Stage cache keys cover all the code a stage runs, and cached_stage hits,
+misses and evicts the way the pipeline relies on.
+
+Brendan Dileo, October 2026
+"""
+
+import contextlib
+import importlib
+import io
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pandas.testing as pdt
+import pytest
+
+import utils.features  # noqa: F401
+from utils import stage_cache
+from utils.stage_cache import cached_stage, entry_size, source_modules, stage_key
+
+CALLS = []
+
+
+def split_stage(df, offset=0):
+    """Toy stage shaped like encode_features: returns (X, y, df)."""
+    CALLS.append(offset)
+    X = df[["a", "b"]] + offset
+    return X, (df["a"] > df["b"]).astype(int).rename("target"), df.assign(c=df["a"] * 2)
+
+
+def run(df, params, cache_dir, **kwargs):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return cached_stage(split_stage, df, params, cache_dir=cache_dir,
+                            kwargs={"offset": params.get("offset", 0)}, **kwargs)
+
+
+@pytest.fixture
+def frame():
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({"a": rng.normal(size=50), "b": rng.normal(size=50)}, index=np.arange(100, 150))
+
+
+@pytest.fixture(autouse=True)
+def reset_calls():
+    CALLS.clear()
+
+
+def entries(cache_dir):
+    return sorted(entry.name for entry in os.scandir(cache_dir) if entry.is_dir() and not entry.name.startswith("."))
+
+
+def test_source_modules_follow_imports_transitively():
+    # features imports ratings, which imports franchises
+    names = source_modules("utils.features")
+    assert {"utils.features", "utils.rolling", "utils.ratings", "utils.franchises"} <= names
+    assert all(name.startswith("utils.") for name in names)
+
+
+def test_hit_round_trips_outputs(frame, tmp_path):
+    first = run(frame, {"offset": 1}, tmp_path)
+    second = run(frame, {"offset": 1}, tmp_path)
+
+    assert CALLS == [1]
+    assert len(second) == 3
+    pdt.assert_frame_equal(second[0], first[0])
+    pdt.assert_series_equal(second[1], first[1])
+    pdt.assert_frame_equal(second[2], first[2])
+
+
+def test_param_or_frame_change_misses(frame, tmp_path):
+    run(frame, {"offset": 1}, tmp_path)
+    run(frame, {"offset": 2}, tmp_path)
+    run(frame.assign(b=frame["b"] + 1), {"offset": 1}, tmp_path)
+    run(frame.astype({"a": "float32"}), {"offset": 1}, tmp_path)
+
+    assert CALLS == [1, 2, 1, 1]
+    assert len(entries(tmp_path)) == 4
+
+
+def test_code_change_misses(frame, tmp_path, monkeypatch):
+    # Stage defined in its own module so its source can be edited
+    module_dir = tmp_path / "src"
+    module_dir.mkdir()
+    source = module_dir / "edited_stage.py"
+    source.write_text("def stage(df):\n    return (df * 1,)\n")
+    monkeypatch.syspath_prepend(str(module_dir))
+    module = importlib.import_module("edited_stage")
+    cache_dir = tmp_path / "cache"
+
+    def run_module_stage():
+        with contextlib.redirect_stdout(io.StringIO()):
+            return cached_stage(module.stage, frame, {}, cache_dir=cache_dir)[0]
+
+    run_module_stage()
+    assert len(entries(cache_dir)) == 1
+    run_module_stage()
+    assert len(entries(cache_dir)) == 1
+
+    source.write_text("def stage(df):\n    # doubled\n    return (df * 2,)\n")
+    importlib.reload(module)
+    pdt.assert_frame_equal(run_module_stage(), frame * 2)
+    assert len(entries(cache_dir)) == 2
+    sys.modules.pop("edited_stage", None)
+
+    # Bumping the cache version invalidates everything
+    monkeypatch.setattr(stage_cache, "CACHE_VERSION", stage_cache.CACHE_VERSION + 1)
+    run(frame, {}, cache_dir)
+    run(frame, {}, cache_dir)
+    assert CALLS == [0]
+
+
+def test_least_recently_used_entry_evicted(frame, tmp_path):
+    keys = {offset: stage_key(split_stage, frame, {"offset": offset}) for offset in [1, 2, 3]}
+    run(frame, {"offset": 1}, tmp_path)
+    cap = int(entry_size(tmp_path / keys[1]) * 2.5)
+
+    run(frame, {"offset": 2}, tmp_path, max_bytes=cap)
+    # Reading offset 1 again makes offset 2 the least recently used entry
+    run(frame, {"offset": 1}, tmp_path, max_bytes=cap)
+    run(frame, {"offset": 3}, tmp_path, max_bytes=cap)
+
+    assert CALLS == [1, 2, 3]
+    assert entries(tmp_path) == sorted([keys[1], keys[3]])
@@ -0,0 +1,86 @@
+"""
+test_team_state.py
+TeamState replays the batch rolling features and records games once each.
+
+Brendan Dileo, October 2026
+"""
+
+import contextlib
+import io
+
+import numpy as np
+import pandas as pd
+
+from utils.features import encode_features
+from utils.team_state import TeamState, load_team_state, replay_features
+
+
+def test_replay_matches_encode_features(merged_games):
+    with contextlib.redirect_stdout(io.StringIO()):
+        _, _, expected = encode_features(merged_games.copy())
+    result, _ = replay_features(merged_games)
+    expected = expected.loc[result.index, result.columns]
+
+    # Game features match exactly; the EPA means to floating-point rounding
+    exact = [col for col in result.columns if "epa" not in col and "success" not in col]
+    pd.testing.assert_frame_equal(result[exact], expected[exact], check_exact=True, check_dtype=False)
+    pd.testing.assert_frame_equal(result, expected, rtol=1e-12, atol=1e-12, check_dtype=False)
+
+
+def test_saved_state_gives_same_features(merged_games, tmp_path):
+    _, state = replay_features(merged_games)
+    path = str(tmp_path / "cache" / "team_state.pkl")
+    state.save(path)
+    loaded = load_team_state(path)
+
+    game = merged_games.iloc[-1]
+    date = pd.Timestamp(game["schedule_date"]) + pd.Timedelta(days=7)
+    assert loaded.game_features(game["team_home"], game["team_away"], date) == \
+        state.game_features(game["team_home"], game["team_away"], date)
+
+
+def test_update_matches_replay(merged_games):
+    _, replayed = replay_features(merged_games)
+    state = TeamState()
+    assert state.update(merged_games) == len(replayed.recorded)
+    assert state.update(merged_games) == 0
+
+    game = merged_games.iloc[-1]
+    date = pd.Timestamp(game["schedule_date"]) + pd.Timedelta(days=7)
+    assert state.game_features(game["team_home"], game["team_away"], date) == \
+        replayed.game_features(game["team_home"], game["team_away"], date)
+
+
+def test_update_records_late_game_on_recorded_date(merged_games):
+    # Two games on the last date; only the first is final at the first update
+    last_date = merged_games["schedule_date"].max()
+    late = merged_games.index[merged_games["schedule_date"] == last_date][1]
+    partial = merged_games.copy()
+    partial.loc[late, ["score_home", "score_away"]] = np.nan
+
+    state = TeamState()
+    recorded = state.update(partial)
+    assert recorded == len(merged_games) - 1
+    assert state.update(merged_games) == 1
+
+    _, replayed = replay_features(merged_games)
+    assert state.recorded == replayed.recorded
+    for team in merged_games.loc[late, ["team_home", "team_away"]]:
+        date = pd.Timestamp(last_date) + pd.Timedelta(days=7)
+        assert state.team(team).features(date) == replayed.team(team).features(date)
+
+
+def test_update_rescans_from_earliest_pending_game(merged_games):
+    # A game weeks before the last date is still missing its score
+    pending = merged_games.index[len(merged_games) // 2]
+    partial = merged_games.copy()
+    partial.loc[pending, ["score_home", "score_away"]] = np.nan
+
+    state = TeamState()
+    state.update(partial)
+    assert state.resume_date == pd.Timestamp(merged_games.loc[pending, "schedule_date"])
+    assert state.update(merged_games) == 1
+    assert state.resume_date == state.last_date
+
+    _, replayed = replay_features(merged_games)
+    assert state.recorded == replayed.recorded